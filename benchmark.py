@@ -0,0 +1,136 @@
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from typing import Dict, List, Callable, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'labyrinth'))
+
+from logic.path_finder import PathFinder
+from maze_generator import MazeGenerator, MazeKind, Maze
+from simulator import Simulator
+
+
+class ComponentMeter:
+    """
+    Collects duration of every call and the peak memory allocated during a call.
+    Components can be nested, peaks of inner calls are passed to the outer ones
+    """
+
+    def __init__(self, measure_memory: bool):
+        self.__measure_memory = measure_memory
+        self.__outer_peaks: List[int] = []
+        self.durations: Dict[str, List[float]] = {}
+        self.peak_memory: Dict[str, int] = {}
+
+    def measure(self, component: str, function: Callable, *args):
+        if not self.__measure_memory:
+            started_at = time.perf_counter()
+            result = function(*args)
+            self.durations.setdefault(component, []).append(time.perf_counter() - started_at)
+
+            return result
+
+        memory_before, outer_peak = tracemalloc.get_traced_memory()
+        if self.__outer_peaks:
+            self.__outer_peaks[-1] = max(self.__outer_peaks[-1], outer_peak)
+        self.__outer_peaks.append(0)
+        tracemalloc.reset_peak()
+
+        started_at = time.perf_counter()
+        result = function(*args)
+        self.durations.setdefault(component, []).append(time.perf_counter() - started_at)
+
+        peak = max(tracemalloc.get_traced_memory()[1], self.__outer_peaks.pop())
+        self.peak_memory[component] = max(self.peak_memory.get(component, 0), peak - memory_before)
+        if self.__outer_peaks:
+            self.__outer_peaks[-1] = max(self.__outer_peaks[-1], peak)
+
+        return result
+
+    def wrap(self, component: str, function: Callable) -> Callable:
+        def measured_function(*args):
+            return self.measure(component, function, *args)
+
+        return measured_function
+
+
+class TurnBenchmark:
+    """ plays a game in Simulator and measures every step of the turn and every PathFinder search """
+
+    def __init__(
+            self,
+            maze: Maze,
+            regions: str = 'tracker',
+            max_turns: int = Simulator.MAX_TURNS,
+            measure_memory: bool = False,
+            budget: Optional[float] = None
+    ):
+        self.meter = ComponentMeter(measure_memory)
+        self.simulator = Simulator(maze, regions, max_turns, self.meter.measure, budget)
+
+    def run(self):
+        get_path = PathFinder.get_path
+        get_path_to_closest = PathFinder.get_path_to_closest
+        PathFinder.get_path = self.meter.wrap('path search', get_path)
+        PathFinder.get_path_to_closest = self.meter.wrap('path search', get_path_to_closest)
+        try:
+            self.simulator.run()
+        finally:
+            PathFinder.get_path = get_path
+            PathFinder.get_path_to_closest = get_path_to_closest
+
+
+class BenchmarkReport:
+    PERCENTILES = (50, 90, 99)
+
+    @staticmethod
+    def get_percentile(sorted_values: List[float], percentile: int) -> float:
+        """ nearest-rank percentile """
+        index = max(0, -(-percentile * len(sorted_values) // 100) - 1)
+
+        return sorted_values[index]
+
+    def print(self, title: str, benchmark: TurnBenchmark):
+        print('{}: {} after {} turns'.format(title, benchmark.simulator.result, benchmark.simulator.turns))
+        header = '    {:<12} {:>7}'.format('component', 'calls')
+        for percentile in self.PERCENTILES:
+            header += ' {:>9}'.format('p{} ms'.format(percentile))
+        header += ' {:>9} {:>10}'.format('max ms', 'peak KiB')
+        print(header)
+
+        for component, durations in benchmark.meter.durations.items():
+            sorted_durations = sorted(durations)
+            line = '    {:<12} {:>7}'.format(component, len(durations))
+            for percentile in self.PERCENTILES:
+                line += ' {:>9.3f}'.format(self.get_percentile(sorted_durations, percentile) * 1000)
+            line += ' {:>9.3f}'.format(sorted_durations[-1] * 1000)
+            peak_memory = benchmark.meter.peak_memory.get(component)
+            line += ' {:>10}'.format('-' if peak_memory is None else peak_memory // 1024)
+            print(line)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Replays generated mazes and reports per turn latency')
+    parser.add_argument('--sizes', default='30x15,100x50,200x100,500x500,1000x1000')
+    parser.add_argument('--kinds', default=','.join(kind.value for kind in MazeKind))
+    parser.add_argument('--seeds', type=int, default=1)
+    parser.add_argument('--regions', default='tracker', choices=['tracker', 'sequential', 'numpy', 'bitboard'])
+    parser.add_argument('--max-turns', type=int, default=Simulator.MAX_TURNS)
+    parser.add_argument('--budget', type=float, help='seconds per turn, searches give up after it')
+    parser.add_argument('--memory', action='store_true', help='measure peak memory, slows everything down')
+    arguments = parser.parse_args()
+
+    if arguments.memory:
+        tracemalloc.start()
+
+    report = BenchmarkReport()
+    for size in arguments.sizes.split(','):
+        width, height = [int(dimension) for dimension in size.split('x')]
+        for kind in arguments.kinds.split(','):
+            for seed in range(arguments.seeds):
+                maze = MazeGenerator(seed).generate(MazeKind(kind), width, height)
+                benchmark = TurnBenchmark(maze, arguments.regions, arguments.max_turns, arguments.memory, arguments.budget)
+                benchmark.run()
+                report.print('{} {} seed {}'.format(kind, size, seed), benchmark)
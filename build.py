@@ -1,205 +1,1266 @@
+import argparse
+import ast
+import copy
 import glob
+import hashlib
+import heapq
+import inspect
 import json
+import operator
+import os
 import re
+import tempfile
+from array import array
+from collections import deque
+from typing import Optional, List, Iterator
 
 
-class ProjectBuilder:
-    def __init__(self, sources_folder_path: str):
-        self.__sources_folder_path = sources_folder_path
+class ReferencesCollector(ast.NodeVisitor):
+    """ names a node loads and attributes it reads, decorators of a function on its own name are skipped """
 
-    def get_content(self) -> str:
-        prepared_content = ''
-        # prepared_content = self.__get_and_add_imports(prepared_content)
-        prepared_content = self.__get_and_add_classes(prepared_content)
+    def __init__(self):
+        self.names = set()
+        self.attributes = set()
 
-        return prepared_content
+    def visit_Name(self, node: ast.Name):
+        if isinstance(node.ctx, ast.Load):
+            self.names.add(node.id)
 
-    def __get_and_add_imports(self, content: str) -> str:
-        collected_imports = self.__read_directory_and_collect_imports()
-        for collected_import in collected_imports:
-            if content != '':
-                content += "\n"
+    def visit_Attribute(self, node: ast.Attribute):
+        self.attributes.add(node.attr)
+        self.generic_visit(node)
 
-            content += collected_import
+    def visit_FunctionDef(self, node: ast.FunctionDef):
+        # @type.setter of the function type doesn't use it
+        for decorator in node.decorator_list:
+            if self.get_root_name(decorator) != node.name:
+                self.visit(decorator)
 
-        return content
+        for child in ast.iter_child_nodes(node):
+            if child not in node.decorator_list:
+                self.visit(child)
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    @staticmethod
+    def get_root_name(node: ast.AST):
+        while isinstance(node, (ast.Attribute, ast.Call)):
+            node = node.value if isinstance(node, ast.Attribute) else node.func
+
+        return node.id if isinstance(node, ast.Name) else None
+
+    @staticmethod
+    def collect(nodes: list) -> 'ReferencesCollector':
+        collector = ReferencesCollector()
+        for node in nodes:
+            collector.visit(node)
+
+        return collector
+
+
+class BundleOptimiser:
+    """
+    Rewrites the bundle for the submission without changing what it does:
+    annotations and docstrings are stripped, literal constants are folded into the code reading them,
+    tables of small value objects like VECTORS become tuples unpacked by the loops over them,
+    methods returning a simple expression of self and their arguments are inlined
+    and methods nobody calls afterwards are removed.
+    The bundle is a closed world, a name defined once in it is not overridden from outside
+    """
+    # a call of these can't be told from a call of a method with the same name
+    BUILTIN_TYPES = (
+        object, int, float, str, bytes, bytearray, list, tuple, dict, set, frozenset, memoryview, range, deque, array
+    )
+    BUILTIN_ATTRIBUTES = set().union(*[dir(builtin_type) for builtin_type in BUILTIN_TYPES])
+    SIMPLE_CALLS = {'len', 'abs', 'min', 'max', 'int', 'bool'}
+    SIMPLE_NODES = (
+        ast.Name, ast.Attribute, ast.Constant, ast.Compare, ast.BinOp, ast.UnaryOp, ast.BoolOp, ast.Subscript,
+        ast.Tuple, ast.List, ast.Slice, ast.IfExp, ast.Call,
+        ast.expr_context, ast.operator, ast.cmpop, ast.boolop, ast.unaryop
+    )
+    OPERATORS = {
+        ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul, ast.FloorDiv: operator.floordiv,
+        ast.Mod: operator.mod, ast.Pow: operator.pow, ast.LShift: operator.lshift, ast.RShift: operator.rshift,
+        ast.BitOr: operator.or_, ast.BitAnd: operator.and_, ast.BitXor: operator.xor,
+        ast.USub: operator.neg, ast.UAdd: operator.pos, ast.Invert: operator.invert, ast.Not: operator.not_
+    }
+    LITERAL_TYPES = (int, float, str, bytes, bool, type(None))
+    MAX_LITERAL_LENGTH = 32
+    MAX_INLINE_PASSES = 8
+
+    def __init__(self):
+        self.folded_constants = 0
+        self.folded_tables = 0
+        self.inlined_calls = 0
+        self.replaced_properties = 0
+        self.removed_methods = 0
+        self.__builtin_arities = self.__get_builtin_arities()
+
+    def optimise(self, code: str) -> str:
+        module = ast.parse(code)
+        self.__strip_annotations_and_docstrings(module)
+        self.__fold_constants(module)
+        self.__fold_tables(module)
+        self.__replace_plain_properties(module)
+        # an inlined method can make its caller simple enough for the next pass
+        for _ in range(self.MAX_INLINE_PASSES):
+            method_inliner = MethodInliner(self.__get_inlined_methods(module), self.__get_imported_names(module))
+            method_inliner.visit(module)
+            self.inlined_calls += method_inliner.inlined_calls
+            if not method_inliner.inlined_calls:
+                break
+
+        self.__remove_unused_methods(module)
+        self.__remove_unused_imports(module)
+
+        return ast.unparse(ast.fix_missing_locations(module)) + '\n'
+
+    @staticmethod
+    def __get_bodies(module: ast.Module) -> list:
+        """ (node, field) of every list of statements """
+        bodies = []
+        for node in ast.walk(module):
+            for field in ('body', 'orelse', 'finalbody'):
+                body = getattr(node, field, None)
+                if isinstance(body, list) and body and isinstance(body[0], ast.stmt):
+                    bodies.append((node, field))
+
+        return bodies
+
+    def __strip_annotations_and_docstrings(self, module: ast.Module):
+        for node in ast.walk(module):
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                node.returns = None
+                arguments = node.args
+                for argument in arguments.posonlyargs + arguments.args + arguments.kwonlyargs:
+                    argument.annotation = None
+                for argument in (arguments.vararg, arguments.kwarg):
+                    if argument:
+                        argument.annotation = None
+
+        for node, field in self.__get_bodies(module):
+            stripped_body = []
+            for statement in getattr(node, field):
+                # docstrings and other strings on their own do nothing
+                if isinstance(statement, ast.Expr) and isinstance(statement.value, ast.Constant) \
+                        and isinstance(statement.value.value, str):
+                    continue
+
+                if isinstance(statement, ast.AnnAssign):
+                    if statement.value is None:
+                        continue
+                    assignment = ast.Assign(targets=[statement.target], value=statement.value)
+                    statement = ast.copy_location(assignment, statement)
+
+                stripped_body.append(statement)
+
+            setattr(node, field, stripped_body or [ast.Pass()])
+
+    def __get_literal(self, node: ast.AST):
+        """ value of an expression of literals, ValueError when it is something else """
+        if isinstance(node, ast.Constant):
+            value = node.value
+        elif isinstance(node, ast.UnaryOp) and type(node.op) in self.OPERATORS:
+            value = self.OPERATORS[type(node.op)](self.__get_literal(node.operand))
+        elif isinstance(node, ast.BinOp) and type(node.op) in self.OPERATORS:
+            value = self.OPERATORS[type(node.op)](self.__get_literal(node.left), self.__get_literal(node.right))
+        else:
+            raise ValueError('Not a literal')
+
+        if not isinstance(value, self.LITERAL_TYPES) or len(repr(value)) > self.MAX_LITERAL_LENGTH:
+            raise ValueError('Not a literal')
 
-    def __read_directory_and_collect_imports(self):
-        collected_imports = set()
-        for file_path in glob.iglob(self.__sources_folder_path + '**/**', recursive=True):
-            if not self.__is_applicable_file(file_path):
+        return value
+
+    def __fold_constants(self, module: ast.Module):
+        """ module constants and class constants assigned once to a literal and never again """
+        stored_names = {}
+        stored_attributes = set()
+        function_names = set()
+        for node in ast.walk(module):
+            if isinstance(node, ast.Name) and not isinstance(node.ctx, ast.Load):
+                stored_names[node.id] = stored_names.get(node.id, 0) + 1
+            elif isinstance(node, ast.arg):
+                stored_names[node.arg] = stored_names.get(node.arg, 0) + 1
+            elif isinstance(node, (ast.Global, ast.Nonlocal)):
+                for name in node.names:
+                    stored_names[name] = stored_names.get(name, 0) + 2
+            elif isinstance(node, ast.Attribute) and not isinstance(node.ctx, ast.Load):
+                stored_attributes.add(node.attr)
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                function_names.add(node.name)
+
+        module_constants = {}
+        for statement in module.body:
+            name = self.__get_assigned_name(statement)
+            if name and stored_names.get(name) == 1:
+                try:
+                    module_constants[name] = self.__get_literal(statement.value)
+                except ValueError:
+                    pass
+
+        enum_class_names = {'Enum'}
+        class_constants = {}
+        for class_node in [node for node in ast.walk(module) if isinstance(node, ast.ClassDef)]:
+            if [base for base in class_node.bases if isinstance(base, ast.Name) and base.id in enum_class_names]:
+                enum_class_names.add(class_node.name)
+
+            for statement in class_node.body:
+                name = self.__get_assigned_name(statement)
+                if not name:
+                    continue
+
+                try:
+                    if class_node.name in enum_class_names or name.startswith('__'):
+                        raise ValueError('Not a constant')
+                    value = self.__get_literal(statement.value)
+                except ValueError:
+                    value = ValueError
+                class_constants.setdefault(name, []).append(value)
+
+        class_constants = {
+            name: values[0] for name, values in class_constants.items()
+            if ValueError not in values and len(set(values)) == 1 and len(set(map(type, values))) == 1
+            and name not in stored_attributes and name not in function_names and name not in self.BUILTIN_ATTRIBUTES
+        }
+
+        constant_folder = ConstantFolder(module_constants, class_constants, self.__get_imported_names(module))
+        constant_folder.visit(module)
+        self.folded_constants += constant_folder.folded_constants
+
+    @staticmethod
+    def __get_imported_names(module: ast.Module) -> set:
+        imported_names = set()
+        for node in ast.walk(module):
+            if isinstance(node, (ast.Import, ast.ImportFrom)):
+                imported_names.update([(alias.asname or alias.name).split('.')[0] for alias in node.names])
+
+        return imported_names
+
+    @staticmethod
+    def __get_assigned_name(statement: ast.stmt) -> Optional[str]:
+        if isinstance(statement, ast.Assign) and len(statement.targets) == 1 \
+                and isinstance(statement.targets[0], ast.Name):
+            return statement.targets[0].id
+
+        return None
+
+    def __fold_tables(self, module: ast.Module):
+        """
+        NAME = {key: ValueClass(literal, ...)} becomes NAME = {key: (literal, ...)} when every use of it
+        is a loop over NAME.values() or NAME.items() which only reads fields of the value,
+        the loop unpacks the tuple into one variable per field instead.
+        Fields of the value class are its __slots__ in the order of the __init__ arguments
+        """
+        classes = {node.name: node for node in module.body if isinstance(node, ast.ClassDef)}
+        parents = {child: node for node in ast.walk(module) for child in ast.iter_child_nodes(node)}
+        for statement in module.body:
+            name = self.__get_assigned_name(statement)
+            if not name or not isinstance(statement.value, ast.Dict):
                 continue
 
-            imports_from_file = self.__collect_imports_from_file(file_path)
-            for import_from_file in imports_from_file:
-                collected_imports.add(import_from_file)
+            fields = self.__get_table_fields(statement.value, classes)
+            if not fields:
+                continue
 
-        return collected_imports
+            loops = []
+            for node in ast.walk(module):
+                if isinstance(node, ast.Name) and node.id == name and node is not statement.targets[0]:
+                    loop = self.__get_table_loop(node, fields, parents)
+                    if not loop:
+                        break
+                    loops.append(loop)
+            else:
+                statement.value.values = [
+                    ast.Tuple(elts=table_value.args, ctx=ast.Load()) for table_value in statement.value.values
+                ]
+                for target, field_reads, function in loops:
+                    used_names = {node.id for node in ast.walk(function) if isinstance(node, ast.Name)}
+                    field_names = {}
+                    for field in fields:
+                        field_name = '{}_{}'.format(target.id, field)
+                        while field_name in used_names:
+                            field_name += '_'
+                        field_names[field] = field_name
 
-    def __collect_imports_from_file(self, file_path: str) -> set:
-        collected_imports = set()
-        file_resource = open(file_path, 'r')
-        file_content = file_resource.read()
-        file_resource.close()
+                    self.__replace_node(parents, target, ast.Tuple(
+                        elts=[ast.Name(id=field_names[field], ctx=ast.Store()) for field in fields], ctx=ast.Store()
+                    ))
+                    for field_read in field_reads:
+                        field_variable = ast.Name(id=field_names[field_read.attr], ctx=ast.Load())
+                        self.__replace_node(parents, field_read, field_variable)
+
+                self.folded_tables += 1
+
+    @staticmethod
+    def __get_slots(statement: ast.Assign) -> List[str]:
+        return [element.value for element in statement.value.elts if isinstance(element, ast.Constant)]
 
-        from_import_regex = r'^from (.*) import (.*)'
-        import_regex = r'^import (.*)'
+    def __get_table_fields(self, table: ast.Dict, classes: dict) -> Optional[List[str]]:
+        fields = None
+        for table_value in table.values:
+            if not isinstance(table_value, ast.Call) or not isinstance(table_value.func, ast.Name) \
+                    or table_value.func.id not in classes or table_value.keywords:
+                return None
+
+            try:
+                [self.__get_literal(argument) for argument in table_value.args]
+            except ValueError:
+                return None
+
+            class_node = classes[table_value.func.id]
+            slots = []
+            init_arguments = []
+            for statement in class_node.body:
+                if self.__get_assigned_name(statement) == '__slots__' and isinstance(statement.value, ast.Tuple):
+                    slots = self.__get_slots(statement)
+                elif isinstance(statement, ast.FunctionDef) and statement.name == '__init__':
+                    init_arguments = [argument.arg for argument in statement.args.args[1:]]
+
+            if not slots or slots != init_arguments or len(table_value.args) != len(slots):
+                return None
+            if fields is not None and fields != slots:
+                return None
+            fields = slots
+
+        return fields
+
+    @staticmethod
+    def __get_table_loop(name_node: ast.Name, fields: List[str], parents: dict) -> Optional[tuple]:
+        """ (loop variable, its field reads, function of the loop) when the loop over the name only reads fields """
+        method = parents.get(name_node)
+        call = parents.get(method)
+        loop = parents.get(call)
+        if not isinstance(method, ast.Attribute) or method.attr not in ('values', 'items') \
+                or not isinstance(call, ast.Call) or call.args or call.keywords \
+                or not isinstance(loop, (ast.For, ast.comprehension)) or loop.iter is not call:
+            return None
 
-        from_import_result = re.findall(from_import_regex, file_content, re.MULTILINE)
-        import_result = re.findall(import_regex, file_content, re.MULTILINE)
+        target = loop.target
+        if method.attr == 'items':
+            if not isinstance(target, ast.Tuple) or len(target.elts) != 2:
+                return None
+            target = target.elts[1]
+        if not isinstance(target, ast.Name):
+            return None
 
-        for from_import_item in from_import_result:
-            if self.__is_internal_import(from_import_item[0]):
+        # a loop variable stays after the loop, so it must not be read anywhere else in the function either
+        scope = parents.get(loop) if isinstance(loop, ast.comprehension) else loop
+        function = scope
+        while function in parents and not isinstance(function, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)):
+            function = parents[function]
+        scope_nodes = set(ast.walk(scope))
+
+        field_reads = []
+        for node in ast.walk(function):
+            if not isinstance(node, ast.Name) or node.id != target.id or node is target:
                 continue
 
-            import_line = 'from {} import {}'.format(from_import_item[0], from_import_item[1])
+            field_read = parents.get(node)
+            if node not in scope_nodes or not isinstance(node.ctx, ast.Load) \
+                    or not isinstance(field_read, ast.Attribute) or field_read.attr not in fields \
+                    or not isinstance(field_read.ctx, ast.Load):
+                return None
+            field_reads.append(field_read)
+
+        return target, field_reads, function
 
-            collected_imports.add(import_line)
+    @staticmethod
+    def __replace_node(parents: dict, node: ast.AST, new_node: ast.AST):
+        parent = parents[node]
+        for field, value in ast.iter_fields(parent):
+            if value is node:
+                setattr(parent, field, new_node)
+            elif isinstance(value, list) and node in value:
+                value[value.index(node)] = new_node
+        parents[new_node] = parent
 
-        for import_item in import_result:
-            if self.__is_internal_import(import_item):
+    def __replace_plain_properties(self, module: ast.Module):
+        """
+        a property which only reads and writes a private field becomes an attribute with its name,
+        so x.start is a field read instead of two calls
+        """
+        class_nodes = [node for node in ast.walk(module) if isinstance(node, ast.ClassDef)]
+        base_names = {base.id for class_node in class_nodes for base in class_node.bases if isinstance(base, ast.Name)}
+        for class_node in [node for node in module.body if isinstance(node, ast.ClassDef)]:
+            # without other classes in its hierarchy nothing else can define the property
+            assigned_names = [self.__get_assigned_name(statement) for statement in class_node.body]
+            if class_node.bases or class_node.keywords or class_node.name in base_names \
+                    or '__slots__' in assigned_names:
                 continue
 
-            import_line = 'import {}'.format(import_item)
+            fields = {}
+            for method in class_node.body:
+                field = self.__get_property_field(method)
+                if field:
+                    fields.setdefault(method.name, []).append(field)
 
-            collected_imports.add(import_line)
+            for name, property_fields in fields.items():
+                defined_count = len([
+                    statement for statement in class_node.body
+                    if isinstance(statement, (ast.FunctionDef, ast.AsyncFunctionDef)) and statement.name == name
+                ])
+                if len(property_fields) != 2 or len(set(property_fields)) != 1 or defined_count != 2 \
+                        or name.startswith('__'):
+                    continue
 
-        return collected_imports
+                mangled_field = MethodInliner.mangle(class_node.name, property_fields[0])
+                class_node.body = [
+                    statement for statement in class_node.body
+                    if not isinstance(statement, ast.FunctionDef) or statement.name != name
+                ] or [ast.Pass()]
+                for node, class_name in MethodInliner.walk_with_class(module):
+                    if isinstance(node, ast.Attribute) and MethodInliner.mangle(class_name, node.attr) == mangled_field:
+                        node.attr = name
+                self.replaced_properties += 1
 
     @staticmethod
-    def __is_internal_import(import_line: str) -> bool:
-        internal_import_folders = ['entity', 'common', 'logic', 'service']
+    def __get_property_field(method: ast.stmt) -> Optional[str]:
+        """ the field of a getter returning self.field or of a setter only assigning it """
+        if not isinstance(method, ast.FunctionDef) or len(method.decorator_list) != 1 or len(method.body) != 1:
+            return None
 
-        for internal_import_folder in internal_import_folders:
-            if import_line.find(internal_import_folder) > -1:
-                return True
+        decorator = method.decorator_list[0]
+        statement = method.body[0]
+        arguments = [argument.arg for argument in method.args.args]
+        if isinstance(decorator, ast.Name) and decorator.id == 'property' and len(arguments) == 1 \
+                and isinstance(statement, ast.Return):
+            field_node = statement.value
+        elif isinstance(decorator, ast.Attribute) and decorator.attr == 'setter' and len(arguments) == 2 \
+                and isinstance(statement, ast.Assign) and len(statement.targets) == 1 \
+                and isinstance(statement.value, ast.Name) and statement.value.id == arguments[1]:
+            field_node = statement.targets[0]
+        else:
+            return None
 
-        return False
+        if isinstance(field_node, ast.Attribute) and isinstance(field_node.value, ast.Name) \
+                and field_node.value.id == arguments[0] and field_node.attr.startswith('__'):
+            return field_node.attr
 
-    def __get_and_add_classes(self, content: str) -> str:
-        files_info_tree = self.__read_directory_and_build_files_info_tree()
-        for file_info in files_info_tree:
-            if content != '':
-                content += "\r\n\n"
+        return None
 
-            content += file_info['class_content']
+    def __get_inlined_methods(self, module: ast.Module) -> dict:
+        """
+        methods returning a simple expression by their mangled names,
+        no other method in the bundle and no method of builtin types takes as many arguments under the same name
+        """
+        arities = {}
+        stored_attributes = set()
+        for node, class_name in MethodInliner.walk_with_class(module):
+            # slots may be set with object.__setattr__()
+            if self.__get_assigned_name(node) == '__slots__' and isinstance(node.value, ast.Tuple):
+                stored_attributes.update(self.__get_slots(node))
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and class_name:
+                arities.setdefault(MethodInliner.mangle(class_name, node.name), []).append(self.__get_arity(node))
+            elif isinstance(node, ast.Attribute) and not isinstance(node.ctx, ast.Load):
+                stored_attributes.add(MethodInliner.mangle(class_name, node.attr))
 
-        return content
+        inlined_methods = {}
+        for class_node in [node for node in module.body if isinstance(node, ast.ClassDef)]:
+            for method in class_node.body:
+                if not isinstance(method, ast.FunctionDef):
+                    continue
+
+                name = method.name
+                mangled_name = MethodInliner.mangle(class_node.name, name)
+                if name.startswith('__') and name.endswith('__') or mangled_name in stored_attributes:
+                    continue
+
+                decorators = [decorator.id for decorator in method.decorator_list if isinstance(decorator, ast.Name)]
+                arguments = method.args
+                if decorators not in ([], ['property']) or len(decorators) != len(method.decorator_list) \
+                        or arguments.posonlyargs or arguments.vararg or arguments.kwarg or arguments.kwonlyargs \
+                        or arguments.defaults or not arguments.args or arguments.args[0].arg != 'self':
+                    continue
 
-    def __is_applicable_file(self, file_path: str) -> bool:
-        if file_path.find('.py') == -1:
-            return False
+                arguments_count = len(arguments.args) - 1
+                if decorators:
+                    # a property is read without a call, nothing else may have its name
+                    if arguments_count or len(arities[mangled_name]) != 1 or mangled_name in self.BUILTIN_ATTRIBUTES:
+                        continue
+                elif self.__count_accepting(arities[mangled_name], arguments_count) != 1 \
+                        or self.__count_accepting(self.__builtin_arities.get(mangled_name, []), arguments_count):
+                    continue
 
-        if file_path.find('__init__.py') > -1:
-            return False
+                if len(method.body) != 1 or not isinstance(method.body[0], ast.Return) or not method.body[0].value:
+                    continue
+
+                expression = method.body[0].value
+                if self.__is_simple(expression):
+                    inlined_methods[mangled_name] = (
+                        class_node.name, [argument.arg for argument in arguments.args], expression, bool(decorators)
+                    )
+
+        return inlined_methods
+
+    @staticmethod
+    def __get_arity(function: ast.FunctionDef) -> tuple:
+        """ (least, most) positional arguments of a call through an instance or the class """
+        arguments = function.args
+        positional = arguments.posonlyargs + arguments.args
+        decorators = [decorator.id for decorator in function.decorator_list if isinstance(decorator, ast.Name)]
+        if 'staticmethod' not in decorators and positional:
+            positional = positional[1:]
+
+        most = float('inf') if arguments.vararg else len(positional)
+
+        return len(positional) - len(arguments.defaults), most
+
+    @staticmethod
+    def __count_accepting(arities: list, arguments_count: int) -> int:
+        return len([arity for arity in arities if arity[0] <= arguments_count <= arity[1]])
+
+    @staticmethod
+    def __get_builtin_arities() -> dict:
+        """ arities of the methods of builtin types, any number of arguments when the signature is not known """
+        builtin_arities = {}
+        for builtin_type in BundleOptimiser.BUILTIN_TYPES:
+            for name in dir(builtin_type):
+                attribute = getattr(builtin_type, name)
+                try:
+                    parameters = list(inspect.signature(attribute).parameters.values())
+                except (TypeError, ValueError):
+                    builtin_arities.setdefault(name, []).append(BundleOptimiser.__get_documented_arity(attribute))
+                    continue
+
+                if parameters and parameters[0].name == 'self':
+                    parameters = parameters[1:]
+                positional = [parameter for parameter in parameters if parameter.kind in (
+                    inspect.Parameter.POSITIONAL_ONLY, inspect.Parameter.POSITIONAL_OR_KEYWORD
+                )]
+                required = [parameter for parameter in positional if parameter.default is inspect.Parameter.empty]
+                is_variadic = [
+                    parameter for parameter in parameters if parameter.kind == inspect.Parameter.VAR_POSITIONAL
+                ]
+                builtin_arities.setdefault(name, []).append(
+                    (len(required), float('inf') if is_variadic else len(positional))
+                )
+
+        return builtin_arities
+
+    @staticmethod
+    def __get_documented_arity(attribute) -> tuple:
+        """ from the first line of the docstring like S.count(sub[, start[, end]]) -> int """
+        signature_match = re.match(r'\w+\.\w+\(([^)]*)\)', attribute.__doc__ or '')
+        if not signature_match or '*' in signature_match.group(1) or '...' in signature_match.group(1):
+            return 0, float('inf')
+
+        parameters = signature_match.group(1)
+        required_parameters = [parameter for parameter in parameters.split('[')[0].split(',') if parameter.strip()]
+        all_parameters = [parameter for parameter in re.split(r'[,\[\]]', parameters) if parameter.strip()]
+
+        return len(required_parameters), len(all_parameters)
+
+    def __is_simple(self, expression: ast.expr) -> bool:
+        for node in ast.walk(expression):
+            if not isinstance(node, self.SIMPLE_NODES):
+                return False
+
+            if isinstance(node, ast.Call) and (
+                    not isinstance(node.func, ast.Name) or node.func.id not in self.SIMPLE_CALLS or node.keywords
+                    or [argument for argument in node.args if isinstance(argument, ast.Starred)]
+            ):
+                return False
 
         return True
 
-    def __read_directory_and_build_files_info_tree(self):
-        files_info_tree = {}
-        for file_path in glob.iglob(self.__sources_folder_path + '**/**', recursive=True):
-            if not self.__is_applicable_file(file_path):
-                continue
+    def __remove_unused_methods(self, module: ast.Module):
+        is_method_removed = True
+        while is_method_removed:
+            is_method_removed = False
+            references = set()
+            for node in ast.walk(module):
+                if isinstance(node, ast.Name):
+                    references.add(node.id)
+                elif isinstance(node, ast.Attribute):
+                    references.add(node.attr)
 
-            file_infos = self.__get_file_infos(file_path)
-            for key, value in file_infos.items():
-                files_info_tree[key] = value
+            for class_node in [node for node in ast.walk(module) if isinstance(node, ast.ClassDef)]:
+                kept_statements = []
+                for statement in class_node.body:
+                    if isinstance(statement, (ast.FunctionDef, ast.AsyncFunctionDef)) \
+                            and not (statement.name.startswith('__') and statement.name.endswith('__')) \
+                            and statement.name not in references:
+                        self.removed_methods += 1
+                        is_method_removed = True
+                        continue
 
-        for file_info in files_info_tree.values():
-            self.__setup_dependencies(file_info, files_info_tree.keys())
+                    kept_statements.append(statement)
+                class_node.body = kept_statements or [ast.Pass()]
 
-        files_info_tree = self.__update_position(files_info_tree)
+    @staticmethod
+    def __remove_unused_imports(module: ast.Module):
+        used_names = {node.id for node in ast.walk(module) if isinstance(node, ast.Name)}
+        statements = []
+        for statement in module.body:
+            if isinstance(statement, (ast.Import, ast.ImportFrom)):
+                statement.names = [
+                    alias for alias in statement.names if (alias.asname or alias.name).split('.')[0] in used_names
+                ]
+                if not statement.names:
+                    continue
 
-        sorted_files_info_tree = sorted(files_info_tree.values(), key=lambda d: d['position'])
+            statements.append(statement)
+        module.body = statements
 
-        return sorted_files_info_tree
 
-    def __get_file_infos(self, file_path: str):
-        file_infos = {}
-        file_resource = open(file_path, 'r')
-        file_content = file_resource.read()
-        file_resource.close()
+class ConstantFolder(ast.NodeTransformer):
+    """ replaces reads of module constants and Class.CONSTANT or self.CONSTANT with their literals """
+
+    def __init__(self, module_constants: dict, class_constants: dict, imported_names: set):
+        self.__module_constants = module_constants
+        self.__class_constants = class_constants
+        self.__imported_names = imported_names
+        self.folded_constants = 0
+
+    def visit_Name(self, node: ast.Name) -> ast.AST:
+        if isinstance(node.ctx, ast.Load) and node.id in self.__module_constants:
+            self.folded_constants += 1
+            return ast.copy_location(ast.Constant(value=self.__module_constants[node.id]), node)
+
+        return node
+
+    def visit_Attribute(self, node: ast.Attribute) -> ast.AST:
+        self.generic_visit(node)
+        # attributes of imported modules are not constants of the bundle
+        is_imported = ReferencesCollector.get_root_name(node.value) in self.__imported_names
+        if isinstance(node.ctx, ast.Load) and node.attr in self.__class_constants \
+                and MethodInliner.is_pure(node.value) and not is_imported:
+            self.folded_constants += 1
+            return ast.copy_location(ast.Constant(value=self.__class_constants[node.attr]), node)
+
+        return node
+
+
+class MethodInliner(ast.NodeTransformer):
+    """
+    Replaces receiver.method(arguments) and receiver.property with the returned expression
+    when the receiver and the arguments are names with attributes and items, so evaluating them again is harmless.
+    Receivers from imported modules are never bundle objects
+    """
+
+    def __init__(self, inlined_methods: dict, imported_names: set):
+        self.__inlined_methods = inlined_methods
+        self.__imported_names = imported_names
+        self.__class_names: List[Optional[str]] = [None]
+        self.__bound_names: List[Optional[set]] = [set()]
+        self.inlined_calls = 0
+
+    def visit_ClassDef(self, node: ast.ClassDef) -> ast.AST:
+        self.__class_names.append(node.name)
+        # names of a class body shadow globals, nothing is inlined there
+        self.__bound_names.append(None)
+        self.generic_visit(node)
+        self.__bound_names.pop()
+        self.__class_names.pop()
+
+        return node
+
+    def visit_FunctionDef(self, node: ast.AST) -> ast.AST:
+        bound_names = {
+            child.arg if isinstance(child, ast.arg) else child.id for child in ast.walk(node)
+            if isinstance(child, ast.arg) or isinstance(child, ast.Name) and not isinstance(child.ctx, ast.Load)
+        }
+        self.__bound_names.append(bound_names | (self.__bound_names[-1] or set()))
+        self.generic_visit(node)
+        self.__bound_names.pop()
+
+        return node
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+    visit_Lambda = visit_FunctionDef
+
+    def visit_Call(self, node: ast.Call) -> ast.AST:
+        self.generic_visit(node)
+        method = node.func
+        if not isinstance(method, ast.Attribute) or node.keywords:
+            return node
+
+        inlined_method = self.__inlined_methods.get(self.mangle(self.__class_names[-1], method.attr))
+        if not inlined_method or inlined_method[3] or len(node.args) != len(inlined_method[1]) - 1:
+            return node
+
+        return self.__inline(node, inlined_method, [method.value] + node.args)
+
+    def visit_Attribute(self, node: ast.Attribute) -> ast.AST:
+        self.generic_visit(node)
+        if not isinstance(node.ctx, ast.Load):
+            return node
+
+        inlined_method = self.__inlined_methods.get(self.mangle(self.__class_names[-1], node.attr))
+        if not inlined_method or not inlined_method[3]:
+            return node
+
+        return self.__inline(node, inlined_method, [node.value])
+
+    def __inline(self, node: ast.AST, inlined_method: tuple, arguments: list) -> ast.AST:
+        class_name, parameters, expression, is_property = inlined_method
+        bound_names = self.__bound_names[-1]
+        free_names = {
+            child.id for child in ast.walk(expression) if isinstance(child, ast.Name) and child.id not in parameters
+        }
+        if bound_names is None or free_names & bound_names \
+                or ReferencesCollector.get_root_name(arguments[0]) in self.__imported_names \
+                or not all([self.is_pure(argument) for argument in arguments]):
+            return node
+
+        values = dict(zip(parameters, arguments))
+        inlined_expression = copy.deepcopy(expression)
+        for child in ast.walk(inlined_expression):
+            if isinstance(child, ast.Attribute):
+                child.attr = self.mangle(class_name, child.attr)
+            elif isinstance(child, ast.Name) and child.id not in values:
+                child.id = self.mangle(class_name, child.id)
+
+        self.inlined_calls += 1
+
+        return ast.copy_location(ArgumentsSubstitution(values).visit(inlined_expression), node)
 
-        find_classes_result = re.findall(r'class ([a-zA-Z]+)', file_content, re.MULTILINE)
-        position = 0
-        for class_name in find_classes_result:
-            file_infos[class_name] = {
-                'path': file_path,
-                'class_name': class_name,
-                'class_content': self.__get_class_content(class_name, file_content),
-                'dependencies': [],
-                'position': position
-            }
-            position = position + 1
+    @staticmethod
+    def is_pure(node: ast.AST) -> bool:
+        """ constants, names and their attributes and items """
+        if isinstance(node, ast.Attribute):
+            return MethodInliner.is_pure(node.value)
+
+        if isinstance(node, ast.Subscript):
+            return MethodInliner.is_pure(node.value) and MethodInliner.is_pure(node.slice)
 
-        return file_infos
+        return isinstance(node, (ast.Name, ast.Constant))
 
     @staticmethod
-    def __setup_dependencies(file_info: dict, class_name_list):
-        for class_name in class_name_list:
-            if class_name == file_info['class_name']:
+    def mangle(class_name: Optional[str], name: str) -> str:
+        if class_name and name.startswith('__') and not name.endswith('__'):
+            return '_{}{}'.format(class_name.lstrip('_'), name)
+
+        return name
+
+    @staticmethod
+    def walk_with_class(node: ast.AST, class_name: Optional[str] = None) -> Iterator[tuple]:
+        """ every node with the name of the class it is defined in """
+        for child in ast.iter_child_nodes(node):
+            yield child, class_name
+            child_class_name = child.name if isinstance(child, ast.ClassDef) else class_name
+            yield from MethodInliner.walk_with_class(child, child_class_name)
+
+
+class ArgumentsSubstitution(ast.NodeTransformer):
+    def __init__(self, values: dict):
+        self.__values = values
+
+    def visit_Name(self, node: ast.Name) -> ast.AST:
+        if node.id in self.__values:
+            return copy.deepcopy(self.__values[node.id])
+
+        return node
+
+
+class ProjectBuilder:
+    """
+    Every top level statement of the sources is a unit: a class, a function or a module constant.
+    Units are ordered by the names they need at definition time (bases, decorators, annotations, constants)
+    with Kahn's algorithm, names used only inside functions don't order anything.
+
+    With tree shaking only units reachable from the template code get into the bundle,
+    methods which are never referenced are removed and imports the bundle doesn't use are dropped.
+    In the incremental mode parsed units are cached by file and only files with another mtime and hash are parsed
+    """
+    PLACEHOLDER = '{placeholder}'
+    CACHE_VERSION = 1
+
+    def __init__(
+            self,
+            sources_folder_path: str,
+            tree_shaking: bool = True,
+            cache_path: str = None,
+            optimiser: BundleOptimiser = None
+    ):
+        self.__sources_folder_path = sources_folder_path
+        self.__tree_shaking = tree_shaking
+        self.__optimiser = optimiser
+        self.__cache_path = cache_path
+        self.__internal_modules = {
+            os.path.splitext(entry)[0] for entry in os.listdir(sources_folder_path) if entry != '__init__.py'
+        }
+        self.parsed_files = 0
+        self.cached_files = 0
+
+    def build(self, template_content: str) -> str:
+        template_imports, template_code = self.__split_template(template_content)
+        files_infos = self.__read_directory_and_build_files_infos()
+        units = [unit for file_info in files_infos for unit in file_info['units']]
+        for order, unit in enumerate(units):
+            unit['order'] = order
+
+        template_references = ReferencesCollector.collect([ast.parse(template_code)])
+        if self.__tree_shaking:
+            units, removed_methods = self.__get_used_units(units, template_references)
+        else:
+            removed_methods = set()
+
+        content = self.__get_content(self.__sort_units(units), removed_methods)
+        code = template_code.replace(self.PLACEHOLDER, content)
+
+        imports = self.__get_imports(ast.parse(template_imports))
+        for file_info in files_infos:
+            self.__merge_imports(imports, file_info['imports'])
+
+        if self.__tree_shaking:
+            used_names = ReferencesCollector.collect([ast.parse(code)]).names
+            imports = self.__remove_unused_imports(imports, used_names)
+
+        bundle = self.__render_imports(imports) + '\n\n' + code.lstrip('\n')
+        if self.__optimiser:
+            bundle = self.__optimiser.optimise(bundle)
+
+        return bundle
+
+    @staticmethod
+    def __split_template(template_content: str) -> tuple:
+        """ imports of the template head and the rest of the template """
+        lines = template_content.split('\n')
+        imports_length = 0
+        while imports_length < len(lines) and re.match(r'(from .* )?import ', lines[imports_length]):
+            imports_length += 1
+
+        return '\n'.join(lines[:imports_length]) + '\n', '\n'.join(lines[imports_length:])
+
+    def __read_directory_and_build_files_infos(self) -> list:
+        cache = self.__load_cache()
+        files_infos = []
+        file_paths = glob.iglob(os.path.join(self.__sources_folder_path, '**', '*.py'), recursive=True)
+        for file_path in sorted(file_paths):
+            if os.path.basename(file_path) == '__init__.py':
                 continue
 
-            if file_info['class_content'].find(class_name) == -1:
+            files_infos.append(self.__get_file_info(file_path, cache.get(file_path)))
+
+        self.__save_cache(files_infos)
+
+        return files_infos
+
+    def __get_file_info(self, file_path: str, cached_file_info: dict = None) -> dict:
+        mtime = os.path.getmtime(file_path)
+        if cached_file_info and cached_file_info['mtime'] == mtime:
+            self.cached_files += 1
+            return cached_file_info
+
+        file_resource = open(file_path, 'r')
+        file_content = file_resource.read()
+        file_resource.close()
+
+        content_hash = hashlib.sha1(file_content.encode('utf-8')).hexdigest()
+        if cached_file_info and cached_file_info['hash'] == content_hash:
+            self.cached_files += 1
+            cached_file_info['mtime'] = mtime
+            return cached_file_info
+
+        self.parsed_files += 1
+        lines = file_content.split('\n')
+        units = []
+        imports = []
+        for node in ast.parse(file_content, file_path).body:
+            if isinstance(node, (ast.Import, ast.ImportFrom)):
+                if not self.__is_internal_import(node):
+                    self.__merge_imports(imports, self.__get_imports(node))
                 continue
 
-            if file_info['class_content'].find('"{}"'.format(class_name)) > -1:
+            # module docstring
+            if isinstance(node, ast.Expr) and isinstance(node.value, ast.Constant):
                 continue
 
-            if file_info['class_content'].find("'{}'".format(class_name)) > -1:
+            units.append(self.__get_unit(file_path, lines, node))
+
+        return {'path': file_path, 'mtime': mtime, 'hash': content_hash, 'units': units, 'imports': imports}
+
+    def __is_internal_import(self, node: ast.AST) -> bool:
+        if isinstance(node, ast.ImportFrom):
+            return node.level > 0 or node.module.split('.')[0] in self.__internal_modules
+
+        return any([alias.name.split('.')[0] in self.__internal_modules for alias in node.names])
+
+    def __get_unit(self, file_path: str, lines: list, node: ast.AST) -> dict:
+        first_line = self.__get_first_line(lines, node)
+        unit = {
+            'path': file_path,
+            'lines': lines[first_line:node.end_lineno],
+            'is_definition': isinstance(node, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)),
+            'names': sorted(self.__get_defined_names(node)),
+            'dependencies': sorted(ReferencesCollector.collect(self.__get_eager_nodes(node)).names),
+            'statements': 0,
+            'methods': []
+        }
+
+        method_nodes = []
+        if isinstance(node, ast.ClassDef):
+            unit['statements'] = len(node.body)
+            method_nodes = [child for child in node.body if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef))]
+
+        own_references = ReferencesCollector.collect(
+            [child for child in ast.iter_child_nodes(node) if child not in method_nodes]
+        )
+        unit['references'] = sorted(own_references.names)
+        unit['attributes'] = sorted(own_references.attributes)
+
+        for method_node in method_nodes:
+            method_references = ReferencesCollector.collect([method_node])
+            unit['methods'].append({
+                'name': method_node.name,
+                'start': self.__get_first_line(lines, method_node) - first_line,
+                'end': method_node.end_lineno - first_line,
+                'references': sorted(method_references.names),
+                'attributes': sorted(method_references.attributes)
+            })
+
+        return unit
+
+    @staticmethod
+    def __get_first_line(lines: list, node: ast.AST) -> int:
+        """ index of the first line of the node with its decorators and the comments right above it """
+        first_line = min([node.lineno] + [decorator.lineno for decorator in getattr(node, 'decorator_list', [])]) - 1
+        while first_line > 0 and lines[first_line - 1].strip().startswith('#'):
+            first_line -= 1
+
+        return first_line
+
+    @staticmethod
+    def __get_defined_names(node: ast.AST) -> set:
+        if isinstance(node, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+            return {node.name}
+
+        names = set()
+        targets = []
+        if isinstance(node, ast.Assign):
+            targets = node.targets
+        elif isinstance(node, (ast.AnnAssign, ast.AugAssign)):
+            targets = [node.target]
+
+        for target in targets:
+            for target_node in ast.walk(target):
+                if isinstance(target_node, ast.Name):
+                    names.add(target_node.id)
+
+        return names
+
+    def __get_eager_nodes(self, node: ast.AST) -> list:
+        """ parts of the node evaluated when it is defined, function bodies run only when they are called """
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            arguments = node.args
+            annotated = arguments.posonlyargs + arguments.args + arguments.kwonlyargs
+            annotated += [argument for argument in (arguments.vararg, arguments.kwarg) if argument]
+            eager_nodes = node.decorator_list + arguments.defaults
+            eager_nodes += [default for default in arguments.kw_defaults if default]
+            eager_nodes += [argument.annotation for argument in annotated if argument.annotation]
+
+            return eager_nodes + ([node.returns] if node.returns else [])
+
+        if isinstance(node, ast.ClassDef):
+            eager_nodes = node.decorator_list + node.bases + node.keywords
+            for child in node.body:
+                eager_nodes += self.__get_eager_nodes(child)
+
+            return eager_nodes
+
+        return [node]
+
+    @staticmethod
+    def __get_used_units(units: list, template_references: ReferencesCollector) -> tuple:
+        """ units reachable from the template and (unit order, method index) of methods nobody references """
+        units_by_name = {}
+        for unit in units:
+            for name in unit['names']:
+                units_by_name.setdefault(name, []).append(unit)
+
+        removed_methods = set()
+        while True:
+            used_units = {}
+            pending_units = [unit for unit in units if not unit['names']]
+            for name in template_references.names:
+                pending_units.extend(units_by_name.get(name, []))
+
+            while pending_units:
+                unit = pending_units.pop()
+                if unit['order'] in used_units:
+                    continue
+
+                used_units[unit['order']] = unit
+                names = list(unit['references'])
+                for method_index, method in enumerate(unit['methods']):
+                    if (unit['order'], method_index) not in removed_methods:
+                        names += method['references']
+
+                for name in names:
+                    pending_units.extend(units_by_name.get(name, []))
+
+            referrers = {}
+            for name in template_references.names | template_references.attributes:
+                referrers.setdefault(name, set()).add(None)
+
+            for unit in used_units.values():
+                for name in unit['references'] + unit['attributes']:
+                    referrers.setdefault(name, set()).add((unit['order'], None))
+
+                for method_index, method in enumerate(unit['methods']):
+                    if (unit['order'], method_index) in removed_methods:
+                        continue
+
+                    for name in method['references'] + method['attributes']:
+                        referrers.setdefault(name, set()).add((unit['order'], method_index))
+
+            unused_methods = set()
+            for unit in used_units.values():
+                for method_index, method in enumerate(unit['methods']):
+                    method_key = (unit['order'], method_index)
+                    name = method['name']
+                    if method_key in removed_methods or name.startswith('__') and name.endswith('__'):
+                        continue
+
+                    if not referrers.get(name, set()) - {method_key}:
+                        unused_methods.add(method_key)
+
+            if not unused_methods:
+                return sorted(used_units.values(), key=lambda used_unit: used_unit['order']), removed_methods
+
+            removed_methods |= unused_methods
+
+    @staticmethod
+    def __sort_units(units: list) -> list:
+        """ Kahn's algorithm, units without dependencies between them keep the order of the sources """
+        units_by_name = {}
+        for unit in units:
+            for name in unit['names']:
+                units_by_name.setdefault(name, []).append(unit)
+
+        dependants = {unit['order']: set() for unit in units}
+        dependencies_count = {unit['order']: 0 for unit in units}
+        for unit in units:
+            for name in unit['dependencies']:
+                for dependency in units_by_name.get(name, []):
+                    if dependency is unit or unit['order'] in dependants[dependency['order']]:
+                        continue
+
+                    dependants[dependency['order']].add(unit['order'])
+                    dependencies_count[unit['order']] += 1
+
+        units_by_order = {unit['order']: unit for unit in units}
+        ready_orders = [order for order, count in dependencies_count.items() if count == 0]
+        heapq.heapify(ready_orders)
+        sorted_units = []
+        while ready_orders:
+            order = heapq.heappop(ready_orders)
+            sorted_units.append(units_by_order[order])
+            for dependant_order in dependants[order]:
+                dependencies_count[dependant_order] -= 1
+                if dependencies_count[dependant_order] == 0:
+                    heapq.heappush(ready_orders, dependant_order)
+
+        if len(sorted_units) < len(units):
+            circular_names = [
+                name for order, count in dependencies_count.items() if count for name in units_by_order[order]['names']
+            ]
+            raise ValueError('Circular dependency between {}'.format(', '.join(circular_names)))
+
+        return sorted_units
+
+    def __get_content(self, units: list, removed_methods: set) -> str:
+        content = ''
+        previous_unit = None
+        for unit in units:
+            if previous_unit:
+                content += '\n\n\n' if unit['is_definition'] or previous_unit['is_definition'] else '\n'
+
+            content += self.__get_unit_content(unit, removed_methods)
+            previous_unit = unit
+
+        return content
+
+    @staticmethod
+    def __get_unit_content(unit: dict, removed_methods: set) -> str:
+        lines = list(unit['lines'])
+        removed_count = 0
+        for method_index in reversed(range(len(unit['methods']))):
+            if (unit['order'], method_index) not in removed_methods:
                 continue
 
-            file_info['dependencies'].append(class_name)
+            method = unit['methods'][method_index]
+            start = method['start']
+            end = method['end']
+            # blank lines before the method go with it, after it when it follows the header
+            while start > 1 and not lines[start - 1].strip():
+                start -= 1
+            if start == 1:
+                while end < len(lines) and not lines[end].strip():
+                    end += 1
+
+            del lines[start:end]
+            removed_count += 1
 
-    def __update_position(self, files_info_tree: dict):
-        is_position_updated = False
-        for class_name, file_info in files_info_tree.items():
-            if len(file_info['dependencies']) == 0:
+        if unit['statements'] and removed_count == unit['statements']:
+            lines.append('    pass')
+
+        return '\n'.join(lines)
+
+    @staticmethod
+    def __get_imports(node: ast.AST) -> list:
+        """ [module or None, [(name, alias)]] in the order of the source """
+        imports = []
+        for import_node in ast.walk(node):
+            if isinstance(import_node, ast.ImportFrom):
+                imports.append([import_node.module, [[alias.name, alias.asname] for alias in import_node.names]])
+            elif isinstance(import_node, ast.Import):
+                imports.extend([[None, [[alias.name, alias.asname]]] for alias in import_node.names])
+
+        return imports
+
+    @staticmethod
+    def __merge_imports(imports: list, added_imports: list):
+        for module, names in added_imports:
+            if module is None:
+                if [None, names] not in imports:
+                    imports.append([None, names])
                 continue
 
-            position = file_info['position']
-            for dependency_name in file_info['dependencies']:
-                dependency_position = files_info_tree[dependency_name]['position']
-                if dependency_position >= position:
-                    position = dependency_position + 1
+            known_names = next((known_names for known_module, known_names in imports if known_module == module), None)
+            if known_names is None:
+                known_names = []
+                imports.append([module, known_names])
 
-            if file_info['position'] != position:
-                file_info['position'] = position
-                is_position_updated = True
+            known_names.extend([name for name in names if name not in known_names])
 
-        if is_position_updated is True:
-            return self.__update_position(files_info_tree)
+    @staticmethod
+    def __remove_unused_imports(imports: list, used_names: set) -> list:
+        used_imports = []
+        for module, names in imports:
+            bound_names = [[name, alias] for name, alias in names if (alias or name.split('.')[0]) in used_names]
+            if bound_names:
+                used_imports.append([module, bound_names])
 
-        return files_info_tree
+        return used_imports
 
     @staticmethod
-    def __get_class_content(class_name: str, file_content: str):
-        class_content_regex_with_multi_classes = r'class {}(.*?):(.*)(class)'.format(class_name)
-        class_content_regex_with_one_class = r'class {}(.*?):(.*)'.format(class_name)
+    def __render_imports(imports: list) -> str:
+        lines = []
+        for module, names in imports:
+            rendered_names = ', '.join([name + (' as ' + alias if alias else '') for name, alias in names])
+            lines.append('from {} import {}'.format(module, rendered_names) if module else 'import ' + rendered_names)
 
-        class_content = ''
-        find_class_content_result = re.search(class_content_regex_with_multi_classes, file_content, re.S)
-        if not find_class_content_result:
-            find_class_content_result = re.search(class_content_regex_with_one_class, file_content, re.S)
-            if find_class_content_result:
-                class_content = find_class_content_result.group(0)
-        else:
-            class_content = find_class_content_result.group(0)
-            # need to remove last class text
-            class_content = class_content[0:-5]
+        return '\n'.join(lines) + '\n'
+
+    def __load_cache(self) -> dict:
+        if not self.__cache_path or not os.path.exists(self.__cache_path):
+            return {}
 
-        class_content = class_content.strip()
+        cache_resource = open(self.__cache_path, 'r')
+        cache = json.load(cache_resource)
+        cache_resource.close()
+        if cache.get('version') != self.CACHE_VERSION:
+            return {}
 
-        return class_content
+        return {file_info['path']: file_info for file_info in cache['files']}
+
+    def __save_cache(self, files_infos: list):
+        if not self.__cache_path:
+            return
+
+        cache_resource = open(self.__cache_path, 'w')
+        json.dump({'version': self.CACHE_VERSION, 'files': files_infos}, cache_resource)
+        cache_resource.close()
+
+
+class OptimisationReport:
+    """ sizes of the bundle before and after the optimiser and its turn time in whole games played through pipes """
+
+    def __init__(self, sizes: str, games: int):
+        self.__sizes = [[int(dimension) for dimension in size.split('x')] for size in sizes.split(',')]
+        self.__games = games
+
+    def print(self, plain_bundle: str, optimised_bundle: str, optimiser: BundleOptimiser):
+        # benchmarks need the sources and the maze generator, only the report imports them
+        from bundle_benchmark import BundleTurnBenchmark
+        from maze_generator import MazeGenerator, MazeKind
+
+        print('folded {} constants and {} tables, inlined {} calls and {} properties, removed {} methods'.format(
+            optimiser.folded_constants,
+            optimiser.folded_tables,
+            optimiser.inlined_calls,
+            optimiser.replaced_properties,
+            optimiser.removed_methods
+        ))
+        bundle_paths = []
+        for bundle in (plain_bundle, optimised_bundle):
+            bundle_file = tempfile.NamedTemporaryFile('w', suffix='.py', delete=False)
+            bundle_file.write(bundle)
+            bundle_file.close()
+            bundle_paths.append(bundle_file.name)
+
+        results = [[], []]
+        durations = [[], []]
+        try:
+            for width, height in self.__sizes:
+                for kind in MazeKind:
+                    for seed in range(self.__games):
+                        maze = MazeGenerator(seed).generate(kind, width, height)
+                        for index, bundle_path in enumerate(bundle_paths):
+                            result, game_durations = BundleTurnBenchmark(maze).play(bundle_path)
+                            results[index].append((result, len(game_durations)))
+                            durations[index] += game_durations
+        finally:
+            for bundle_path in bundle_paths:
+                os.remove(bundle_path)
+
+        header = '    {:<10} {:>8} {:>7} {:>7} {:>9} {:>9}'
+        print(header.format('bundle', 'bytes', 'lines', 'turns', 'p50 ms', 'mean ms'))
+        for title, bundle, bundle_durations in zip(('plain', 'optimised'), (plain_bundle, optimised_bundle), durations):
+            sorted_durations = sorted(bundle_durations)
+            print('    {:<10} {:>8} {:>7} {:>7} {:>9.3f} {:>9.3f}'.format(
+                title,
+                len(bundle.encode('utf-8')),
+                bundle.count('\n'),
+                len(sorted_durations),
+                sorted_durations[len(sorted_durations) // 2] * 1000,
+                sum(sorted_durations) / len(sorted_durations) * 1000
+            ))
+
+        if results[0] != results[1]:
+            print('the optimised bundle played differently: {} != {}'.format(results[1], results[0]))
 
 
 if __name__ == '__main__':
-    project_builder = ProjectBuilder('labyrinth')
+    parser = argparse.ArgumentParser(description='Bundles the sources into main.py')
+    parser.add_argument('--keep-unused', action='store_true', help='add every unit, method and import')
+    parser.add_argument('--incremental', action='store_true', help='parse only sources changed since the last build')
+    parser.add_argument('--cache', default='.build_cache.json', help='parsed sources of the incremental mode')
+    parser.add_argument('--optimise', action='store_true', help='minify and fold the bundle for the submission')
+    parser.add_argument('--report', action='store_true', help='compare size and turn time with the plain bundle')
+    parser.add_argument('--report-sizes', default='30x15,60x30')
+    parser.add_argument('--report-games', type=int, default=3, help='games of every maze kind and size')
+    arguments = parser.parse_args()
+
+    bundle_optimiser = BundleOptimiser() if arguments.optimise else None
+    project_builder = ProjectBuilder(
+        'labyrinth',
+        tree_shaking=not arguments.keep_unused,
+        cache_path=arguments.cache if arguments.incremental else None,
+        optimiser=bundle_optimiser
+    )
 
     template_file_resource = open('main.template.py', 'r')
     template_file_content = template_file_resource.read()
     template_file_resource.close()
 
+    result_file_content = project_builder.build(template_file_content)
     result_file_resource = open('main.py', 'w')
-    result_file_resource.write(template_file_content.replace('{placeholder}', project_builder.get_content()))
+    result_file_resource.write(result_file_content)
     result_file_resource.close()
+
+    if arguments.incremental:
+        print('{} sources parsed, {} from the cache'.format(project_builder.parsed_files, project_builder.cached_files))
+
+    if arguments.optimise and arguments.report:
+        plain_project_builder = ProjectBuilder(
+            'labyrinth',
+            tree_shaking=not arguments.keep_unused,
+            cache_path=arguments.cache if arguments.incremental else None
+        )
+        OptimisationReport(arguments.report_sizes, arguments.report_games).print(
+            plain_project_builder.build(template_file_content), result_file_content, bundle_optimiser
+        )
@@ -0,0 +1,156 @@
+import argparse
+import os
+import subprocess
+import sys
+import time
+from typing import List, Tuple
+
+from benchmark import BenchmarkReport
+from maze_generator import MazeGenerator, MazeKind, Maze
+from simulator import Simulator, Referee
+
+
+class BundleProcess:
+    """
+    a bundle started with stdin and stdout in pipes, turns are written as the referee writes them.
+    Output is block buffered as on the referee side, so a bundle which doesn't flush its move hangs
+    """
+
+    def __init__(self, bundle_path: str, python: str = sys.executable):
+        environment = dict(os.environ)
+        environment.pop('PYTHONUNBUFFERED', None)
+        self.__process = subprocess.Popen(
+            [python, '-W', 'ignore', bundle_path],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            env=environment
+        )
+
+    def play_turn(self, turn_input: str) -> str:
+        self.__process.stdin.write(turn_input.encode('ascii'))
+        self.__process.stdin.flush()
+
+        return self.__process.stdout.readline().decode('ascii').strip()
+
+    def stop(self):
+        self.__process.kill()
+        self.__process.wait()
+        self.__process.stdin.close()
+        self.__process.stdout.close()
+
+    @staticmethod
+    def get_header(maze: Maze) -> str:
+        return '{} {} {}\n'.format(maze.height, maze.width, maze.alarm_rounds)
+
+    @staticmethod
+    def get_turn_input(known_rows: List[List[str]], player_x: int, player_y: int) -> str:
+        return '{} {}\n'.format(player_y, player_x) + ''.join([''.join(row) + '\n' for row in known_rows])
+
+    @staticmethod
+    def scan(maze: Maze, known_rows: List[List[str]], player_x: int, player_y: int):
+        radius = Simulator.SCANNER_RADIUS
+        left = max(0, player_x - radius)
+        right = min(maze.width, player_x + radius + 1)
+        for y in range(max(0, player_y - radius), min(maze.height, player_y + radius + 1)):
+            known_rows[y][left:right] = maze.rows[y][left:right]
+
+
+class StartupBenchmark:
+    """
+    Time to the first move of a bundle: starts the interpreter, writes the header and the first turn
+    with the scanner window around the start revealed and waits for the first line of the output
+    """
+
+    def __init__(self, maze: Maze, python: str = sys.executable):
+        self.__maze = maze
+        self.__python = python
+
+    def measure(self, bundle_path: str) -> float:
+        maze = self.__maze
+        known_rows = [['?'] * maze.width for _ in range(maze.height)]
+        BundleProcess.scan(maze, known_rows, *maze.start)
+        turn_input = BundleProcess.get_header(maze) + BundleProcess.get_turn_input(known_rows, *maze.start)
+
+        started_at = time.perf_counter()
+        bundle_process = BundleProcess(bundle_path, self.__python)
+        first_move = bundle_process.play_turn(turn_input)
+        duration = time.perf_counter() - started_at
+
+        bundle_process.stop()
+        if not first_move:
+            raise RuntimeError('{} exited without a move'.format(bundle_path))
+
+        return duration
+
+
+class BundleTurnBenchmark:
+    """ plays a whole game with a bundle by the rules of Referee and measures every turn after the first one """
+
+    def __init__(self, maze: Maze, max_turns: int = Simulator.MAX_TURNS, python: str = sys.executable):
+        self.__maze = maze
+        self.__max_turns = max_turns
+        self.__python = python
+
+    def play(self, bundle_path: str) -> Tuple[str, List[float]]:
+        """ result of the game and durations of turns from writing the input to reading the move """
+        maze = self.__maze
+        known_rows = [['?'] * maze.width for _ in range(maze.height)]
+        referee = Referee(maze)
+        durations = []
+        bundle_process = BundleProcess(bundle_path, self.__python)
+        header = BundleProcess.get_header(maze)
+        try:
+            for turn in range(self.__max_turns):
+                BundleProcess.scan(maze, known_rows, referee.player_x, referee.player_y)
+                turn_input = BundleProcess.get_turn_input(known_rows, referee.player_x, referee.player_y)
+                started_at = time.perf_counter()
+                move = bundle_process.play_turn(header + turn_input if turn == 0 else turn_input)
+                if turn > 0:
+                    durations.append(time.perf_counter() - started_at)
+
+                if move not in Simulator.MOVES:
+                    return 'no move', durations
+
+                result = referee.move(move)
+                if result:
+                    return result, durations
+
+            return Simulator.OUT_OF_TURNS, durations
+        finally:
+            bundle_process.stop()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Starts bundles and reports the time to the first move and per turn')
+    parser.add_argument('--bundles', default='main.py', help='comma separated bundle paths')
+    parser.add_argument('--size', default='200x100')
+    parser.add_argument('--kind', default=MazeKind.OPEN.value, choices=[kind.value for kind in MazeKind])
+    parser.add_argument('--runs', type=int, default=20, help='starts per bundle')
+    parser.add_argument('--games', type=int, default=0, help='whole games per bundle for the per turn time')
+    arguments = parser.parse_args()
+
+    width, height = [int(dimension) for dimension in arguments.size.split('x')]
+    maze_kind = MazeKind(arguments.kind)
+    benchmark = StartupBenchmark(MazeGenerator(0).generate(maze_kind, width, height))
+    print('    {:<32} {:>9} {:>9}'.format('bundle', 'p50 ms', 'max ms'))
+    for bundle_path in arguments.bundles.split(','):
+        durations: List[float] = sorted(benchmark.measure(bundle_path) for _ in range(arguments.runs))
+        print('    {:<32} {:>9.1f} {:>9.1f}'.format(
+            bundle_path, BenchmarkReport.get_percentile(durations, 50) * 1000, durations[-1] * 1000
+        ))
+
+    if arguments.games:
+        print('    {:<32} {:>7} {:>9} {:>9}'.format('bundle', 'turns', 'p50 ms', 'mean ms'))
+        for bundle_path in arguments.bundles.split(','):
+            durations = []
+            for seed in range(arguments.games):
+                maze = MazeGenerator(seed).generate(maze_kind, width, height)
+                durations += BundleTurnBenchmark(maze).play(bundle_path)[1]
+
+            print('    {:<32} {:>7} {:>9.3f} {:>9.3f}'.format(
+                bundle_path,
+                len(durations),
+                BenchmarkReport.get_percentile(sorted(durations), 50) * 1000,
+                sum(durations) / len(durations) * 1000
+            ))
@@ -1,16 +1,45 @@
 from math import sqrt
-from typing import Optional, Iterator
+from typing import Optional, Iterator, List
 
 from common.collection import MutableCollection
 
 
 class Coordinates:
+    """
+    Immutable, so the same instance can be shared.
+    Coordinates inside the map are interned: get() returns the same instance for the same x and y
+    """
+    __slots__ = ('x', 'y')
+
     __LEFT_PIXEL = 0
     __TOP_PIXEL = 0
 
+    __interned: List['Coordinates'] = []
+    __interned_width: int = 0
+    __interned_height: int = 0
+
     def __init__(self, x: int = __LEFT_PIXEL, y: int = __TOP_PIXEL):
-        self.x: int = x
-        self.y: int = y
+        object.__setattr__(self, 'x', x)
+        object.__setattr__(self, 'y', y)
+
+    def __setattr__(self, name: str, value):
+        raise AttributeError('Coordinates are immutable')
+
+    @staticmethod
+    def intern(width: int, height: int):
+        if Coordinates.__interned_width == width and Coordinates.__interned_height == height:
+            return
+
+        Coordinates.__interned = [Coordinates(x, y) for y in range(height) for x in range(width)]
+        Coordinates.__interned_width = width
+        Coordinates.__interned_height = height
+
+    @staticmethod
+    def get(x: int, y: int) -> 'Coordinates':
+        if 0 <= x < Coordinates.__interned_width and 0 <= y < Coordinates.__interned_height:
+            return Coordinates.__interned[y * Coordinates.__interned_width + x]
+
+        return Coordinates(x, y)
 
     def get_manhattan_distance(self, coordinates: 'Coordinates') -> int:
         return abs(self.x - coordinates.x) + abs(self.y - coordinates.y)
@@ -30,8 +59,11 @@ class Coordinates:
 
         return False
 
+    def __hash__(self) -> int:
+        return hash((self.x, self.y))
+
     def __add__(self, other: 'Coordinates') -> 'Coordinates':
-        return Coordinates(self.x+other.x, self.y+other.y)
+        return Coordinates.get(self.x+other.x, self.y+other.y)
 
     def is_same(self, coordinates: 'Coordinates') -> bool:
         if self.x == coordinates.x and self.y == coordinates.y:
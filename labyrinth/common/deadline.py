@@ -0,0 +1,21 @@
+import time
+
+
+class Deadline:
+    """ time budget of a turn, start() is called when the turn begins """
+    # how many iterations of a search pass between clock reads, must be a power of 2 minus 1
+    CHECK_MASK = 255
+
+    def __init__(self, budget: float):
+        self.__budget: float = budget
+        self.__ends_at: float = time.perf_counter() + budget
+
+    def start(self):
+        self.__ends_at = time.perf_counter() + self.__budget
+
+    def is_exceeded(self) -> bool:
+        return time.perf_counter() >= self.__ends_at
+
+    def is_exceeded_every(self, counter: int, mask: int = CHECK_MASK) -> bool:
+        """ reads the clock only when counter & mask is 0, so a loop pays for it once in mask + 1 iterations """
+        return not counter & mask and self.is_exceeded()
@@ -0,0 +1,39 @@
+from array import array
+
+
+class DisjointSet:
+    """
+    Union-find with path compression and union by rank
+    https://en.wikipedia.org/wiki/Disjoint-set_data_structure
+    """
+
+    def __init__(self, size: int):
+        self.__parents = array('i', range(size))
+        self.__ranks = bytearray(size)
+
+    def find(self, element: int) -> int:
+        parents = self.__parents
+        root = element
+        while parents[root] != root:
+            root = parents[root]
+
+        while parents[element] != root:
+            parents[element], element = root, parents[element]
+
+        return root
+
+    def union(self, first: int, second: int) -> int:
+        """ returns root of the merged set """
+        first_root = self.find(first)
+        second_root = self.find(second)
+        if first_root == second_root:
+            return first_root
+
+        if self.__ranks[first_root] < self.__ranks[second_root]:
+            first_root, second_root = second_root, first_root
+
+        self.__parents[second_root] = first_root
+        if self.__ranks[first_root] == self.__ranks[second_root]:
+            self.__ranks[first_root] += 1
+
+        return first_root
@@ -0,0 +1,101 @@
+from typing import List, Iterator
+
+from common.coordinates import Coordinates
+
+
+class Bitboard:
+    """
+    Masks of the maze, one int per row, bit x of a row is the cell in column x.
+    Frontier and flood fill are whole row bitwise operations
+    """
+    PASSABLE_DIGITS = bytes.maketrans(b'#.TC?', b'01110')
+    WALL_DIGITS = bytes.maketrans(b'#.TC?', b'10000')
+    UNKNOWN_DIGITS = bytes.maketrans(b'#.TC?', b'00001')
+
+    def __init__(self, width: int, height: int):
+        self.width: int = width
+        self.height: int = height
+        self.passable: List[int] = [0] * height
+        self.wall: List[int] = [0] * height
+        self.unknown: List[int] = [(1 << width) - 1] * height
+        self.visited: List[int] = [0] * height
+        self.frontier: List[int] = [0] * height
+
+    def update_row(self, y: int, row: bytes):
+        # reversed, so the first character becomes the lowest bit
+        reversed_row = row[::-1]
+        self.passable[y] = int(reversed_row.translate(self.PASSABLE_DIGITS), 2)
+        self.wall[y] = int(reversed_row.translate(self.WALL_DIGITS), 2)
+        self.unknown[y] = int(reversed_row.translate(self.UNKNOWN_DIGITS), 2)
+
+    def update_frontier_row(self, y: int) -> int:
+        """ passable cells next to unknown ones, returns bits which changed """
+        unknown = self.unknown
+        near_unknown = unknown[y] << 1 | unknown[y] >> 1
+        if y > 0:
+            near_unknown |= unknown[y - 1]
+        if y < self.height - 1:
+            near_unknown |= unknown[y + 1]
+
+        frontier_row = self.passable[y] & near_unknown
+        changed_bits = self.frontier[y] ^ frontier_row
+        self.frontier[y] = frontier_row
+
+        return changed_bits
+
+    def visit(self, coordinates: Coordinates):
+        self.visited[coordinates.y] |= 1 << coordinates.x
+
+    def is_visited(self, coordinates: Coordinates) -> bool:
+        return bool(self.visited[coordinates.y] >> coordinates.x & 1)
+
+    def is_passable(self, coordinates: Coordinates) -> bool:
+        return bool(self.passable[coordinates.y] >> coordinates.x & 1)
+
+    def flood(self, source: Coordinates) -> List[int]:
+        """ masks of passable cells connected to the source """
+        reached = [0] * self.height
+        if not self.is_passable(source):
+            return reached
+
+        passable = self.passable
+        reached[source.y] = 1 << source.x
+        pending_rows = {source.y}
+        while pending_rows:
+            y = pending_rows.pop()
+            reached_row = self.__fill_row(reached[y], passable[y])
+            reached[y] = reached_row
+            for next_y in (y - 1, y + 1):
+                if not 0 <= next_y < self.height:
+                    continue
+
+                next_reached_row = reached_row & passable[next_y]
+                if next_reached_row & ~reached[next_y]:
+                    reached[next_y] |= next_reached_row
+                    pending_rows.add(next_y)
+
+        return reached
+
+    def __fill_row(self, seeds: int, passable_row: int) -> int:
+        """ spreads the seeds over their runs of passable cells in log(width) shifts to each side """
+        upwards = seeds
+        downwards = seeds
+        upwards_mask = passable_row
+        downwards_mask = passable_row
+        shift = 1
+        while shift < self.width:
+            upwards |= (upwards << shift) & upwards_mask
+            upwards_mask &= upwards_mask << shift
+            downwards |= (downwards >> shift) & downwards_mask
+            downwards_mask &= downwards_mask >> shift
+            shift <<= 1
+
+        return upwards | downwards
+
+    @staticmethod
+    def get_bits(mask: int) -> Iterator[int]:
+        """ positions of the set bits, from the lowest """
+        while mask:
+            lowest_bit = mask & -mask
+            yield lowest_bit.bit_length() - 1
+            mask ^= lowest_bit
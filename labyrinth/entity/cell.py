@@ -1,34 +1,46 @@
-from typing import Optional, Iterator, List
+from typing import Optional, Iterator, List, Set, Tuple, Dict
 
 from common.collection import MutableCollection
 from common.coordinates import Coordinates
-from entity.dictionaries import LocationType, VECTORS
+from entity.bitboard import Bitboard
+from entity.dictionaries import LocationType, VECTORS, LOCATION_TYPES_BY_CODE, CODES_BY_BYTE, PASSABLE_BY_CODE, \
+    UNKNOWN_CODE, EMPTY_CODE, START_CODE, CONTROL_ROOM_CODE, WALL_CODE
+from service.profiler import Profiler
 
 
 class Cell:
+    """
+    type is kept as a small code, the collection keeps the same codes by index.
+    It is read only, cells change only through the collection updates, so its codes, bitboard and frontier follow
+    """
+    __slots__ = ('coordinates', 'code', 'region')
+
     def __init__(self, coordinates: Coordinates):
         self.coordinates: Coordinates = coordinates
-        self.type: Optional[LocationType] = None
-        self.distance_to_target: Optional[int] = 0
+        self.code: int = UNKNOWN_CODE
         self.region: int = 0
 
+    @property
+    def type(self) -> LocationType:
+        return LOCATION_TYPES_BY_CODE[self.code]
+
     def is_passable(self) -> bool:
-        return self.is_empty() or self.is_control() or self.is_start()
+        return PASSABLE_BY_CODE[self.code] == 1
 
     def is_wall(self) -> bool:
-        return self.type == LocationType.WALL
+        return self.code == WALL_CODE
 
     def is_empty(self) -> bool:
-        return self.type == LocationType.EMPTY
+        return self.code == EMPTY_CODE
 
     def is_control(self) -> bool:
-        return self.type == LocationType.CONTROL_ROOM
+        return self.code == CONTROL_ROOM_CODE
 
     def is_start(self) -> bool:
-        return self.type == LocationType.START
+        return self.code == START_CODE
 
     def is_unknown(self) -> bool:
-        return self.type == LocationType.UNKNOWN
+        return self.code == UNKNOWN_CODE
 
 
 class CellCollection(MutableCollection):
@@ -37,66 +49,229 @@ class CellCollection(MutableCollection):
         self.start: Optional[Cell] = None
         self.control: Optional[Cell] = None
         self.__map = {}
+        self.__rows: List[bytes] = []
+        self.__block: bytes = b''
+        self.__width: int = 0
+        self.__grid: List[Cell] = []
+        self.__codes: bytearray = bytearray()
+        self.__bitboard: Optional[Bitboard] = None
+        self.__neighbours: List[Tuple[Cell, ...]] = []
+        self.__neighbour_indexes: List[Tuple[int, ...]] = []
+        self.__frontier: Dict[int, Cell] = {}
+        self.__regions: Dict[int, List[Cell]] = {}
+
+    def update_rows(self, rows: List[str]) -> Set[Coordinates]:
+        """ updates only cells which differ from the previous rows and returns their coordinates """
+        started_at = Profiler.start()
+        changed_coordinates = set()
+        changed_row_indexes = set()
+        for i, row in enumerate(rows):
+            if self.__update_row(i, row.encode('ascii'), changed_coordinates):
+                changed_row_indexes.add(i)
+
+        return self.__finish_update(started_at, changed_coordinates, changed_row_indexes)
+
+    def update_block(self, block: bytes, row_stride: int) -> Set[Coordinates]:
+        """ the same as update_rows() for rows in one block, unchanged rows are compared without copying """
+        started_at = Profiler.start()
+        width = len(self.__map)
+        view = memoryview(block)
+        previous_view = memoryview(self.__block) if self.__block else None
+        changed_coordinates = set()
+        changed_row_indexes = set()
+        for i in range(len(block) // row_stride):
+            row_start = i * row_stride
+            row_view = view[row_start:row_start + width]
+            if previous_view is not None and row_view == previous_view[row_start:row_start + width]:
+                continue
+
+            if self.__update_row(i, bytes(row_view), changed_coordinates):
+                changed_row_indexes.add(i)
+
+        self.__block = block
+
+        return self.__finish_update(started_at, changed_coordinates, changed_row_indexes)
+
+    def __update_row(self, i: int, row: bytes, changed_coordinates: Set[Coordinates]) -> bool:
+        """ returns whether the row is different from the previous one """
+        bitboard = self.get_bitboard()
+        previous_row = self.__rows[i]
+        if row == previous_row:
+            return False
+
+        bitboard.update_row(i, row)
+        row_codes = row.translate(CODES_BY_BYTE)
+        row_start = i * self.__width
+        self.__codes[row_start:row_start + len(row_codes)] = row_codes
+        for j, code in enumerate(row_codes):
+            if previous_row[j] == row[j]:
+                continue
 
-    def update_cell(self, j: int, i: int, cell_type: str):
-        cell = self.get_by_coordinates(Coordinates(j, i))
-        cell.type = LocationType(cell_type)
+            cell = self.__grid[row_start + j]
+            self.__set_code(cell, code)
+            changed_coordinates.add(cell.coordinates)
+
+        self.__rows[i] = row
+
+        return True
+
+    def __finish_update(
+            self,
+            started_at: float,
+            changed_coordinates: Set[Coordinates],
+            changed_row_indexes: Set[int]
+    ) -> Set[Coordinates]:
+        Profiler.stop('rows', started_at)
+        Profiler.count('changed cells', len(changed_coordinates))
+
+        started_at = Profiler.start()
+        self.__update_frontier(changed_row_indexes)
+        Profiler.stop('frontier', started_at)
+
+        return changed_coordinates
+
+    def __set_code(self, cell: Cell, code: int):
+        cell.code = code
         if not self.start and cell.is_start():
             self.start = cell
 
         if not self.control and cell.is_control():
             self.control = cell
 
+    def __update_frontier(self, changed_row_indexes: Set[int]):
+        """ only the changed rows and rows around them can start or stop bordering with unknown """
+        bitboard = self.get_bitboard()
+        row_indexes = set()
+        for i in changed_row_indexes:
+            row_indexes.update(range(max(0, i - 1), min(bitboard.height, i + 2)))
+
+        for i in row_indexes:
+            for j in Bitboard.get_bits(bitboard.update_frontier_row(i)):
+                index = i * self.__width + j
+                if bitboard.frontier[i] >> j & 1:
+                    self.__frontier[index] = self.__grid[index]
+                else:
+                    self.__frontier.pop(index, None)
+
+    def get_frontier(self, region: Optional[int] = None) -> 'CellCollection':
+        """ passable cells of the region (or of all regions) which border with unknown """
+        frontier = CellCollection()
+        for cell in self.__frontier.values():
+            if region is None or cell.region == region:
+                frontier.add(cell)
+
+        return frontier
+
     def add(self, element_to_add: Cell):
         self.__map.setdefault(element_to_add.coordinates.x, {})[element_to_add.coordinates.y] = element_to_add
+        self.__grid = []
         super().add(element_to_add)
 
+    def get_grid(self) -> List[Cell]:
+        """ all cells by index y * width + x """
+        if not self.__grid:
+            self.__build_grid()
+
+        return self.__grid
+
+    def get_bitboard(self) -> Bitboard:
+        if not self.__grid:
+            self.__build_grid()
+
+        return self.__bitboard
+
+    def get_codes(self) -> bytearray:
+        """ codes of the cell types by index, PASSABLE_BY_CODE tells which are passable """
+        if not self.__grid:
+            self.__build_grid()
+
+        return self.__codes
+
+    def get_index(self, cell: Cell) -> int:
+        return cell.coordinates.y * self.__width + cell.coordinates.x
+
+    def get_neighbours(self, cell: Cell) -> Tuple[Cell, ...]:
+        if not self.__grid:
+            self.__build_grid()
+
+        return self.__neighbours[self.get_index(cell)]
+
+    def get_neighbour_indexes(self) -> List[Tuple[int, ...]]:
+        """ indexes of the cells around, by index of the cell """
+        if not self.__grid:
+            self.__build_grid()
+
+        return self.__neighbour_indexes
+
+    def __build_grid(self):
+        """ map size never changes, so the grid and cells around are calculated once """
+        self.__width = len(self.__map)
+        height = max([len(column) for column in self.__map.values()] or [0])
+        columns = [self.__map.get(x, {}) for x in range(self.__width)]
+        self.__grid = [columns[x].get(y) for y in range(height) for x in range(self.__width)]
+        self.__codes = bytearray(cell.code for cell in self.__grid)
+        # cells are unknown until the first rows come, so only the revealed ones are reported as changed
+        self.__rows = [b'?' * self.__width] * height
+        self.__bitboard = Bitboard(self.__width, height)
+
+        # neighbours by index arithmetic, it is the most of the first turn on big maps
+        grid = self.__grid
+        width = self.__width
+        steps = [(vector.x, vector.y, vector.y * width + vector.x) for vector in VECTORS.values()]
+        self.__neighbours = []
+        self.__neighbour_indexes = []
+        for index in range(len(grid)):
+            x = index % width
+            y = index // width
+            indexes_around = tuple([
+                index + step for step_x, step_y, step in steps
+                if 0 <= x + step_x < width and 0 <= y + step_y < height and grid[index + step]
+            ])
+            self.__neighbours.append(tuple([grid[index_around] for index_around in indexes_around]))
+            self.__neighbour_indexes.append(indexes_around)
+
     def get_by_coordinates(self, coordinates: Coordinates) -> Optional[Cell]:
         return self.__map.get(coordinates.x, {}).get(coordinates.y, None)
 
-    def is_near_unknown(self, coordinates: Coordinates) -> bool:
-        for vector in VECTORS.values():
-            cell_around = self.get_by_coordinates(coordinates + vector)
-            if cell_around and cell_around.is_unknown():
+    def is_near_unknown(self, cell: Cell) -> bool:
+        for cell_around in self.get_neighbours(cell):
+            if cell_around.is_unknown():
                 return True
 
         return False
 
-    def get_passable_cells_around(
-            self,
-            coordinates: Coordinates,
-            explored_grid: List[Cell],
-            new_cells_to_look_around: List[Cell],
-            distance_to_target: int,
-            player
-    ):
-        passable_cells_around = []
-        for vector in VECTORS.values():
-            cell_around = self.get_by_coordinates(coordinates + vector)
-            if cell_around is player:
-                raise Exception
-
-            if not cell_around or not cell_around.is_passable():
-                continue
+    def get_all_cells_of_region(self, region: int) -> 'CellCollection':
+        return CellCollection(list(self.get_region_cells(region)))
 
-            if cell_around in explored_grid:
-                continue
+    def get_region_cells(self, region: int) -> List[Cell]:
+        """ cells of the passable region, the list must not be changed """
+        return self.__regions.get(region, [])
 
-            if cell_around in new_cells_to_look_around:
-                continue
+    def get_region_size(self, region: int) -> int:
+        return len(self.__regions.get(region, []))
 
-            cell_around.distance_to_target = distance_to_target
-            passable_cells_around.append(cell_around)
+    def get_region(self, coordinates: Coordinates) -> int:
+        cell = self.get_by_coordinates(coordinates)
 
-        return passable_cells_around
+        return cell.region if cell else 0
 
-    def get_all_cells_of_region(self, region: int) -> 'CellCollection':
-        all_of_region = CellCollection()
-        for cell in self:
-            if cell.region == region:
-                all_of_region.add(cell)
+    def add_to_region(self, cell: Cell, region: int):
+        cell.region = region
+        self.__regions.setdefault(region, []).append(cell)
+
+    def merge_regions(self, region: int, merged_region: int):
+        merged_cells = self.__regions.pop(merged_region, [])
+        for cell in merged_cells:
+            cell.region = region
+
+        self.__regions.setdefault(region, []).extend(merged_cells)
 
-        return all_of_region
+    def index_regions(self):
+        """ rebuilds the index after regions of all cells were assigned """
+        self.__regions = {}
+        for cell in self.get_grid():
+            if cell.region != 0:
+                self.__regions.setdefault(cell.region, []).append(cell)
 
     def get_closest(self, cell_to_find: Cell) -> Cell:
         closest_distance = 999999
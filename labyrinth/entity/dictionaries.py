@@ -24,3 +24,16 @@ VECTORS = {
     Direction.UP: Coordinates(0, -1),
     Direction.DOWN: Coordinates(0, 1)
 }
+
+# cells keep compact codes: index of the type in LOCATION_TYPES_BY_CODE
+LOCATION_TYPES_BY_CODE = (
+    LocationType.UNKNOWN,
+    LocationType.EMPTY,
+    LocationType.START,
+    LocationType.CONTROL_ROOM,
+    LocationType.WALL
+)
+UNKNOWN_CODE, EMPTY_CODE, START_CODE, CONTROL_ROOM_CODE, WALL_CODE = range(len(LOCATION_TYPES_BY_CODE))
+# 256 entries: ASCII byte of the cell to its code, bytes.translate() converts a whole row at once
+CODES_BY_BYTE = bytes.maketrans(b'?.TC#', bytes(range(len(LOCATION_TYPES_BY_CODE))))
+PASSABLE_BY_CODE = bytes([0, 1, 1, 1, 0])
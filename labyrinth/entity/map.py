@@ -1,4 +1,8 @@
+from common.coordinates import Coordinates
+
+
 class Map:
     def __init__(self, width: int, height: int):
         self.width: int = width
         self.height: int = height
+        Coordinates.intern(width, height)
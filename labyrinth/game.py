@@ -5,8 +5,10 @@ from entity.map import Map
 
 
 class Game:
-    def __init__(self, game_map: Map):
+    def __init__(self, game_map: Map, alarm_rounds: Optional[int] = None):
         self.map: Map = game_map
+        # rounds to get back to the start after the control room is reached
+        self.alarm_rounds: Optional[int] = alarm_rounds
         self.cells: CellCollection = CellCollection()
         self.player: Optional[Cell] = None
         self.time_is_running: bool = False
@@ -0,0 +1,161 @@
+from array import array
+from heapq import heappush, heappop
+from typing import Optional, List, Tuple, Iterable
+
+from common.coordinates import Coordinates
+from common.deadline import Deadline
+from entity.cell import Cell, CellCollection
+from service.profiler import Profiler
+
+
+class DStarLite:
+    """
+    Incremental shortest path to a fixed goal from a moving source, based on D* Lite (optimised version) from
+    http://idm-lab.org/bib/abstracts/papers/aaai02b.pdf
+
+    Distances are kept from the goal, so when cells change only the vertices they affect are expanded again
+    and the search state survives the source moving. Only known passable cells are traversable,
+    through_unknown adds unknown ones for an optimistic distance.
+    With a deadline the search stops once the turn time is over and continues on the next call
+    """
+    INFINITY = 2 ** 30
+
+    def __init__(
+            self,
+            cells: CellCollection,
+            goal: Cell,
+            deadline: Optional[Deadline] = None,
+            through_unknown: bool = False
+    ):
+        self.__cells = cells
+        self.__deadline = deadline
+        self.__through_unknown = through_unknown
+        self.__grid = cells.get_grid()
+        self.__neighbour_indexes = cells.get_neighbour_indexes()
+        self.__goal_index = cells.get_index(goal)
+        self.__distances = array('i', [self.INFINITY]) * len(self.__grid)
+        self.__lookaheads = array('i', [self.INFINITY]) * len(self.__grid)
+        self.__queued_keys: List[Optional[Tuple[int, int]]] = [None] * len(self.__grid)
+        self.__queue: List[Tuple[int, int, int]] = []
+        self.__key_modifier = 0
+        # keys are lower bounds until the source is known, outdated ones are corrected when popped
+        self.__source_index = self.__goal_index
+        self.expanded_nodes: int = 0
+        self.timed_out: bool = False
+
+        self.__lookaheads[self.__goal_index] = 0
+        self.__push(self.__goal_index, self.__get_key(self.__goal_index))
+
+    def update_cells(self, changed_coordinates: Iterable[Coordinates]):
+        """ only the changed cells and cells around them can get another lookahead distance """
+        for coordinates in changed_coordinates:
+            index = self.__cells.get_index(self.__cells.get_by_coordinates(coordinates))
+            self.__update_vertex(index)
+            for neighbour_index in self.__neighbour_indexes[index]:
+                self.__update_vertex(neighbour_index)
+
+    def get_next_cell(self, player: Cell) -> Optional[Cell]:
+        """ None when the goal is not reachable or the search is out of time """
+        if self.get_distance(player) >= self.INFINITY:
+            return None
+
+        player_index = self.__cells.get_index(player)
+        next_index = min(self.__neighbour_indexes[player_index], key=lambda index: self.__distances[index])
+        if self.__distances[next_index] >= self.INFINITY:
+            return None
+
+        return self.__grid[next_index]
+
+    def get_distance(self, source: Cell) -> int:
+        """ INFINITY when the goal is not reachable or the search is out of time """
+        source_index = self.__cells.get_index(source)
+        self.__key_modifier += self.__grid[self.__source_index].coordinates.get_manhattan_distance(source.coordinates)
+        self.__source_index = source_index
+
+        started_at = Profiler.start()
+        self.__compute_shortest_path()
+        Profiler.stop('search', started_at)
+        Profiler.count('expanded nodes', self.expanded_nodes)
+        if self.timed_out:
+            return self.INFINITY
+
+        return self.__distances[source_index]
+
+    def __compute_shortest_path(self):
+        source_index = self.__source_index
+        self.expanded_nodes = 0
+        self.timed_out = False
+        distances = self.__distances
+        lookaheads = self.__lookaheads
+        queue = self.__queue
+        while True:
+            self.__drop_outdated()
+            if not queue:
+                break
+
+            source_key = self.__get_key(source_index)
+            if queue[0][:2] >= source_key and lookaheads[source_index] == distances[source_index]:
+                break
+
+            self.expanded_nodes += 1
+            if self.__is_out_of_time():
+                break
+
+            old_key = queue[0][:2]
+            index = heappop(queue)[2]
+            self.__queued_keys[index] = None
+            new_key = self.__get_key(index)
+            if old_key < new_key:
+                self.__push(index, new_key)
+            elif distances[index] > lookaheads[index]:
+                distances[index] = lookaheads[index]
+                for neighbour_index in self.__neighbour_indexes[index]:
+                    self.__update_vertex(neighbour_index)
+            else:
+                distances[index] = self.INFINITY
+                self.__update_vertex(index)
+                for neighbour_index in self.__neighbour_indexes[index]:
+                    self.__update_vertex(neighbour_index)
+
+    def __update_vertex(self, index: int):
+        if index != self.__goal_index:
+            lookahead = self.INFINITY
+            if self.__is_traversable(self.__grid[index]):
+                for neighbour_index in self.__neighbour_indexes[index]:
+                    distance = self.__distances[neighbour_index]
+                    if distance < lookahead and self.__is_traversable(self.__grid[neighbour_index]):
+                        lookahead = distance
+
+            self.__lookaheads[index] = min(self.INFINITY, lookahead + 1)
+
+        if self.__distances[index] != self.__lookaheads[index]:
+            self.__push(index, self.__get_key(index))
+        else:
+            self.__queued_keys[index] = None
+
+    def __push(self, index: int, key: Tuple[int, int]):
+        if self.__queued_keys[index] == key:
+            return
+
+        self.__queued_keys[index] = key
+        heappush(self.__queue, (key[0], key[1], index))
+
+    def __drop_outdated(self):
+        """ vertices are queued again instead of being updated in the queue, only the last key counts """
+        queue = self.__queue
+        while queue and self.__queued_keys[queue[0][2]] != queue[0][:2]:
+            heappop(queue)
+
+    def __get_key(self, index: int) -> Tuple[int, int]:
+        shortest = min(self.__distances[index], self.__lookaheads[index])
+        heuristic = self.__grid[index].coordinates.get_manhattan_distance(self.__grid[self.__source_index].coordinates)
+
+        return shortest + heuristic + self.__key_modifier, shortest
+
+    def __is_traversable(self, cell: Cell) -> bool:
+        return cell.is_passable() or self.__through_unknown and cell.is_unknown()
+
+    def __is_out_of_time(self) -> bool:
+        self.timed_out = self.__deadline is not None and self.__deadline.is_exceeded_every(self.expanded_nodes)
+
+        return self.timed_out
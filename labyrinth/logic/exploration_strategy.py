@@ -0,0 +1,22 @@
+from abc import abstractmethod, ABC
+from typing import Optional, List
+
+from entity.cell import Cell, CellCollection
+from logic.path_finder import PathFinder
+
+
+class ExplorationStrategy(ABC):
+    """
+    Picks the frontier cell to explore next, the path has the same order as PathFinder paths.
+    With KEEPS_TARGET the path is cached for its target, else for the closest frontier cell
+    """
+    KEEPS_TARGET = False
+
+    @abstractmethod
+    def get_path(self, path_finder: PathFinder, frontier: CellCollection, avoided: Optional[Cell]) -> List[Cell]:
+        pass
+
+
+class ClosestFrontierStrategy(ExplorationStrategy):
+    def get_path(self, path_finder: PathFinder, frontier: CellCollection, avoided: Optional[Cell]) -> List[Cell]:
+        return path_finder.get_path_to_closest(frontier, avoided)
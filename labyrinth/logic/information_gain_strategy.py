@@ -0,0 +1,70 @@
+from typing import Optional, List
+
+from common.coordinates import Coordinates
+from entity.bitboard import Bitboard
+from entity.cell import Cell, CellCollection
+from game import Game
+from logic.exploration_strategy import ExplorationStrategy
+from logic.path_finder import PathFinder
+
+
+class InformationGainStrategy(ExplorationStrategy):
+    """
+    Frontier cell where the scanner reveals the most unknown cells for the steps to it,
+    a gain of 2 unknown cells pays for 1 step. While the control room is seen but not connected to the player,
+    every step of Manhattan distance from it costs 1 more. The target is kept until it stops bordering with unknown.
+    Steps come from one distance field of the player, unknown cells are counted on the bitboard rows of the window
+    """
+    SCANNER_RADIUS = 2
+    KEEPS_TARGET = True
+    GAIN_WEIGHT = 0.5
+
+    def __init__(self, game: Game):
+        self.__game = game
+
+    def get_path(self, path_finder: PathFinder, frontier: CellCollection, avoided: Optional[Cell]) -> List[Cell]:
+        # the closest frontier cell reveals at least 1 cell, a cell this much further can't beat it on gain
+        max_gain = (2 * self.SCANNER_RADIUS + 1) ** 2 - 1
+        slack = int((max_gain - 1) * self.GAIN_WEIGHT)
+        distances, parents = path_finder.get_distance_field(avoided, frontier, slack)
+        if path_finder.timed_out:
+            return []
+
+        cells = self.__game.cells
+        bitboard = cells.get_bitboard()
+        control = cells.control
+        if control and control.region == self.__game.player.region:
+            control = None
+
+        best_cell = None
+        best_score = None
+        for cell in frontier:
+            distance = distances[cells.get_index(cell)]
+            if distance < 0:
+                continue
+
+            score = self.__count_unknown(bitboard, cell.coordinates) * self.GAIN_WEIGHT - distance
+            if control:
+                score -= cell.coordinates.get_manhattan_distance(control.coordinates)
+
+            if best_score is None or score > best_score:
+                best_cell = cell
+                best_score = score
+
+        if not best_cell:
+            return []
+
+        return path_finder.get_path_by_parents(parents, best_cell)
+
+    def __count_unknown(self, bitboard: Bitboard, coordinates: Coordinates) -> int:
+        """ unknown cells the scanner would reveal from the coordinates """
+        window = (1 << (2 * self.SCANNER_RADIUS + 1)) - 1
+        left = coordinates.x - self.SCANNER_RADIUS
+        top = max(0, coordinates.y - self.SCANNER_RADIUS)
+        bottom = min(bitboard.height, coordinates.y + self.SCANNER_RADIUS + 1)
+        count = 0
+        for y in range(top, bottom):
+            row = bitboard.unknown[y] >> left if left >= 0 else bitboard.unknown[y] << -left
+            count += bin(row & window).count('1')
+
+        return count
@@ -1,65 +1,199 @@
-from typing import List
+from typing import List, Optional, Iterable
 
-from entity.cell import Cell, CellCollection
+from common.coordinates import Coordinates
+from common.deadline import Deadline
+from entity.cell import Cell
 from entity.dictionaries import Direction
 from game import Game
-from logic.path_finder import PathFinder
+from logic.d_star_lite import DStarLite
+from logic.exploration_strategy import ExplorationStrategy, ClosestFrontierStrategy
+from logic.path_cache import PathCache
+from logic.path_finder import PathFinder, SearchMode
+from service.profiler import Profiler
 from service.vector_move_definer import DirectionDefiner
 
 
 class DirectionDispatcher:
-    def __init__(self, game: Game):
+    """
+    With a deadline searches give up when the turn time is over,
+    then the player continues the previous path or steps greedily towards the targets.
+    Paths are cached until update_paths() gets a change which can affect them,
+    the way back to the start is repaired incrementally.
+    The control room is visited before the whole region is explored only when the way back fits in the alarm.
+    Exploration strategy picks which frontier cell is explored next, the closest one by default
+    """
+
+    def __init__(
+            self,
+            game: Game,
+            deadline: Optional[Deadline] = None,
+            exploration_strategy: Optional[ExplorationStrategy] = None
+    ):
         self.__game: Game = game
-        self.__path_finder = PathFinder(game)
-        self.__path_to_start: List[Cell] = []
-        self.__path_to_control: List[Cell] = []
+        self.__deadline: Optional[Deadline] = deadline
+        self.__path_finder = PathFinder(game, deadline)
+        self.__exploration_strategy: ExplorationStrategy = exploration_strategy or ClosestFrontierStrategy()
+        self.__path_to_start: Optional[DStarLite] = None
+        self.__optimistic_path_to_start: Optional[DStarLite] = None
+        self.__is_return_proven: Optional[bool] = None
+        self.__path_cache = PathCache(game.cells)
+        self.__path_to_unknown: List[Cell] = []
+        self.__exploration_target: Optional[Cell] = None
+        self.__previous_cell: Optional[Cell] = None
 
     def get_next_direction(self) -> Direction:
+        self.__game.cells.get_bitboard().visit(self.__game.player.coordinates)
         next_cell = self.__get_next_cell()
+        self.__previous_cell = self.__game.player
 
         return DirectionDefiner.get_direction(next_cell.coordinates, self.__game.player.coordinates)
 
-    def __get_next_cell(self) -> Cell:
-        # Player needs to return to the start if time is running
-        if self.__game.time_is_running:
-            if not self.__path_to_start:
-                # save to cache, to not calculate each time
-                self.__path_to_start = self.__path_finder.get_path(self.__game.cells.start)
-
-            return self.__path_to_start.pop()
-
-        region_cells = self.__game.cells.get_all_cells_of_region(self.__game.player.region)
-        cells_border_with_unknown = self.__get_cells_near_unknown(region_cells)
-
-        # If region is not yet fully explored
-        if cells_border_with_unknown:
-            closest_path = self.__find_closest_path_to_unknown(cells_border_with_unknown)
-
-            return closest_path.pop()
+    def update_paths(self, changed_coordinates: Iterable[Coordinates]):
+        """ called every turn with cells changed since the previous one """
+        changed_coordinates = list(changed_coordinates)
+        self.__path_cache.invalidate(changed_coordinates)
+        if self.__path_to_start:
+            self.__path_to_start.update_cells(changed_coordinates)
 
-        if not self.__path_to_control:
-            # save to cache, to not calculate each time
-            self.__path_to_control = self.__path_finder.get_path(self.__game.cells.control)
+        if self.__optimistic_path_to_start:
+            self.__optimistic_path_to_start.update_cells(changed_coordinates)
 
-        return self.__path_to_control.pop()
+        if changed_coordinates:
+            self.__is_return_proven = None
 
-    def __find_closest_path_to_unknown(self, cells_border_with_unknown):
-        closest_path_length = 9999999
-        closest_path = None
-
-        # choose between several paths to avoid loops
-        for cell_borders_with_unknown in cells_border_with_unknown.get_with_limit(2):
-            path_to_unknown = self.__path_finder.get_path(cell_borders_with_unknown)
-            if len(path_to_unknown) < closest_path_length:
-                closest_path_length = len(path_to_unknown)
-                closest_path = path_to_unknown
-
-        return closest_path
-
-    def __get_cells_near_unknown(self, region_cells: CellCollection) -> CellCollection:
-        cells_near_unknown = CellCollection()
-        for region_cell in region_cells:
-            if self.__game.cells.is_near_unknown(region_cell.coordinates):
-                cells_near_unknown.add(region_cell)
-
-        return cells_near_unknown
+    def __get_next_cell(self) -> Cell:
+        player = self.__game.player
+        # Player needs to return to the start if time is running
+        if self.__game.time_is_running:
+            next_cell = self.__get_path_to_start().get_next_cell(player)
+
+            return next_cell or self.__get_greedy_cell([self.__game.cells.start])
+
+        # regions are behind when their update was out of time
+        if not self.__game.player.region:
+            return self.__continue_path_to_unknown() or self.__get_greedy_cell(self.__game.cells.get_frontier())
+
+        started_at = Profiler.start()
+        cells_border_with_unknown = self.__game.cells.get_frontier(self.__game.player.region)
+        Profiler.stop('frontier', started_at)
+
+        # If region is not yet fully explored and the way back from the control room may be too long
+        if cells_border_with_unknown and not self.__can_visit_control():
+            next_cell = self.__path_cache.get_next_cell(player, self.__exploration_target)
+            if next_cell:
+                return next_cell
+
+            # stepping on the control room starts the alarm
+            path_to_unknown = self.__exploration_strategy.get_path(
+                self.__path_finder, cells_border_with_unknown, self.__game.cells.control
+            )
+            if self.__path_finder.timed_out:
+                return self.__continue_path_to_unknown() or self.__get_greedy_cell(cells_border_with_unknown)
+
+            # the same list, so the path continues from the cache or without it when the cache drops it
+            self.__path_to_unknown = path_to_unknown
+            # entries are kept by target, so the abandoned target would be checked on every change
+            self.__path_cache.drop(self.__exploration_target)
+            self.__exploration_target = None
+            if path_to_unknown and self.__exploration_strategy.KEEPS_TARGET:
+                self.__exploration_target = path_to_unknown[0]
+
+            self.__path_cache.put(player, self.__exploration_target, path_to_unknown)
+            next_cell = self.__path_cache.get_next_cell(player, self.__exploration_target)
+            if next_cell:
+                return next_cell
+
+        control = self.__game.cells.control
+        next_cell = self.__path_cache.get_next_cell(player, control) if control else None
+        if next_cell:
+            return next_cell
+
+        # regions are kept by RegionsTracker, so it is a comparison instead of a flood
+        if control and control.region and control.region == player.region:
+            self.__path_cache.put(player, control, self.__path_finder.get_path(control, SearchMode.A_STAR))
+            if self.__path_finder.timed_out:
+                return self.__get_greedy_cell([control])
+
+            next_cell = self.__path_cache.get_next_cell(player, control)
+            if next_cell:
+                return next_cell
+
+        # the control room is not known or not reachable through the regions updated so far
+        return self.__continue_path_to_unknown() or self.__get_greedy_cell(self.__game.cells.get_frontier())
+
+    def __can_visit_control(self) -> bool:
+        """ the known way back fits in the alarm or exploring can't make it shorter, checked once per map change """
+        control = self.__game.cells.control
+        if not control or self.__game.alarm_rounds is None or control.region != self.__game.player.region:
+            return False
+
+        if self.__is_return_proven is None:
+            distance = self.__get_path_to_start().get_distance(control)
+            if distance >= DStarLite.INFINITY:
+                # out of time, the check continues on the next turn
+                return False
+
+            if distance <= self.__game.alarm_rounds:
+                self.__is_return_proven = True
+            else:
+                if not self.__optimistic_path_to_start:
+                    self.__optimistic_path_to_start = DStarLite(
+                        self.__game.cells, self.__game.cells.start, self.__deadline, through_unknown=True
+                    )
+
+                optimistic_distance = self.__optimistic_path_to_start.get_distance(control)
+                if self.__optimistic_path_to_start.timed_out:
+                    return False
+
+                self.__is_return_proven = optimistic_distance >= distance
+
+        return self.__is_return_proven
+
+    def __get_path_to_start(self) -> DStarLite:
+        if not self.__path_to_start:
+            self.__path_to_start = DStarLite(self.__game.cells, self.__game.cells.start, self.__deadline)
+
+        return self.__path_to_start
+
+    def __continue_path_to_unknown(self) -> Optional[Cell]:
+        """ previous path is still good while its next cell is next to the player """
+        if not self.__path_to_unknown:
+            return None
+
+        next_cell = self.__path_to_unknown[-1]
+        if not next_cell.is_passable() or not next_cell.coordinates.is_near(self.__game.player.coordinates):
+            self.__path_to_unknown = []
+            return None
+
+        return self.__path_to_unknown.pop()
+
+    def __get_greedy_cell(self, targets: Iterable[Cell]) -> Cell:
+        """
+        passable cell around the player closest to any target, unvisited win ties, going back is the last option.
+        The control room is stepped on only when the way back is proven or there is no other cell
+        """
+        player = self.__game.player
+        bitboard = self.__game.cells.get_bitboard()
+        neighbours = self.__game.cells.get_neighbours(player)
+        control = self.__game.cells.control
+        avoided = None
+        if control in neighbours and not self.__game.time_is_running and not self.__can_visit_control():
+            avoided = control
+
+        targets = list(targets)
+        greedy_cell = None
+        greedy_distance = None
+        for cell in neighbours:
+            if not cell.is_passable() or cell is avoided:
+                continue
+
+            distance = min([cell.coordinates.get_manhattan_distance(target.coordinates) for target in targets], default=0)
+            distance = distance * 2 + bitboard.is_visited(cell.coordinates)
+            if cell is self.__previous_cell:
+                distance += len(self.__game.cells) * 2
+
+            if greedy_distance is None or distance < greedy_distance:
+                greedy_cell = cell
+                greedy_distance = distance
+
+        return greedy_cell or avoided
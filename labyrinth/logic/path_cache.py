@@ -0,0 +1,81 @@
+from typing import Optional, List, Set, Tuple, Dict, Iterable
+
+from common.coordinates import Coordinates
+from entity.cell import Cell, CellCollection
+
+
+class PathCache:
+    """
+    Paths by (source, target), target None is the closest frontier cell.
+    A path stays while the player follows it and is dropped only when a changed cell can block it,
+    change its target or open a shorter route: it lies on the path, next to the target,
+    or is passable and closer than the path length by Manhattan distance
+    """
+
+    def __init__(self, cells: CellCollection):
+        self.__cells = cells
+        self.__entries: Dict[Optional[int], Tuple[int, List[Cell], Set[int]]] = {}
+
+    def put(self, source: Cell, target: Optional[Cell], path: List[Cell]):
+        if not path:
+            self.drop(target)
+            return
+
+        path_indexes = {self.__cells.get_index(cell) for cell in path}
+        self.__entries[self.__get_target_key(target)] = (self.__cells.get_index(source), path, path_indexes)
+
+    def get_next_cell(self, source: Cell, target: Optional[Cell]) -> Optional[Cell]:
+        """ pops the next step, the rest of the path is kept for the next source """
+        target_key = self.__get_target_key(target)
+        entry = self.__entries.pop(target_key, None)
+        if not entry or entry[0] != self.__cells.get_index(source):
+            return None
+
+        source_index, path, path_indexes = entry
+        next_cell = path.pop()
+        if path:
+            self.__entries[target_key] = (self.__cells.get_index(next_cell), path, path_indexes)
+
+        return next_cell
+
+    def invalidate(self, changed_coordinates: Iterable[Coordinates]):
+        changed_coordinates = list(changed_coordinates)
+        grid = self.__cells.get_grid()
+        for target_key, (source_index, path, path_indexes) in list(self.__entries.items()):
+            source = grid[source_index].coordinates
+            for coordinates in changed_coordinates:
+                if self.__is_affected(source, target_key is None, path, path_indexes, coordinates):
+                    del self.__entries[target_key]
+                    break
+
+    def drop(self, target: Optional[Cell]):
+        self.__entries.pop(self.__get_target_key(target), None)
+
+    def __is_affected(
+            self,
+            source: Coordinates,
+            to_closest: bool,
+            path: List[Cell],
+            path_indexes: Set[int],
+            coordinates: Coordinates
+    ) -> bool:
+        target = path[0].coordinates
+        if coordinates.is_near(target):
+            return True
+
+        cell = self.__cells.get_by_coordinates(coordinates)
+        if self.__cells.get_index(cell) in path_indexes:
+            return True
+
+        if not cell.is_passable():
+            return False
+
+        # any route through the cell is at least this long
+        shortest_distance = source.get_manhattan_distance(coordinates)
+        if not to_closest:
+            shortest_distance += coordinates.get_manhattan_distance(target)
+
+        return shortest_distance < len(path)
+
+    def __get_target_key(self, target: Optional[Cell]) -> Optional[int]:
+        return self.__cells.get_index(target) if target else None
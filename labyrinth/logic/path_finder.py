@@ -1,77 +1,259 @@
-from typing import List
+from array import array
+from collections import deque
+from enum import Enum
+from heapq import heappush, heappop
+from typing import List, Optional, Callable, Iterable, Tuple
 
-from entity.cell import Cell, CellCollection
+from common.coordinates import Coordinates
+from common.deadline import Deadline
+from entity.cell import Cell
+from entity.dictionaries import PASSABLE_BY_CODE
 from game import Game
+from service.profiler import Profiler
+
+
+class SearchMode(Enum):
+    BFS = 'BFS'
+    A_STAR = 'A_STAR'
 
 
 class PathFinder:
     """
     Based on the basic Sample algorythm from https://en.wikipedia.org/wiki/Pathfinding
-    Can be improved with A* though http://theory.stanford.edu/~amitp/GameProgramming/AStarComparison.html
+    and on A* from http://theory.stanford.edu/~amitp/GameProgramming/AStarComparison.html
+
+    The search works on a flat grid: cell with coordinates (x, y) has index y * width + x.
+    With a deadline the search gives up once the turn time is over, then the path is empty and timed_out is set
     """
+    UNVISITED = -1
+    AVOIDED = -2
 
-    def __init__(self, game: Game):
+    def __init__(self, game: Game, deadline: Optional[Deadline] = None):
         self.__game: Game = game
+        self.__deadline: Optional[Deadline] = deadline
+        self.expanded_nodes: int = 0
+        self.total_expanded_nodes: int = 0
+        self.timed_out: bool = False
+
+    def get_path(
+            self,
+            target: Cell,
+            mode: SearchMode = SearchMode.BFS,
+            heuristic: Optional[Callable[[Coordinates, Coordinates], int]] = None
+    ) -> List[Cell]:
+        started_at = self.__start_search()
+        player = self.__game.player
+        if target is player:
+            return []
+
+        if mode == SearchMode.A_STAR:
+            parents = self.__search_a_star(target, heuristic or Coordinates.get_manhattan_distance)
+        else:
+            parents = self.__flood([target], goals=[player])[1]
+
+        self.__stop_search(started_at)
+        if self.timed_out:
+            return []
+
+        return self.__build_path(parents)
+
+    def get_path_to_closest(self, targets: Iterable[Cell], avoided: Optional[Cell] = None) -> List[Cell]:
+        """ floods from all targets at once, the path leads to the one closest to the player, not through avoided """
+        started_at = self.__start_search()
+        parents = self.__flood(targets, avoided, [self.__game.player])[1]
+        self.__stop_search(started_at)
+        if self.timed_out:
+            return []
+
+        return self.__build_path(parents)
+
+    def get_distance_field(
+            self,
+            avoided: Optional[Cell] = None,
+            targets: Iterable[Cell] = (),
+            slack: Optional[int] = None
+    ) -> Tuple[array, array]:
+        """
+        distances from the player to reachable cells and parents towards the player, negative when not reached.
+        With targets and slack the flood stops slack steps past the closest target
+        """
+        started_at = self.__start_search()
+        distances, parents = self.__flood([self.__game.player], avoided, targets, slack)
+        self.__stop_search(started_at)
+
+        return distances, parents
+
+    def get_path_by_parents(self, parents: array, target: Cell) -> List[Cell]:
+        """ path to the target from parents of get_distance_field() """
+        cells = self.__game.cells
+        grid = cells.get_grid()
+        index = cells.get_index(target)
+        if parents[index] == self.UNVISITED:
+            return []
+
+        started_at = Profiler.start()
+        path = []
+        while parents[index] != index:
+            path.append(grid[index])
+            index = parents[index]
+
+        Profiler.stop('path', started_at)
+
+        return path
+
+    def __start_search(self) -> float:
+        self.expanded_nodes = 0
+        self.timed_out = False
+
+        return Profiler.start()
+
+    def __stop_search(self, started_at: float):
+        Profiler.stop('search', started_at)
+        Profiler.count('expanded nodes', self.expanded_nodes)
+        self.total_expanded_nodes += self.expanded_nodes
+
+    def __flood(
+            self,
+            sources: Iterable[Cell],
+            avoided: Optional[Cell] = None,
+            goals: Iterable[Cell] = (),
+            slack: Optional[int] = None
+    ) -> Tuple[array, array]:
+        """
+        distances to the closest source and parents towards it. The flood stops once a goal is reached,
+        with slack it goes on up to slack steps past the closest goal
+        """
+        cells = self.__game.cells
+        grid = cells.get_grid()
+        neighbour_indexes = cells.get_neighbour_indexes()
+        codes = cells.get_codes()
+        is_goal = bytearray(len(grid))
+        for goal in goals:
+            is_goal[cells.get_index(goal)] = 1
+
+        distances = array('i', [self.UNVISITED]) * len(grid)
+        parents = array('i', [self.UNVISITED]) * len(grid)
+        if avoided:
+            distances[cells.get_index(avoided)] = self.AVOIDED
+
+        frontier = deque()
+        for source in sources:
+            source_index = cells.get_index(source)
+            if distances[source_index] == self.AVOIDED:
+                continue
+
+            distances[source_index] = 0
+            parents[source_index] = source_index
+            frontier.append(source_index)
 
-    def get_path(self, target: Cell) -> List[Cell]:
-        explored_grid = []
-        distance_to_target = 0
-        target.distance_to_target = distance_to_target
-        explored_grid.append(target)
-
-        cells_to_look_around = [target]
-
-        while True:
-            distance_to_target += 1
-            try:
-                cells_to_look_around = self.__get_new_cells_to_look_around(
-                    cells_to_look_around,
-                    distance_to_target,
-                    explored_grid,
-                    self.__game.player
-                )
-            except Exception:
+        max_distance = len(grid)
+        if any(is_goal[index] for index in frontier):
+            if slack is None:
+                return distances, parents
+
+            max_distance = slack
+
+        while frontier:
+            index = frontier.popleft()
+            if distances[index] >= max_distance:
+                break
+
+            self.expanded_nodes += 1
+            if self.__is_out_of_time():
                 break
 
-            explored_grid += cells_to_look_around
+            for neighbour_index in neighbour_indexes[index]:
+                if distances[neighbour_index] != self.UNVISITED or not PASSABLE_BY_CODE[codes[neighbour_index]]:
+                    continue
+
+                distances[neighbour_index] = distances[index] + 1
+                parents[neighbour_index] = index
+                if is_goal[neighbour_index]:
+                    if slack is None:
+                        return distances, parents
+
+                    max_distance = min(max_distance, distances[neighbour_index] + slack)
+
+                frontier.append(neighbour_index)
 
-        return self.__build_path_from_grid(explored_grid)
+        return distances, parents
 
-    def __get_new_cells_to_look_around(
+    def __search_a_star(
             self,
-            cells_to_look_around: List[Cell],
-            distance_to_target: int,
-            explored_grid: List[Cell],
-            player: Cell
-    ):
-        new_cells_to_look_around = []
-        for cell_to_look_around in cells_to_look_around:
-            new_cells_to_look_around += self.__game.cells.get_passable_cells_around(
-                cell_to_look_around.coordinates,
-                explored_grid,
-                new_cells_to_look_around,
-                distance_to_target,
-                player
-            )
-
-        return new_cells_to_look_around
-
-    def __build_path_from_grid(self, explored_grid: List[Cell]) -> List[Cell]:
-        """ removes redundant cells """
-        clean_path = []
-
-        closest = self.__game.player
-        while explored_grid:
-            cell_with_max_weight = explored_grid[-1]
-            cells_with_max_weight = CellCollection([cell_with_max_weight])
-            for cell in explored_grid:
-                if cell is not cell_with_max_weight and cell.distance_to_target == cell_with_max_weight.distance_to_target:
-                    cells_with_max_weight.add(cell)
-
-            for cell in cells_with_max_weight:
-                explored_grid.remove(cell)
-
-            closest = cells_with_max_weight.get_closest(closest)
-            clean_path.append(closest)
-
-        return clean_path[::-1]
+            target: Cell,
+            heuristic: Callable[[Coordinates, Coordinates], int]
+    ) -> array:
+        """ searches from the target towards the player, so the path keeps the same order as the flood """
+        cells = self.__game.cells
+        grid = cells.get_grid()
+        neighbour_indexes = cells.get_neighbour_indexes()
+        codes = cells.get_codes()
+        player = self.__game.player
+        player_index = cells.get_index(player)
+        target_index = cells.get_index(target)
+
+        parents = array('i', [self.UNVISITED]) * len(grid)
+        distances = array('i', [self.UNVISITED]) * len(grid)
+        closed = bytearray(len(grid))
+        parents[target_index] = target_index
+        distances[target_index] = 0
+
+        estimation = heuristic(target.coordinates, player.coordinates)
+        open_set = [(estimation, estimation, target_index)]
+        while open_set:
+            _, _, index = heappop(open_set)
+            if closed[index]:
+                continue
+
+            if index == player_index:
+                break
+
+            closed[index] = 1
+            self.expanded_nodes += 1
+            if self.__is_out_of_time():
+                break
+
+            distance_to_target = distances[index] + 1
+            for neighbour_index in neighbour_indexes[index]:
+                if closed[neighbour_index]:
+                    continue
+
+                if distances[neighbour_index] != self.UNVISITED and distances[neighbour_index] <= distance_to_target:
+                    continue
+
+                if not PASSABLE_BY_CODE[codes[neighbour_index]]:
+                    continue
+
+                neighbour = grid[neighbour_index]
+
+                parents[neighbour_index] = index
+                distances[neighbour_index] = distance_to_target
+                # on equal estimation the cell closer to the player goes first
+                distance_to_player = heuristic(neighbour.coordinates, player.coordinates)
+                heappush(open_set, (distance_to_target + distance_to_player, distance_to_player, neighbour_index))
+
+        return parents
+
+    def __is_out_of_time(self) -> bool:
+        self.timed_out = self.__deadline is not None and self.__deadline.is_exceeded_every(self.expanded_nodes)
+
+        return self.timed_out
+
+    def __build_path(self, parents: array) -> List[Cell]:
+        """ follows parents from the player to the target, the player itself is not part of the path """
+        cells = self.__game.cells
+        grid = cells.get_grid()
+        index = cells.get_index(self.__game.player)
+        if parents[index] == self.UNVISITED:
+            return []
+
+        started_at = Profiler.start()
+        path = []
+        while parents[index] != index:
+            index = parents[index]
+            path.append(grid[index])
+
+        path.reverse()
+        Profiler.stop('path', started_at)
+
+        return path
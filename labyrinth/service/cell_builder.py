@@ -5,4 +5,4 @@ from entity.cell import Cell
 class CellBuilder:
     @staticmethod
     def build_cell(x: int, y: int) -> Cell:
-        return Cell(Coordinates(x, y))
+        return Cell(Coordinates.get(x, y))
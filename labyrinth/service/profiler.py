@@ -0,0 +1,74 @@
+import time
+from typing import Dict
+
+from service.log import Logger
+
+
+class Profiler:
+    """
+    Timers of the turn phases and counters, summed up until dump().
+    Disabled by default, then every call returns at once
+    """
+    enabled: bool = False
+    __dump_every: int = 0
+    __turns: int = 0
+    __durations: Dict[str, float] = {}
+    __calls: Dict[str, int] = {}
+    __counters: Dict[str, int] = {}
+
+    @staticmethod
+    def enable(dump_every: int = 0):
+        """ dump_every: number of turns between summaries, 0 to dump only on demand """
+        Profiler.enabled = True
+        Profiler.__dump_every = dump_every
+        Profiler.reset()
+
+    @staticmethod
+    def disable():
+        Profiler.enabled = False
+
+    @staticmethod
+    def reset():
+        Profiler.__turns = 0
+        Profiler.__durations = {}
+        Profiler.__calls = {}
+        Profiler.__counters = {}
+
+    @staticmethod
+    def start() -> float:
+        return time.perf_counter() if Profiler.enabled else 0.0
+
+    @staticmethod
+    def stop(phase: str, started_at: float):
+        if not Profiler.enabled:
+            return
+
+        Profiler.__durations[phase] = Profiler.__durations.get(phase, 0.0) + time.perf_counter() - started_at
+        Profiler.__calls[phase] = Profiler.__calls.get(phase, 0) + 1
+
+    @staticmethod
+    def count(counter: str, value: int = 1):
+        if not Profiler.enabled:
+            return
+
+        Profiler.__counters[counter] = Profiler.__counters.get(counter, 0) + value
+
+    @staticmethod
+    def end_turn():
+        if not Profiler.enabled:
+            return
+
+        Profiler.__turns += 1
+        if Profiler.__dump_every and Profiler.__turns % Profiler.__dump_every == 0:
+            Profiler.dump()
+
+    @staticmethod
+    def dump():
+        summary = ['turns {}'.format(Profiler.__turns)]
+        for phase, duration in Profiler.__durations.items():
+            summary.append('{} {}x {:.1f}ms'.format(phase, Profiler.__calls[phase], duration * 1000))
+
+        for counter, value in Profiler.__counters.items():
+            summary.append('{} {}'.format(counter, value))
+
+        Logger.log(' | '.join(summary))
@@ -1,10 +1,17 @@
-from typing import Tuple
-
-import numpy as np
+from enum import Enum
+from typing import Tuple, List
 
 from common.coordinates import Coordinates
-from entity.cell import CellCollection
+from entity.bitboard import Bitboard
+from entity.cell import Cell, CellCollection
 from entity.map import Map
+from service.profiler import Profiler
+
+
+class RegionsBackend(Enum):
+    SEQUENTIAL = 'SEQUENTIAL'
+    NUMPY = 'NUMPY'
+    BITBOARD = 'BITBOARD'
 
 
 class RegionsExtractor:
@@ -12,27 +19,105 @@ class RegionsExtractor:
     Based on Sequential labeling algorithm from
     https://medium.com/@dellawen1997/connected-component-labeling-midterm-part-1-4b2aebfb277
 
+    NUMPY backend does the same in two vectorised passes: horizontal runs of passable cells get labels,
+    then labels of runs touching vertically are joined by hooking to the smaller label and pointer jumping.
+    BITBOARD backend floods a region from its first passable cell by whole rows, until no passable cell is left
+
     TODO: prettify and refactor
     """
 
-    def __init__(self, cells: CellCollection, game_map: Map):
+    def __init__(self, cells: CellCollection, game_map: Map, backend: RegionsBackend = RegionsBackend.SEQUENTIAL):
         self.__cells = cells
         self.__map = game_map
+        self.__backend = backend
 
     def assign_regions(self):
+        started_at = Profiler.start()
+        if self.__backend == RegionsBackend.NUMPY:
+            self.__assign_regions_vectorised()
+        elif self.__backend == RegionsBackend.BITBOARD:
+            self.__assign_regions_by_flood()
+        else:
+            self.__assign_regions_sequentially()
+
+        self.__cells.index_regions()
+        Profiler.stop('regions', started_at)
+
+    def __assign_regions_vectorised(self):
+        # imported here, so the import time is paid only when the backend is used
+        import numpy as np
+
+        grid = self.__cells.get_grid()
+        passable = np.fromiter((cell.is_passable() for cell in grid), dtype=bool, count=len(grid))
+        passable = passable.reshape(self.__map.height, self.__map.width)
+
+        # first pass: each horizontal run of passable cells gets its own label
+        run_starts = passable.copy()
+        run_starts[:, 1:] &= ~passable[:, :-1]
+        runs = np.cumsum(run_starts).reshape(passable.shape) * passable
+
+        # second pass: runs which touch vertically are equivalent
+        touching = passable[:-1] & passable[1:]
+        upper_runs = runs[:-1][touching]
+        lower_runs = runs[1:][touching]
+
+        labels = np.arange(runs.max() + 1)
+        while upper_runs.size:
+            # every label points to a smaller one, so hooking larger roots to smaller ones can't make loops
+            upper_labels = labels[upper_runs]
+            lower_labels = labels[lower_runs]
+            np.minimum.at(labels, np.maximum(upper_labels, lower_labels), np.minimum(upper_labels, lower_labels))
+
+            jumped_labels = labels[labels]
+            while not np.array_equal(jumped_labels, labels):
+                labels = jumped_labels
+                jumped_labels = labels[labels]
+
+            not_joined = labels[upper_runs] != labels[lower_runs]
+            upper_runs = upper_runs[not_joined]
+            lower_runs = lower_runs[not_joined]
+
+        regions = labels[runs].ravel().tolist()
+        for cell, region in zip(grid, regions):
+            cell.region = region
+
+    def __assign_regions_by_flood(self):
+        grid = self.__cells.get_grid()
+        bitboard = self.__cells.get_bitboard()
+        width = self.__map.width
+        for cell in grid:
+            cell.region = 0
+
+        not_labelled = list(bitboard.passable)
+        region = 0
+        for i in range(self.__map.height):
+            while not_labelled[i]:
+                region += 1
+                first_j = next(Bitboard.get_bits(not_labelled[i]))
+                flooded = bitboard.flood(Coordinates.get(first_j, i))
+                for flooded_i, flooded_row in enumerate(flooded):
+                    if not flooded_row:
+                        continue
+
+                    not_labelled[flooded_i] &= ~flooded_row
+                    for j in Bitboard.get_bits(flooded_row):
+                        grid[flooded_i * width + j].region = region
+
+    def __assign_regions_sequentially(self):
         h = self.__map.height
         w = self.__map.width
         label = 0
         id_ = 0
         link = []
+        grid = self.__cells.get_grid()
 
         for row in range(h):
             for col in range(w):
-                cell = self.__cells.get_by_coordinates(Coordinates(col, row))
+                cell = grid[row * w + col]
                 if not cell.is_passable():
                     cell.region = 0
                 else:
-                    current_neighbors = self.__neighbors(col, row)
+                    current_neighbors = self.__neighbors(grid, col, row)
                     if current_neighbors == (0, 0):
                         label += 1
                         cell.region = label
@@ -53,24 +138,22 @@ class RegionsExtractor:
                                     tmp = set(link[k]).intersection(set(current_neighbors))
                                     if len(tmp) != 0:
                                         link[k] = set(link[k]).union(current_neighbors)
-                                        np.array(link)
                                         check = check + 1
 
                                 if check == 0:
                                     id_ = id_ + 1
-                                    np.array(link)
                                     link.append(set(current_neighbors))
 
         for row in range(h):
             for col in range(w):
                 for x in range(id_):
-                    cell = self.__cells.get_by_coordinates(Coordinates(col, row))
+                    cell = grid[row * w + col]
                     if cell.region in link[x] and cell.region != 0:
                         cell.region = min(link[x])
 
-    def __neighbors(self, i, j) -> Tuple[int, int]:
-        left_cell = self.__cells.get_by_coordinates(Coordinates(i-1, j))
-        above_cell = self.__cells.get_by_coordinates(Coordinates(i, j - 1))
+    def __neighbors(self, grid: List[Cell], i, j) -> Tuple[int, int]:
+        left_cell = grid[j * self.__map.width + i - 1] if i > 0 else None
+        above_cell = grid[(j - 1) * self.__map.width + i] if j > 0 else None
 
         neighbors_tuple = (left_cell.region if left_cell else 0, above_cell.region if above_cell else 0)
 
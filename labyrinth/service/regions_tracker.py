@@ -0,0 +1,89 @@
+from collections import deque
+from typing import Iterable, Optional, Deque
+
+from common.coordinates import Coordinates
+from common.deadline import Deadline
+from common.disjoint_set import DisjointSet
+from entity.cell import CellCollection
+from service.profiler import Profiler
+
+
+class RegionsTracker:
+    """
+    Keeps Cell.region up to date using only the cells changed during the turn.
+    Revealed cells keep their type, so regions can only appear and merge: each region is a set in DisjointSet
+    and its number is index of the root cell + 1 (0 is for cells which are not passable).
+    With a deadline, cells left when the turn time is over are processed during the next turns
+    """
+    # regions are updated before the searches, so the clock is read more often than Deadline.CHECK_MASK
+    DEADLINE_CHECK_MASK = 63
+
+    def __init__(self, cells: CellCollection, deadline: Optional[Deadline] = None):
+        self.__cells = cells
+        self.__deadline: Optional[Deadline] = deadline
+        size = len(cells.get_grid())
+        self.__regions = DisjointSet(size)
+        self.__passable = bytearray(size)
+        self.__pending_coordinates: Deque[Coordinates] = deque()
+
+    def update_regions(self, changed_coordinates: Iterable[Coordinates]):
+        started_at = Profiler.start()
+        processed = self.__update_regions(changed_coordinates)
+        Profiler.stop('regions', started_at)
+        Profiler.count('region cells', processed)
+
+    def __update_regions(self, changed_coordinates: Iterable[Coordinates]) -> int:
+        """ returns the number of processed cells """
+        cells = self.__cells
+        neighbour_indexes = cells.get_neighbour_indexes()
+        pending_coordinates = self.__pending_coordinates
+        pending_coordinates.extend(changed_coordinates)
+        processed = 0
+        while pending_coordinates:
+            processed += 1
+            if self.__deadline and self.__deadline.is_exceeded_every(processed, self.DEADLINE_CHECK_MASK):
+                return processed
+
+            coordinates = pending_coordinates.popleft()
+            cell = cells.get_by_coordinates(coordinates)
+            index = cells.get_index(cell)
+            if self.__passable[index]:
+                if not cell.is_passable():
+                    # regions can't be split, so everything is calculated again
+                    return processed + self.reset()
+
+                continue
+
+            if not cell.is_passable():
+                cell.region = 0
+                continue
+
+            self.__passable[index] = 1
+            cells.add_to_region(cell, index + 1)
+            for neighbour_index in neighbour_indexes[index]:
+                if self.__passable[neighbour_index]:
+                    self.__merge(index, neighbour_index)
+
+        return processed
+
+    def reset(self) -> int:
+        """ calculates all regions again, returns the number of processed cells """
+        self.__regions = DisjointSet(len(self.__passable))
+        self.__passable = bytearray(len(self.__passable))
+        self.__pending_coordinates = deque()
+        for cell in self.__cells.get_grid():
+            cell.region = 0
+
+        self.__cells.index_regions()
+
+        return self.__update_regions([cell.coordinates for cell in self.__cells.get_grid()])
+
+    def __merge(self, first: int, second: int):
+        first_root = self.__regions.find(first)
+        second_root = self.__regions.find(second)
+        if first_root == second_root:
+            return
+
+        root = self.__regions.union(first_root, second_root)
+        merged_root = second_root if root == first_root else first_root
+        self.__cells.merge_regions(root + 1, merged_root + 1)
@@ -0,0 +1,31 @@
+import sys
+from typing import Optional, List, BinaryIO
+
+
+class TurnReader:
+    """
+    Reads the binary stdin: a line of numbers with one call and all rows of the maze with another.
+    Rows stay in one bytes block, row i starts at i * get_row_stride(width)
+    """
+
+    def __init__(self, stream: Optional[BinaryIO] = None):
+        self.__stream: BinaryIO = stream or sys.stdin.buffer
+        self.__line_end_length: int = 1
+
+    def read_numbers(self) -> List[int]:
+        line = self.__stream.readline()
+        if line.endswith(b'\r\n'):
+            self.__line_end_length = 2
+
+        return [int(number) for number in line.split()]
+
+    def read_rows(self, width: int, height: int) -> bytes:
+        size = self.get_row_stride(width) * height
+        block = self.__stream.read(size)
+        if len(block) < size:
+            raise EOFError('{} bytes of rows expected, {} read'.format(size, len(block)))
+
+        return block
+
+    def get_row_stride(self, width: int) -> int:
+        return width + self.__line_end_length
@@ -1,664 +1,1427 @@
-from typing import Optional, Tuple, Iterator, List
-import numpy as np
-import sys
-from math import sqrt, acos
-from enum import Enum
-from abc import abstractmethod, ABC
-
-
-class Collection(ABC):
-    FIRST_ELEMENT_INDEX = 0
-    LAST_ELEMENT_INDEX = -1
-
-    @abstractmethod
-    def __init__(self, elements):
-        self.__elements = elements
-
-    def is_empty(self) -> bool:
-        return self.count() == 0
-
-    def count(self) -> int:
-        return len(self.__elements)
-
-    def __len__(self) -> int:
-        return self.count()
-
-    def first(self):
-        return (self.__elements or [None])[self.FIRST_ELEMENT_INDEX]
-
-    def last(self):
-        return (self.__elements or [None])[self.LAST_ELEMENT_INDEX]
-
-    def get_as_tuple(self) -> tuple:
-        if isinstance(self.__elements, tuple) is False:
-            return tuple(self.__elements)
-        else:
-            return self.__elements
-
-    def get_as_list(self) -> list:
-        if isinstance(self.__elements, list) is False:
-            return list(self.__elements)
-        else:
-            return self.__elements
-
-    def __iter__(self):
-        return iter(self.__elements)
-
-    def __next__(self):
-        element = next(self.__elements) or None
-        if element is None:
-            raise StopIteration
-
-        return element
-
-    def get_with_limit(self, limit: int) -> list:
-        elements_as_list = self.get_as_list()
-        if limit > len(elements_as_list):
-            return elements_as_list
-
-        return self.__elements[:limit]
-
-class Coordinates:
-    __LEFT_PIXEL = 0
-    __TOP_PIXEL = 0
-
-    def __init__(self, x: int = __LEFT_PIXEL, y: int = __TOP_PIXEL):
-        self.x: int = x
-        self.y: int = y
-
-    def get_manhattan_distance(self, coordinates: 'Coordinates') -> int:
-        return abs(self.x - coordinates.x) + abs(self.y - coordinates.y)
-
-    def get_distance(self, coordinates: 'Coordinates') -> int:
-        return int(self.get_distance_float(coordinates))
-
-    def get_distance_float(self, coordinates: 'Coordinates') -> float:
-        x = (pow(coordinates.x - self.x, 2))
-        y = (pow(coordinates.y - self.y, 2))
-
-        return sqrt(x + y)
-
-    def __eq__(self, other: 'Coordinates') -> bool:
-        if (self.x == other.x) and (self.y == other.y):
-            return True
-
-        return False
-
-    def __add__(self, other: 'Coordinates') -> 'Coordinates':
-        return Coordinates(self.x+other.x, self.y+other.y)
-
-    def is_same(self, coordinates: 'Coordinates') -> bool:
-        if self.x == coordinates.x and self.y == coordinates.y:
-            return True
-
-        return False
-
-    def is_near(self, coordinates: 'Coordinates') -> bool:
-        x_distance = abs(self.x - coordinates.x)
-        y_distance = abs(self.y - coordinates.y)
-
-        if (x_distance + y_distance) <= 1:
-            return True
-
-        return False
-
-    def get_mirrored_coordinate(self, mirroring_coordinate: 'Coordinates') -> 'Coordinates':
-        diff_x = mirroring_coordinate.x - self.x
-        diff_y = mirroring_coordinate.y - self.y
-
-        mirrored_x = mirroring_coordinate.x + diff_x
-        mirrored_y = mirroring_coordinate.y + diff_y
-
-        return Coordinates(mirrored_x, mirrored_y)
-
-    def get_relative_to_coordinate(self, point: 'Coordinates') -> 'Coordinates':
-        return Coordinates(self.x - point.x, self.y - point.y)
-
-    def get_distance_to_vector_line(self, vector) -> int:
-        circle_radius = self.get_distance_to_vector_line_from_zero_point(
-            vector.get_relative_to_coordinate(self)
-        )
-
-        return round(circle_radius)
-
-    @staticmethod
-    def get_distance_to_vector_line_from_zero_point(vector) -> float:
-        x_1 = vector.start.x
-        x_2 = vector.end.x
-        y_1 = vector.start.y
-        y_2 = vector.end.y
-
-        circle_radius = abs((x_2 - x_1) * y_1 + (y_1 - y_2) * x_1) / sqrt(pow(x_2 - x_1, 2) + pow(y_2 - y_1, 2))
-
-        return circle_radius
-
-class LocationType(Enum):
-    UNKNOWN = '?'
-    EMPTY = '.'
-    START = 'T'
-    CONTROL_ROOM = 'C'
-    WALL = '#'
-
-class Map:
-    def __init__(self, width: int, height: int):
-        self.width: int = width
-        self.height: int = height
-
-class Logger:
-    @staticmethod
-    def log(something):
-        print(str(something), file=sys.stderr, flush=True)
-
-class MutableCollection(Collection):
-    def __init__(self, elements: Optional[list] = None):
-        if elements is None:
-            elements = []
-        super().__init__(elements)
-
-    def add(self, element_to_add):
-        self.get_as_list().append(element_to_add)
-
-    def extend(self, collection_to_extend):
-        raise Exception('This method is not allowed for collections. Please use merge() instead!')
-
-    def copy(self):
-        return self.get_as_list().copy()
-
-    def pop(self):
-        return self.get_as_list().pop()
-
-    def merge(self, collection: Collection):
-        self.get_as_list().extend(collection.get_as_list())
-
-    def remove(self, element_to_remove):
-        self.get_as_list().remove(element_to_remove)
-
-    def remove_all(self):
-        self.get_as_list().clear()
-
-    def _insert_at_index(self, element_to_insert, index: int):
-        elements = self.get_as_list()
-        elements.insert(index, element_to_insert)
-        self.__init__(elements)
-
-class Vector:
-    def __init__(self, start: Coordinates, end: Coordinates):
-        self.start = start
-        self.end = end
-        self.radius_coordinate = self.end.get_relative_to_coordinate(self.start)
-
-    @property
-    def start(self) -> Coordinates:
-        return self.__start
-
-    @start.setter
-    def start(self, start: Coordinates):
-        self.__start = start
-
-    @property
-    def end(self) -> Coordinates:
-        return self.__end
-
-    @end.setter
-    def end(self, end: Coordinates):
-        self.__end = end
-
-    @property
-    def radius_coordinate(self) -> Coordinates:
-        return self.__radius_coordinate
-
-    @radius_coordinate.setter
-    def radius_coordinate(self, radius_coordinate: Coordinates):
-        self.__radius_coordinate = radius_coordinate
-
-    def get_relative_to_coordinate(self, point: Coordinates) -> 'Vector':
-        relative_vector = Vector(
-            self.start.get_relative_to_coordinate(point),
-            self.end.get_relative_to_coordinate(point),
-        )
-
-        return relative_vector
-
-    def get_length(self) -> float:
-        end_x = self.radius_coordinate.x
-        end_y = self.radius_coordinate.y
-
-        length = sqrt(pow(end_x, 2) + pow(end_y, 2))
-
-        return length
-
-    def get_scalar_product_with(self, other: 'Vector') -> int:
-        x_1 = self.radius_coordinate.x
-        y_1 = self.radius_coordinate.y
-        x_2 = other.radius_coordinate.x
-        y_2 = other.radius_coordinate.y
-
-        scalar_product = x_1 * x_2 + y_1 * y_2
-
-        return scalar_product
-
-    def get_angle_to(self, other: 'Vector'):
-        angle_cos = self.get_scalar_product_with(other) / (self.get_length() + other.get_length())
-        angle = acos(angle_cos)
-
-        if other.radius_coordinate.y < self.radius_coordinate.y:
-            angle = angle * -1
-
-        return angle
-
-class Cell:
-    def __init__(self, coordinates: Coordinates):
-        self.coordinates: Coordinates = coordinates
-        self.type: Optional[LocationType] = None
-        self.distance_to_target: Optional[int] = 0
-        self.region: int = 0
-
-    def is_passable(self) -> bool:
-        return self.is_empty() or self.is_control() or self.is_start()
-
-    def is_wall(self) -> bool:
-        return self.type == LocationType.WALL
-
-    def is_empty(self) -> bool:
-        return self.type == LocationType.EMPTY
-
-    def is_control(self) -> bool:
-        return self.type == LocationType.CONTROL_ROOM
-
-    def is_start(self) -> bool:
-        return self.type == LocationType.START
-
-    def is_unknown(self) -> bool:
-        return self.type == LocationType.UNKNOWN
-
-class Direction(Enum):
-    UP = 'UP'
-    RIGHT = 'RIGHT'
-    DOWN = 'DOWN'
-    LEFT = 'LEFT'
-
-
-VECTORS = {
-    Direction.RIGHT: Coordinates(1, 0),
-    Direction.LEFT: Coordinates(-1, 0),
-    Direction.UP: Coordinates(0, -1),
-    Direction.DOWN: Coordinates(0, 1)
-}
-
-class CoordinatesCollection(MutableCollection):
-    def add(self, element_to_add: Coordinates):
-        super().add(element_to_add)
-
-    def first(self) -> Optional[Coordinates]:
-        return super().first()
-
-    def last(self) -> Optional[Coordinates]:
-        return super().last()
-
-    def __iter__(self) -> Iterator[Coordinates]:
-        return super().__iter__()
-
-    def has_coordinates(self, coordinates: Coordinates) -> bool:
-        for existing_coordinates in self:
-            if coordinates.is_same(existing_coordinates):
-                return True
-
-        return False
-
-    def get_last_items(self, items_number: int) -> 'CoordinatesCollection':
-
-        last_entities = self.get_as_list()
-        if items_number < self.count():
-            last_entities = last_entities[-items_number:0]
-
-        last_items = CoordinatesCollection(last_entities)
-
-        return last_items
-
-    def sort_by_distance(self) -> 'CoordinatesCollection':
-        ...
-
-class CellCollection(MutableCollection):
-    def __init__(self, elements: Optional[list] = None):
-        super().__init__(elements)
-        self.start: Optional[Cell] = None
-        self.control: Optional[Cell] = None
-        self.__map = {}
-
-    def update_cell(self, j: int, i: int, cell_type: str):
-        cell = self.get_by_coordinates(Coordinates(j, i))
-        cell.type = LocationType(cell_type)
-        if not self.start and cell.is_start():
-            self.start = cell
-
-        if not self.control and cell.is_control():
-            self.control = cell
-
-    def add(self, element_to_add: Cell):
-        self.__map.setdefault(element_to_add.coordinates.x, {})[element_to_add.coordinates.y] = element_to_add
-        super().add(element_to_add)
-
-    def get_by_coordinates(self, coordinates: Coordinates) -> Optional[Cell]:
-        return self.__map.get(coordinates.x, {}).get(coordinates.y, None)
-
-    def is_near_unknown(self, coordinates: Coordinates) -> bool:
-        for vector in VECTORS.values():
-            cell_around = self.get_by_coordinates(coordinates + vector)
-            if cell_around and cell_around.is_unknown():
-                return True
-
-        return False
-
-    def get_passable_cells_around(
-            self,
-            coordinates: Coordinates,
-            explored_grid: List[Cell],
-            new_cells_to_look_around: List[Cell],
-            distance_to_target: int,
-            player
-    ):
-        passable_cells_around = []
-        for vector in VECTORS.values():
-            cell_around = self.get_by_coordinates(coordinates + vector)
-            if cell_around is player:
-                raise Exception
-
-            if not cell_around or not cell_around.is_passable():
-                continue
-
-            if cell_around in explored_grid:
-                continue
-
-            if cell_around in new_cells_to_look_around:
-                continue
-
-            cell_around.distance_to_target = distance_to_target
-            passable_cells_around.append(cell_around)
-
-        return passable_cells_around
-
-    def get_all_cells_of_region(self, region: int) -> 'CellCollection':
-        all_of_region = CellCollection()
-        for cell in self:
-            if cell.region == region:
-                all_of_region.add(cell)
-
-        return all_of_region
-
-    def get_closest(self, cell_to_find: Cell) -> Cell:
-        closest_distance = 999999
-        closest_cell = None
-        for cell in self:
-            distance = cell_to_find.coordinates.get_manhattan_distance(cell.coordinates)
-            if distance < closest_distance:
-                closest_distance = distance
-                closest_cell = cell
-
-        return closest_cell
-
-    def __iter__(self) -> Iterator[Cell]:
-        return super().__iter__()
-
-class CellBuilder:
-    @staticmethod
-    def build_cell(x: int, y: int) -> Cell:
-        return Cell(Coordinates(x, y))
-
-class DirectionDefiner:
-    @staticmethod
-    def get_direction(target_coordinates: Coordinates, player_coordinates: Coordinates) -> Direction:
-        for direction, vector in VECTORS.items():
-            if target_coordinates.x - player_coordinates.x == vector.x and \
-                    target_coordinates.y - player_coordinates.y == vector.y:
-                return direction
-
-class Game:
-    def __init__(self, game_map: Map):
-        self.map: Map = game_map
-        self.cells: CellCollection = CellCollection()
-        self.player: Optional[Cell] = None
-        self.time_is_running: bool = False
-
-class RegionsExtractor:
-    """
-    Based on Sequential labeling algorithm from
-    https://medium.com/@dellawen1997/connected-component-labeling-midterm-part-1-4b2aebfb277
-
-    TODO: prettify and refactor
-    """
-
-    def __init__(self, cells: CellCollection, game_map: Map):
-        self.__cells = cells
-        self.__map = game_map
-
-    def assign_regions(self):
-        h = self.__map.height
-        w = self.__map.width
-        label = 0
-        id_ = 0
-        link = []
-
-        for row in range(h):
-            for col in range(w):
-                cell = self.__cells.get_by_coordinates(Coordinates(col, row))
-                if not cell.is_passable():
-                    cell.region = 0
-                else:
-                    current_neighbors = self.__neighbors(col, row)
-                    if current_neighbors == (0, 0):
-                        label += 1
-                        cell.region = label
-
-                    else:
-                        if min(current_neighbors) == 0 or current_neighbors[0] == current_neighbors[1]:
-                            cell.region = max(current_neighbors)
-                        else:
-                            cell.region = min(current_neighbors)
-
-                            if id_ == 0:
-                                link.append(current_neighbors)
-                                id_ = id_ + 1
-                            else:
-                                check = 0
-                                for k in range(id_):
-                                    # 交集
-                                    tmp = set(link[k]).intersection(set(current_neighbors))
-                                    if len(tmp) != 0:
-                                        link[k] = set(link[k]).union(current_neighbors)
-                                        np.array(link)
-                                        check = check + 1
-
-                                if check == 0:
-                                    id_ = id_ + 1
-                                    np.array(link)
-                                    link.append(set(current_neighbors))
-
-        for row in range(h):
-            for col in range(w):
-                for x in range(id_):
-                    cell = self.__cells.get_by_coordinates(Coordinates(col, row))
-                    if cell.region in link[x] and cell.region != 0:
-                        cell.region = min(link[x])
-
-    def __neighbors(self, i, j) -> Tuple[int, int]:
-        left_cell = self.__cells.get_by_coordinates(Coordinates(i-1, j))
-        above_cell = self.__cells.get_by_coordinates(Coordinates(i, j - 1))
-
-        neighbors_tuple = (left_cell.region if left_cell else 0, above_cell.region if above_cell else 0)
-
-        return neighbors_tuple
-
-class PathFinder:
-    """
-    Based on the basic Sample algorythm from https://en.wikipedia.org/wiki/Pathfinding
-    Can be improved with A* though
-    """
-
-    def __init__(self, game: Game):
-        self.__game: Game = game
-
-    def get_path(self, target: Cell) -> List[Cell]:
-        explored_grid = []
-        distance_to_target = 0
-        target.distance_to_target = distance_to_target
-        explored_grid.append(target)
-
-        cells_to_look_around = [target]
-
-        while True:
-            distance_to_target += 1
-            try:
-                cells_to_look_around = self.__get_new_cells_to_look_around(
-                    cells_to_look_around,
-                    distance_to_target,
-                    explored_grid,
-                    self.__game.player
-                )
-            except Exception:
-                break
-
-            explored_grid += cells_to_look_around
-
-        return self.__build_path_from_grid(explored_grid)
-
-    def __get_new_cells_to_look_around(
-            self,
-            cells_to_look_around: List[Cell],
-            distance_to_target: int,
-            explored_grid: List[Cell],
-            player: Cell
-    ):
-        new_cells_to_look_around = []
-        for cell_to_look_around in cells_to_look_around:
-            new_cells_to_look_around += self.__game.cells.get_passable_cells_around(
-                cell_to_look_around.coordinates,
-                explored_grid,
-                new_cells_to_look_around,
-                distance_to_target,
-                player
-            )
-
-        return new_cells_to_look_around
-
-    def __build_path_from_grid(self, explored_grid: List[Cell]) -> List[Cell]:
-        """ removes redundant cells """
-        clean_path = []
-
-        closest = self.__game.player
-        while explored_grid:
-            cell_with_max_weight = explored_grid[-1]
-            cells_with_max_weight = CellCollection([cell_with_max_weight])
-            for cell in explored_grid:
-                if cell is not cell_with_max_weight and cell.distance_to_target == cell_with_max_weight.distance_to_target:
-                    cells_with_max_weight.add(cell)
-
-            for cell in cells_with_max_weight:
-                explored_grid.remove(cell)
-
-            closest = cells_with_max_weight.get_closest(closest)
-            clean_path.append(closest)
-
-        return clean_path[::-1]
-
-class DirectionDispatcher:
-    def __init__(self, game: Game):
-        self.__game: Game = game
-        self.__path_finder = PathFinder(game)
-        self.__path_to_start: List[Cell] = []
-        self.__path_to_control: List[Cell] = []
-
-    def get_next_direction(self) -> Direction:
-        next_cell = self.__get_next_cell()
-
-        return DirectionDefiner.get_direction(next_cell.coordinates, self.__game.player.coordinates)
-
-    def __get_next_cell(self) -> Cell:
-        # Player needs to return to the start if time is running
-        if self.__game.time_is_running:
-            if not self.__path_to_start:
-                # save to cache, to not calculate each time
-                self.__path_to_start = self.__path_finder.get_path(self.__game.cells.start)
-
-            return self.__path_to_start.pop()
-
-        region_cells = self.__game.cells.get_all_cells_of_region(self.__game.player.region)
-        cells_border_with_unknown = self.__get_cells_near_unknown(region_cells)
-
-        # If region is not yet fully explored
-        if cells_border_with_unknown:
-            closest_path = self.__find_closest_path_to_unknown(cells_border_with_unknown)
-
-            return closest_path.pop()
-
-        if not self.__path_to_control:
-            # save to cache, to not calculate each time
-            self.__path_to_control = self.__path_finder.get_path(self.__game.cells.control)
-
-        return self.__path_to_control.pop()
-
-    def __find_closest_path_to_unknown(self, cells_border_with_unknown):
-        closest_path_length = 9999999
-        closest_path = None
-
-        # choose between several paths to avoid loops
-        for cell_borders_with_unknown in cells_border_with_unknown.get_with_limit(2):
-            path_to_unknown = self.__path_finder.get_path(cell_borders_with_unknown)
-            if len(path_to_unknown) < closest_path_length:
-                closest_path_length = len(path_to_unknown)
-                closest_path = path_to_unknown
-
-        return closest_path
-
-    def __get_cells_near_unknown(self, region_cells: CellCollection) -> CellCollection:
-        cells_near_unknown = CellCollection()
-        for region_cell in region_cells:
-            if self.__game.cells.is_near_unknown(region_cell.coordinates):
-                cells_near_unknown.add(region_cell)
-
-        return cells_near_unknown
-
-
-# Auto-generated code below aims at helping you parse
-# the standard input according to the problem statement.
-
-# r: number of rows.
-# c: number of columns.
-# a: number of rounds between the time the alarm countdown is activated and the time the alarm goes off.
-r, c, a = [int(i) for i in input().split()]
-
-
-# labyrinth loop
-game_map = Map(c, r)
-game = Game(game_map)
-for i in range(r):
-    for j in range(c):
-        cell = CellBuilder.build_cell(j, i)
-        game.cells.add(cell)
-
-direction_dispatcher = DirectionDispatcher(game)
-regions_extractor = RegionsExtractor(game.cells, game_map)
-
-turn = 0
-
-while True:
-    turn += 1
-    # kr: row where Rick is located.
-    # kc: column where Rick is located.
-    kr, kc = [int(i) for i in input().split()]
-    current_coordinates = Coordinates(kc, kr)
-
-    for i in range(r):
-        row = input()  # C of the characters in '#.TC?' (i.e. one line of the ASCII maze).
-        for j, cell_type in enumerate(row):
-            game.cells.update_cell(j, i, cell_type)
-
-    regions_extractor.assign_regions()
-
-    current_cell = game.cells.get_by_coordinates(current_coordinates)
-    if current_cell.is_control():
-        game.time_is_running = True
-
-    game.player = current_cell
-
-    selected_direction = direction_dispatcher.get_next_direction()
-    print(selected_direction.value)
+from abc import abstractmethod, ABC
+from typing import Optional, Iterator, List, Set, Tuple, Dict, Iterable, Callable, Deque, BinaryIO
+from math import sqrt
+import time
+from array import array
+from enum import Enum
+from heapq import heappush, heappop
+from collections import deque
+import sys
+
+
+class Collection(ABC):
+    FIRST_ELEMENT_INDEX = 0
+    LAST_ELEMENT_INDEX = -1
+
+    @abstractmethod
+    def __init__(self, elements):
+        self.__elements = elements
+
+    def count(self) -> int:
+        return len(self.__elements)
+
+    def __len__(self) -> int:
+        return self.count()
+
+    def first(self):
+        return (self.__elements or [None])[self.FIRST_ELEMENT_INDEX]
+
+    def get_as_list(self) -> list:
+        if isinstance(self.__elements, list) is False:
+            return list(self.__elements)
+        else:
+            return self.__elements
+
+    def __iter__(self):
+        return iter(self.__elements)
+
+    def __next__(self):
+        element = next(self.__elements) or None
+        if element is None:
+            raise StopIteration
+
+        return element
+
+
+class MutableCollection(Collection):
+    def __init__(self, elements: Optional[list] = None):
+        if elements is None:
+            elements = []
+        super().__init__(elements)
+
+    def add(self, element_to_add):
+        self.get_as_list().append(element_to_add)
+
+    def extend(self, collection_to_extend):
+        raise Exception('This method is not allowed for collections. Please use merge() instead!')
+
+    def pop(self):
+        return self.get_as_list().pop()
+
+
+class Coordinates:
+    """
+    Immutable, so the same instance can be shared.
+    Coordinates inside the map are interned: get() returns the same instance for the same x and y
+    """
+    __slots__ = ('x', 'y')
+
+    __LEFT_PIXEL = 0
+    __TOP_PIXEL = 0
+
+    __interned: List['Coordinates'] = []
+    __interned_width: int = 0
+    __interned_height: int = 0
+
+    def __init__(self, x: int = __LEFT_PIXEL, y: int = __TOP_PIXEL):
+        object.__setattr__(self, 'x', x)
+        object.__setattr__(self, 'y', y)
+
+    def __setattr__(self, name: str, value):
+        raise AttributeError('Coordinates are immutable')
+
+    @staticmethod
+    def intern(width: int, height: int):
+        if Coordinates.__interned_width == width and Coordinates.__interned_height == height:
+            return
+
+        Coordinates.__interned = [Coordinates(x, y) for y in range(height) for x in range(width)]
+        Coordinates.__interned_width = width
+        Coordinates.__interned_height = height
+
+    @staticmethod
+    def get(x: int, y: int) -> 'Coordinates':
+        if 0 <= x < Coordinates.__interned_width and 0 <= y < Coordinates.__interned_height:
+            return Coordinates.__interned[y * Coordinates.__interned_width + x]
+
+        return Coordinates(x, y)
+
+    def get_manhattan_distance(self, coordinates: 'Coordinates') -> int:
+        return abs(self.x - coordinates.x) + abs(self.y - coordinates.y)
+
+    def get_distance(self, coordinates: 'Coordinates') -> int:
+        return int(self.get_distance_float(coordinates))
+
+    def get_distance_float(self, coordinates: 'Coordinates') -> float:
+        x = (pow(coordinates.x - self.x, 2))
+        y = (pow(coordinates.y - self.y, 2))
+
+        return sqrt(x + y)
+
+    def __eq__(self, other: 'Coordinates') -> bool:
+        if (self.x == other.x) and (self.y == other.y):
+            return True
+
+        return False
+
+    def __hash__(self) -> int:
+        return hash((self.x, self.y))
+
+    def __add__(self, other: 'Coordinates') -> 'Coordinates':
+        return Coordinates.get(self.x+other.x, self.y+other.y)
+
+    def is_near(self, coordinates: 'Coordinates') -> bool:
+        x_distance = abs(self.x - coordinates.x)
+        y_distance = abs(self.y - coordinates.y)
+
+        if (x_distance + y_distance) <= 1:
+            return True
+
+        return False
+
+
+class Deadline:
+    """ time budget of a turn, start() is called when the turn begins """
+    # how many iterations of a search pass between clock reads, must be a power of 2 minus 1
+    CHECK_MASK = 255
+
+    def __init__(self, budget: float):
+        self.__budget: float = budget
+        self.__ends_at: float = time.perf_counter() + budget
+
+    def start(self):
+        self.__ends_at = time.perf_counter() + self.__budget
+
+    def is_exceeded(self) -> bool:
+        return time.perf_counter() >= self.__ends_at
+
+    def is_exceeded_every(self, counter: int, mask: int = CHECK_MASK) -> bool:
+        """ reads the clock only when counter & mask is 0, so a loop pays for it once in mask + 1 iterations """
+        return not counter & mask and self.is_exceeded()
+
+
+class DisjointSet:
+    """
+    Union-find with path compression and union by rank
+    https://en.wikipedia.org/wiki/Disjoint-set_data_structure
+    """
+
+    def __init__(self, size: int):
+        self.__parents = array('i', range(size))
+        self.__ranks = bytearray(size)
+
+    def find(self, element: int) -> int:
+        parents = self.__parents
+        root = element
+        while parents[root] != root:
+            root = parents[root]
+
+        while parents[element] != root:
+            parents[element], element = root, parents[element]
+
+        return root
+
+    def union(self, first: int, second: int) -> int:
+        """ returns root of the merged set """
+        first_root = self.find(first)
+        second_root = self.find(second)
+        if first_root == second_root:
+            return first_root
+
+        if self.__ranks[first_root] < self.__ranks[second_root]:
+            first_root, second_root = second_root, first_root
+
+        self.__parents[second_root] = first_root
+        if self.__ranks[first_root] == self.__ranks[second_root]:
+            self.__ranks[first_root] += 1
+
+        return first_root
+
+
+class Bitboard:
+    """
+    Masks of the maze, one int per row, bit x of a row is the cell in column x.
+    Frontier and flood fill are whole row bitwise operations
+    """
+    PASSABLE_DIGITS = bytes.maketrans(b'#.TC?', b'01110')
+    WALL_DIGITS = bytes.maketrans(b'#.TC?', b'10000')
+    UNKNOWN_DIGITS = bytes.maketrans(b'#.TC?', b'00001')
+
+    def __init__(self, width: int, height: int):
+        self.width: int = width
+        self.height: int = height
+        self.passable: List[int] = [0] * height
+        self.wall: List[int] = [0] * height
+        self.unknown: List[int] = [(1 << width) - 1] * height
+        self.visited: List[int] = [0] * height
+        self.frontier: List[int] = [0] * height
+
+    def update_row(self, y: int, row: bytes):
+        # reversed, so the first character becomes the lowest bit
+        reversed_row = row[::-1]
+        self.passable[y] = int(reversed_row.translate(self.PASSABLE_DIGITS), 2)
+        self.wall[y] = int(reversed_row.translate(self.WALL_DIGITS), 2)
+        self.unknown[y] = int(reversed_row.translate(self.UNKNOWN_DIGITS), 2)
+
+    def update_frontier_row(self, y: int) -> int:
+        """ passable cells next to unknown ones, returns bits which changed """
+        unknown = self.unknown
+        near_unknown = unknown[y] << 1 | unknown[y] >> 1
+        if y > 0:
+            near_unknown |= unknown[y - 1]
+        if y < self.height - 1:
+            near_unknown |= unknown[y + 1]
+
+        frontier_row = self.passable[y] & near_unknown
+        changed_bits = self.frontier[y] ^ frontier_row
+        self.frontier[y] = frontier_row
+
+        return changed_bits
+
+    def visit(self, coordinates: Coordinates):
+        self.visited[coordinates.y] |= 1 << coordinates.x
+
+    def is_visited(self, coordinates: Coordinates) -> bool:
+        return bool(self.visited[coordinates.y] >> coordinates.x & 1)
+
+    def is_passable(self, coordinates: Coordinates) -> bool:
+        return bool(self.passable[coordinates.y] >> coordinates.x & 1)
+
+    @staticmethod
+    def get_bits(mask: int) -> Iterator[int]:
+        """ positions of the set bits, from the lowest """
+        while mask:
+            lowest_bit = mask & -mask
+            yield lowest_bit.bit_length() - 1
+            mask ^= lowest_bit
+
+
+class LocationType(Enum):
+    UNKNOWN = '?'
+    EMPTY = '.'
+    START = 'T'
+    CONTROL_ROOM = 'C'
+    WALL = '#'
+
+
+class Cell:
+    """
+    type is kept as a small code, the collection keeps the same codes by index.
+    It is read only, cells change only through the collection updates, so its codes, bitboard and frontier follow
+    """
+    __slots__ = ('coordinates', 'code', 'region')
+
+    def __init__(self, coordinates: Coordinates):
+        self.coordinates: Coordinates = coordinates
+        self.code: int = UNKNOWN_CODE
+        self.region: int = 0
+
+    def is_passable(self) -> bool:
+        return PASSABLE_BY_CODE[self.code] == 1
+
+    def is_control(self) -> bool:
+        return self.code == CONTROL_ROOM_CODE
+
+    def is_start(self) -> bool:
+        return self.code == START_CODE
+
+    def is_unknown(self) -> bool:
+        return self.code == UNKNOWN_CODE
+
+
+class CellCollection(MutableCollection):
+    def __init__(self, elements: Optional[list] = None):
+        super().__init__(elements)
+        self.start: Optional[Cell] = None
+        self.control: Optional[Cell] = None
+        self.__map = {}
+        self.__rows: List[bytes] = []
+        self.__block: bytes = b''
+        self.__width: int = 0
+        self.__grid: List[Cell] = []
+        self.__codes: bytearray = bytearray()
+        self.__bitboard: Optional[Bitboard] = None
+        self.__neighbours: List[Tuple[Cell, ...]] = []
+        self.__neighbour_indexes: List[Tuple[int, ...]] = []
+        self.__frontier: Dict[int, Cell] = {}
+        self.__regions: Dict[int, List[Cell]] = {}
+
+    def update_block(self, block: bytes, row_stride: int) -> Set[Coordinates]:
+        """ the same as update_rows() for rows in one block, unchanged rows are compared without copying """
+        started_at = Profiler.start()
+        width = len(self.__map)
+        view = memoryview(block)
+        previous_view = memoryview(self.__block) if self.__block else None
+        changed_coordinates = set()
+        changed_row_indexes = set()
+        for i in range(len(block) // row_stride):
+            row_start = i * row_stride
+            row_view = view[row_start:row_start + width]
+            if previous_view is not None and row_view == previous_view[row_start:row_start + width]:
+                continue
+
+            if self.__update_row(i, bytes(row_view), changed_coordinates):
+                changed_row_indexes.add(i)
+
+        self.__block = block
+
+        return self.__finish_update(started_at, changed_coordinates, changed_row_indexes)
+
+    def __update_row(self, i: int, row: bytes, changed_coordinates: Set[Coordinates]) -> bool:
+        """ returns whether the row is different from the previous one """
+        bitboard = self.get_bitboard()
+        previous_row = self.__rows[i]
+        if row == previous_row:
+            return False
+
+        bitboard.update_row(i, row)
+        row_codes = row.translate(CODES_BY_BYTE)
+        row_start = i * self.__width
+        self.__codes[row_start:row_start + len(row_codes)] = row_codes
+        for j, code in enumerate(row_codes):
+            if previous_row[j] == row[j]:
+                continue
+
+            cell = self.__grid[row_start + j]
+            self.__set_code(cell, code)
+            changed_coordinates.add(cell.coordinates)
+
+        self.__rows[i] = row
+
+        return True
+
+    def __finish_update(
+            self,
+            started_at: float,
+            changed_coordinates: Set[Coordinates],
+            changed_row_indexes: Set[int]
+    ) -> Set[Coordinates]:
+        Profiler.stop('rows', started_at)
+        Profiler.count('changed cells', len(changed_coordinates))
+
+        started_at = Profiler.start()
+        self.__update_frontier(changed_row_indexes)
+        Profiler.stop('frontier', started_at)
+
+        return changed_coordinates
+
+    def __set_code(self, cell: Cell, code: int):
+        cell.code = code
+        if not self.start and cell.is_start():
+            self.start = cell
+
+        if not self.control and cell.is_control():
+            self.control = cell
+
+    def __update_frontier(self, changed_row_indexes: Set[int]):
+        """ only the changed rows and rows around them can start or stop bordering with unknown """
+        bitboard = self.get_bitboard()
+        row_indexes = set()
+        for i in changed_row_indexes:
+            row_indexes.update(range(max(0, i - 1), min(bitboard.height, i + 2)))
+
+        for i in row_indexes:
+            for j in Bitboard.get_bits(bitboard.update_frontier_row(i)):
+                index = i * self.__width + j
+                if bitboard.frontier[i] >> j & 1:
+                    self.__frontier[index] = self.__grid[index]
+                else:
+                    self.__frontier.pop(index, None)
+
+    def get_frontier(self, region: Optional[int] = None) -> 'CellCollection':
+        """ passable cells of the region (or of all regions) which border with unknown """
+        frontier = CellCollection()
+        for cell in self.__frontier.values():
+            if region is None or cell.region == region:
+                frontier.add(cell)
+
+        return frontier
+
+    def add(self, element_to_add: Cell):
+        self.__map.setdefault(element_to_add.coordinates.x, {})[element_to_add.coordinates.y] = element_to_add
+        self.__grid = []
+        super().add(element_to_add)
+
+    def get_grid(self) -> List[Cell]:
+        """ all cells by index y * width + x """
+        if not self.__grid:
+            self.__build_grid()
+
+        return self.__grid
+
+    def get_bitboard(self) -> Bitboard:
+        if not self.__grid:
+            self.__build_grid()
+
+        return self.__bitboard
+
+    def get_codes(self) -> bytearray:
+        """ codes of the cell types by index, PASSABLE_BY_CODE tells which are passable """
+        if not self.__grid:
+            self.__build_grid()
+
+        return self.__codes
+
+    def get_index(self, cell: Cell) -> int:
+        return cell.coordinates.y * self.__width + cell.coordinates.x
+
+    def get_neighbours(self, cell: Cell) -> Tuple[Cell, ...]:
+        if not self.__grid:
+            self.__build_grid()
+
+        return self.__neighbours[self.get_index(cell)]
+
+    def get_neighbour_indexes(self) -> List[Tuple[int, ...]]:
+        """ indexes of the cells around, by index of the cell """
+        if not self.__grid:
+            self.__build_grid()
+
+        return self.__neighbour_indexes
+
+    def __build_grid(self):
+        """ map size never changes, so the grid and cells around are calculated once """
+        self.__width = len(self.__map)
+        height = max([len(column) for column in self.__map.values()] or [0])
+        columns = [self.__map.get(x, {}) for x in range(self.__width)]
+        self.__grid = [columns[x].get(y) for y in range(height) for x in range(self.__width)]
+        self.__codes = bytearray(cell.code for cell in self.__grid)
+        # cells are unknown until the first rows come, so only the revealed ones are reported as changed
+        self.__rows = [b'?' * self.__width] * height
+        self.__bitboard = Bitboard(self.__width, height)
+
+        # neighbours by index arithmetic, it is the most of the first turn on big maps
+        grid = self.__grid
+        width = self.__width
+        steps = [(vector.x, vector.y, vector.y * width + vector.x) for vector in VECTORS.values()]
+        self.__neighbours = []
+        self.__neighbour_indexes = []
+        for index in range(len(grid)):
+            x = index % width
+            y = index // width
+            indexes_around = tuple([
+                index + step for step_x, step_y, step in steps
+                if 0 <= x + step_x < width and 0 <= y + step_y < height and grid[index + step]
+            ])
+            self.__neighbours.append(tuple([grid[index_around] for index_around in indexes_around]))
+            self.__neighbour_indexes.append(indexes_around)
+
+    def get_by_coordinates(self, coordinates: Coordinates) -> Optional[Cell]:
+        return self.__map.get(coordinates.x, {}).get(coordinates.y, None)
+
+    def add_to_region(self, cell: Cell, region: int):
+        cell.region = region
+        self.__regions.setdefault(region, []).append(cell)
+
+    def merge_regions(self, region: int, merged_region: int):
+        merged_cells = self.__regions.pop(merged_region, [])
+        for cell in merged_cells:
+            cell.region = region
+
+        self.__regions.setdefault(region, []).extend(merged_cells)
+
+    def index_regions(self):
+        """ rebuilds the index after regions of all cells were assigned """
+        self.__regions = {}
+        for cell in self.get_grid():
+            if cell.region != 0:
+                self.__regions.setdefault(cell.region, []).append(cell)
+
+    def __iter__(self) -> Iterator[Cell]:
+        return super().__iter__()
+
+
+class Direction(Enum):
+    UP = 'UP'
+    RIGHT = 'RIGHT'
+    DOWN = 'DOWN'
+    LEFT = 'LEFT'
+
+
+VECTORS = {
+    Direction.RIGHT: Coordinates(1, 0),
+    Direction.LEFT: Coordinates(-1, 0),
+    Direction.UP: Coordinates(0, -1),
+    Direction.DOWN: Coordinates(0, 1)
+}
+# cells keep compact codes: index of the type in LOCATION_TYPES_BY_CODE
+LOCATION_TYPES_BY_CODE = (
+    LocationType.UNKNOWN,
+    LocationType.EMPTY,
+    LocationType.START,
+    LocationType.CONTROL_ROOM,
+    LocationType.WALL
+)
+UNKNOWN_CODE, EMPTY_CODE, START_CODE, CONTROL_ROOM_CODE, WALL_CODE = range(len(LOCATION_TYPES_BY_CODE))
+# 256 entries: ASCII byte of the cell to its code, bytes.translate() converts a whole row at once
+CODES_BY_BYTE = bytes.maketrans(b'?.TC#', bytes(range(len(LOCATION_TYPES_BY_CODE))))
+PASSABLE_BY_CODE = bytes([0, 1, 1, 1, 0])
+
+
+class Map:
+    def __init__(self, width: int, height: int):
+        self.width: int = width
+        self.height: int = height
+        Coordinates.intern(width, height)
+
+
+class Game:
+    def __init__(self, game_map: Map, alarm_rounds: Optional[int] = None):
+        self.map: Map = game_map
+        # rounds to get back to the start after the control room is reached
+        self.alarm_rounds: Optional[int] = alarm_rounds
+        self.cells: CellCollection = CellCollection()
+        self.player: Optional[Cell] = None
+        self.time_is_running: bool = False
+
+
+class DStarLite:
+    """
+    Incremental shortest path to a fixed goal from a moving source, based on D* Lite (optimised version) from
+    http://idm-lab.org/bib/abstracts/papers/aaai02b.pdf
+
+    Distances are kept from the goal, so when cells change only the vertices they affect are expanded again
+    and the search state survives the source moving. Only known passable cells are traversable,
+    through_unknown adds unknown ones for an optimistic distance.
+    With a deadline the search stops once the turn time is over and continues on the next call
+    """
+    INFINITY = 2 ** 30
+
+    def __init__(
+            self,
+            cells: CellCollection,
+            goal: Cell,
+            deadline: Optional[Deadline] = None,
+            through_unknown: bool = False
+    ):
+        self.__cells = cells
+        self.__deadline = deadline
+        self.__through_unknown = through_unknown
+        self.__grid = cells.get_grid()
+        self.__neighbour_indexes = cells.get_neighbour_indexes()
+        self.__goal_index = cells.get_index(goal)
+        self.__distances = array('i', [self.INFINITY]) * len(self.__grid)
+        self.__lookaheads = array('i', [self.INFINITY]) * len(self.__grid)
+        self.__queued_keys: List[Optional[Tuple[int, int]]] = [None] * len(self.__grid)
+        self.__queue: List[Tuple[int, int, int]] = []
+        self.__key_modifier = 0
+        # keys are lower bounds until the source is known, outdated ones are corrected when popped
+        self.__source_index = self.__goal_index
+        self.expanded_nodes: int = 0
+        self.timed_out: bool = False
+
+        self.__lookaheads[self.__goal_index] = 0
+        self.__push(self.__goal_index, self.__get_key(self.__goal_index))
+
+    def update_cells(self, changed_coordinates: Iterable[Coordinates]):
+        """ only the changed cells and cells around them can get another lookahead distance """
+        for coordinates in changed_coordinates:
+            index = self.__cells.get_index(self.__cells.get_by_coordinates(coordinates))
+            self.__update_vertex(index)
+            for neighbour_index in self.__neighbour_indexes[index]:
+                self.__update_vertex(neighbour_index)
+
+    def get_next_cell(self, player: Cell) -> Optional[Cell]:
+        """ None when the goal is not reachable or the search is out of time """
+        if self.get_distance(player) >= self.INFINITY:
+            return None
+
+        player_index = self.__cells.get_index(player)
+        next_index = min(self.__neighbour_indexes[player_index], key=lambda index: self.__distances[index])
+        if self.__distances[next_index] >= self.INFINITY:
+            return None
+
+        return self.__grid[next_index]
+
+    def get_distance(self, source: Cell) -> int:
+        """ INFINITY when the goal is not reachable or the search is out of time """
+        source_index = self.__cells.get_index(source)
+        self.__key_modifier += self.__grid[self.__source_index].coordinates.get_manhattan_distance(source.coordinates)
+        self.__source_index = source_index
+
+        started_at = Profiler.start()
+        self.__compute_shortest_path()
+        Profiler.stop('search', started_at)
+        Profiler.count('expanded nodes', self.expanded_nodes)
+        if self.timed_out:
+            return self.INFINITY
+
+        return self.__distances[source_index]
+
+    def __compute_shortest_path(self):
+        source_index = self.__source_index
+        self.expanded_nodes = 0
+        self.timed_out = False
+        distances = self.__distances
+        lookaheads = self.__lookaheads
+        queue = self.__queue
+        while True:
+            self.__drop_outdated()
+            if not queue:
+                break
+
+            source_key = self.__get_key(source_index)
+            if queue[0][:2] >= source_key and lookaheads[source_index] == distances[source_index]:
+                break
+
+            self.expanded_nodes += 1
+            if self.__is_out_of_time():
+                break
+
+            old_key = queue[0][:2]
+            index = heappop(queue)[2]
+            self.__queued_keys[index] = None
+            new_key = self.__get_key(index)
+            if old_key < new_key:
+                self.__push(index, new_key)
+            elif distances[index] > lookaheads[index]:
+                distances[index] = lookaheads[index]
+                for neighbour_index in self.__neighbour_indexes[index]:
+                    self.__update_vertex(neighbour_index)
+            else:
+                distances[index] = self.INFINITY
+                self.__update_vertex(index)
+                for neighbour_index in self.__neighbour_indexes[index]:
+                    self.__update_vertex(neighbour_index)
+
+    def __update_vertex(self, index: int):
+        if index != self.__goal_index:
+            lookahead = self.INFINITY
+            if self.__is_traversable(self.__grid[index]):
+                for neighbour_index in self.__neighbour_indexes[index]:
+                    distance = self.__distances[neighbour_index]
+                    if distance < lookahead and self.__is_traversable(self.__grid[neighbour_index]):
+                        lookahead = distance
+
+            self.__lookaheads[index] = min(self.INFINITY, lookahead + 1)
+
+        if self.__distances[index] != self.__lookaheads[index]:
+            self.__push(index, self.__get_key(index))
+        else:
+            self.__queued_keys[index] = None
+
+    def __push(self, index: int, key: Tuple[int, int]):
+        if self.__queued_keys[index] == key:
+            return
+
+        self.__queued_keys[index] = key
+        heappush(self.__queue, (key[0], key[1], index))
+
+    def __drop_outdated(self):
+        """ vertices are queued again instead of being updated in the queue, only the last key counts """
+        queue = self.__queue
+        while queue and self.__queued_keys[queue[0][2]] != queue[0][:2]:
+            heappop(queue)
+
+    def __get_key(self, index: int) -> Tuple[int, int]:
+        shortest = min(self.__distances[index], self.__lookaheads[index])
+        heuristic = self.__grid[index].coordinates.get_manhattan_distance(self.__grid[self.__source_index].coordinates)
+
+        return shortest + heuristic + self.__key_modifier, shortest
+
+    def __is_traversable(self, cell: Cell) -> bool:
+        return cell.is_passable() or self.__through_unknown and cell.is_unknown()
+
+    def __is_out_of_time(self) -> bool:
+        self.timed_out = self.__deadline is not None and self.__deadline.is_exceeded_every(self.expanded_nodes)
+
+        return self.timed_out
+
+
+class PathCache:
+    """
+    Paths by (source, target), target None is the closest frontier cell.
+    A path stays while the player follows it and is dropped only when a changed cell can block it,
+    change its target or open a shorter route: it lies on the path, next to the target,
+    or is passable and closer than the path length by Manhattan distance
+    """
+
+    def __init__(self, cells: CellCollection):
+        self.__cells = cells
+        self.__entries: Dict[Optional[int], Tuple[int, List[Cell], Set[int]]] = {}
+
+    def put(self, source: Cell, target: Optional[Cell], path: List[Cell]):
+        if not path:
+            self.drop(target)
+            return
+
+        path_indexes = {self.__cells.get_index(cell) for cell in path}
+        self.__entries[self.__get_target_key(target)] = (self.__cells.get_index(source), path, path_indexes)
+
+    def get_next_cell(self, source: Cell, target: Optional[Cell]) -> Optional[Cell]:
+        """ pops the next step, the rest of the path is kept for the next source """
+        target_key = self.__get_target_key(target)
+        entry = self.__entries.pop(target_key, None)
+        if not entry or entry[0] != self.__cells.get_index(source):
+            return None
+
+        source_index, path, path_indexes = entry
+        next_cell = path.pop()
+        if path:
+            self.__entries[target_key] = (self.__cells.get_index(next_cell), path, path_indexes)
+
+        return next_cell
+
+    def invalidate(self, changed_coordinates: Iterable[Coordinates]):
+        changed_coordinates = list(changed_coordinates)
+        grid = self.__cells.get_grid()
+        for target_key, (source_index, path, path_indexes) in list(self.__entries.items()):
+            source = grid[source_index].coordinates
+            for coordinates in changed_coordinates:
+                if self.__is_affected(source, target_key is None, path, path_indexes, coordinates):
+                    del self.__entries[target_key]
+                    break
+
+    def drop(self, target: Optional[Cell]):
+        self.__entries.pop(self.__get_target_key(target), None)
+
+    def __is_affected(
+            self,
+            source: Coordinates,
+            to_closest: bool,
+            path: List[Cell],
+            path_indexes: Set[int],
+            coordinates: Coordinates
+    ) -> bool:
+        target = path[0].coordinates
+        if coordinates.is_near(target):
+            return True
+
+        cell = self.__cells.get_by_coordinates(coordinates)
+        if self.__cells.get_index(cell) in path_indexes:
+            return True
+
+        if not cell.is_passable():
+            return False
+
+        # any route through the cell is at least this long
+        shortest_distance = source.get_manhattan_distance(coordinates)
+        if not to_closest:
+            shortest_distance += coordinates.get_manhattan_distance(target)
+
+        return shortest_distance < len(path)
+
+    def __get_target_key(self, target: Optional[Cell]) -> Optional[int]:
+        return self.__cells.get_index(target) if target else None
+
+
+class SearchMode(Enum):
+    BFS = 'BFS'
+    A_STAR = 'A_STAR'
+
+
+class PathFinder:
+    """
+    Based on the basic Sample algorythm from https://en.wikipedia.org/wiki/Pathfinding
+    and on A* from http://theory.stanford.edu/~amitp/GameProgramming/AStarComparison.html
+
+    The search works on a flat grid: cell with coordinates (x, y) has index y * width + x.
+    With a deadline the search gives up once the turn time is over, then the path is empty and timed_out is set
+    """
+    UNVISITED = -1
+    AVOIDED = -2
+
+    def __init__(self, game: Game, deadline: Optional[Deadline] = None):
+        self.__game: Game = game
+        self.__deadline: Optional[Deadline] = deadline
+        self.expanded_nodes: int = 0
+        self.total_expanded_nodes: int = 0
+        self.timed_out: bool = False
+
+    def get_path(
+            self,
+            target: Cell,
+            mode: SearchMode = SearchMode.BFS,
+            heuristic: Optional[Callable[[Coordinates, Coordinates], int]] = None
+    ) -> List[Cell]:
+        started_at = self.__start_search()
+        player = self.__game.player
+        if target is player:
+            return []
+
+        if mode == SearchMode.A_STAR:
+            parents = self.__search_a_star(target, heuristic or Coordinates.get_manhattan_distance)
+        else:
+            parents = self.__flood([target], goals=[player])[1]
+
+        self.__stop_search(started_at)
+        if self.timed_out:
+            return []
+
+        return self.__build_path(parents)
+
+    def get_path_to_closest(self, targets: Iterable[Cell], avoided: Optional[Cell] = None) -> List[Cell]:
+        """ floods from all targets at once, the path leads to the one closest to the player, not through avoided """
+        started_at = self.__start_search()
+        parents = self.__flood(targets, avoided, [self.__game.player])[1]
+        self.__stop_search(started_at)
+        if self.timed_out:
+            return []
+
+        return self.__build_path(parents)
+
+    def __start_search(self) -> float:
+        self.expanded_nodes = 0
+        self.timed_out = False
+
+        return Profiler.start()
+
+    def __stop_search(self, started_at: float):
+        Profiler.stop('search', started_at)
+        Profiler.count('expanded nodes', self.expanded_nodes)
+        self.total_expanded_nodes += self.expanded_nodes
+
+    def __flood(
+            self,
+            sources: Iterable[Cell],
+            avoided: Optional[Cell] = None,
+            goals: Iterable[Cell] = (),
+            slack: Optional[int] = None
+    ) -> Tuple[array, array]:
+        """
+        distances to the closest source and parents towards it. The flood stops once a goal is reached,
+        with slack it goes on up to slack steps past the closest goal
+        """
+        cells = self.__game.cells
+        grid = cells.get_grid()
+        neighbour_indexes = cells.get_neighbour_indexes()
+        codes = cells.get_codes()
+        is_goal = bytearray(len(grid))
+        for goal in goals:
+            is_goal[cells.get_index(goal)] = 1
+
+        distances = array('i', [self.UNVISITED]) * len(grid)
+        parents = array('i', [self.UNVISITED]) * len(grid)
+        if avoided:
+            distances[cells.get_index(avoided)] = self.AVOIDED
+
+        frontier = deque()
+        for source in sources:
+            source_index = cells.get_index(source)
+            if distances[source_index] == self.AVOIDED:
+                continue
+
+            distances[source_index] = 0
+            parents[source_index] = source_index
+            frontier.append(source_index)
+
+        max_distance = len(grid)
+        if any(is_goal[index] for index in frontier):
+            if slack is None:
+                return distances, parents
+
+            max_distance = slack
+
+        while frontier:
+            index = frontier.popleft()
+            if distances[index] >= max_distance:
+                break
+
+            self.expanded_nodes += 1
+            if self.__is_out_of_time():
+                break
+
+            for neighbour_index in neighbour_indexes[index]:
+                if distances[neighbour_index] != self.UNVISITED or not PASSABLE_BY_CODE[codes[neighbour_index]]:
+                    continue
+
+                distances[neighbour_index] = distances[index] + 1
+                parents[neighbour_index] = index
+                if is_goal[neighbour_index]:
+                    if slack is None:
+                        return distances, parents
+
+                    max_distance = min(max_distance, distances[neighbour_index] + slack)
+
+                frontier.append(neighbour_index)
+
+        return distances, parents
+
+    def __search_a_star(
+            self,
+            target: Cell,
+            heuristic: Callable[[Coordinates, Coordinates], int]
+    ) -> array:
+        """ searches from the target towards the player, so the path keeps the same order as the flood """
+        cells = self.__game.cells
+        grid = cells.get_grid()
+        neighbour_indexes = cells.get_neighbour_indexes()
+        codes = cells.get_codes()
+        player = self.__game.player
+        player_index = cells.get_index(player)
+        target_index = cells.get_index(target)
+
+        parents = array('i', [self.UNVISITED]) * len(grid)
+        distances = array('i', [self.UNVISITED]) * len(grid)
+        closed = bytearray(len(grid))
+        parents[target_index] = target_index
+        distances[target_index] = 0
+
+        estimation = heuristic(target.coordinates, player.coordinates)
+        open_set = [(estimation, estimation, target_index)]
+        while open_set:
+            _, _, index = heappop(open_set)
+            if closed[index]:
+                continue
+
+            if index == player_index:
+                break
+
+            closed[index] = 1
+            self.expanded_nodes += 1
+            if self.__is_out_of_time():
+                break
+
+            distance_to_target = distances[index] + 1
+            for neighbour_index in neighbour_indexes[index]:
+                if closed[neighbour_index]:
+                    continue
+
+                if distances[neighbour_index] != self.UNVISITED and distances[neighbour_index] <= distance_to_target:
+                    continue
+
+                if not PASSABLE_BY_CODE[codes[neighbour_index]]:
+                    continue
+
+                neighbour = grid[neighbour_index]
+
+                parents[neighbour_index] = index
+                distances[neighbour_index] = distance_to_target
+                # on equal estimation the cell closer to the player goes first
+                distance_to_player = heuristic(neighbour.coordinates, player.coordinates)
+                heappush(open_set, (distance_to_target + distance_to_player, distance_to_player, neighbour_index))
+
+        return parents
+
+    def __is_out_of_time(self) -> bool:
+        self.timed_out = self.__deadline is not None and self.__deadline.is_exceeded_every(self.expanded_nodes)
+
+        return self.timed_out
+
+    def __build_path(self, parents: array) -> List[Cell]:
+        """ follows parents from the player to the target, the player itself is not part of the path """
+        cells = self.__game.cells
+        grid = cells.get_grid()
+        index = cells.get_index(self.__game.player)
+        if parents[index] == self.UNVISITED:
+            return []
+
+        started_at = Profiler.start()
+        path = []
+        while parents[index] != index:
+            index = parents[index]
+            path.append(grid[index])
+
+        path.reverse()
+        Profiler.stop('path', started_at)
+
+        return path
+
+
+class ExplorationStrategy(ABC):
+    """
+    Picks the frontier cell to explore next, the path has the same order as PathFinder paths.
+    With KEEPS_TARGET the path is cached for its target, else for the closest frontier cell
+    """
+    KEEPS_TARGET = False
+
+    @abstractmethod
+    def get_path(self, path_finder: PathFinder, frontier: CellCollection, avoided: Optional[Cell]) -> List[Cell]:
+        pass
+
+
+class ClosestFrontierStrategy(ExplorationStrategy):
+    def get_path(self, path_finder: PathFinder, frontier: CellCollection, avoided: Optional[Cell]) -> List[Cell]:
+        return path_finder.get_path_to_closest(frontier, avoided)
+
+
+class DirectionDispatcher:
+    """
+    With a deadline searches give up when the turn time is over,
+    then the player continues the previous path or steps greedily towards the targets.
+    Paths are cached until update_paths() gets a change which can affect them,
+    the way back to the start is repaired incrementally.
+    The control room is visited before the whole region is explored only when the way back fits in the alarm.
+    Exploration strategy picks which frontier cell is explored next, the closest one by default
+    """
+
+    def __init__(
+            self,
+            game: Game,
+            deadline: Optional[Deadline] = None,
+            exploration_strategy: Optional[ExplorationStrategy] = None
+    ):
+        self.__game: Game = game
+        self.__deadline: Optional[Deadline] = deadline
+        self.__path_finder = PathFinder(game, deadline)
+        self.__exploration_strategy: ExplorationStrategy = exploration_strategy or ClosestFrontierStrategy()
+        self.__path_to_start: Optional[DStarLite] = None
+        self.__optimistic_path_to_start: Optional[DStarLite] = None
+        self.__is_return_proven: Optional[bool] = None
+        self.__path_cache = PathCache(game.cells)
+        self.__path_to_unknown: List[Cell] = []
+        self.__exploration_target: Optional[Cell] = None
+        self.__previous_cell: Optional[Cell] = None
+
+    def get_next_direction(self) -> Direction:
+        self.__game.cells.get_bitboard().visit(self.__game.player.coordinates)
+        next_cell = self.__get_next_cell()
+        self.__previous_cell = self.__game.player
+
+        return DirectionDefiner.get_direction(next_cell.coordinates, self.__game.player.coordinates)
+
+    def update_paths(self, changed_coordinates: Iterable[Coordinates]):
+        """ called every turn with cells changed since the previous one """
+        changed_coordinates = list(changed_coordinates)
+        self.__path_cache.invalidate(changed_coordinates)
+        if self.__path_to_start:
+            self.__path_to_start.update_cells(changed_coordinates)
+
+        if self.__optimistic_path_to_start:
+            self.__optimistic_path_to_start.update_cells(changed_coordinates)
+
+        if changed_coordinates:
+            self.__is_return_proven = None
+
+    def __get_next_cell(self) -> Cell:
+        player = self.__game.player
+        # Player needs to return to the start if time is running
+        if self.__game.time_is_running:
+            next_cell = self.__get_path_to_start().get_next_cell(player)
+
+            return next_cell or self.__get_greedy_cell([self.__game.cells.start])
+
+        # regions are behind when their update was out of time
+        if not self.__game.player.region:
+            return self.__continue_path_to_unknown() or self.__get_greedy_cell(self.__game.cells.get_frontier())
+
+        started_at = Profiler.start()
+        cells_border_with_unknown = self.__game.cells.get_frontier(self.__game.player.region)
+        Profiler.stop('frontier', started_at)
+
+        # If region is not yet fully explored and the way back from the control room may be too long
+        if cells_border_with_unknown and not self.__can_visit_control():
+            next_cell = self.__path_cache.get_next_cell(player, self.__exploration_target)
+            if next_cell:
+                return next_cell
+
+            # stepping on the control room starts the alarm
+            path_to_unknown = self.__exploration_strategy.get_path(
+                self.__path_finder, cells_border_with_unknown, self.__game.cells.control
+            )
+            if self.__path_finder.timed_out:
+                return self.__continue_path_to_unknown() or self.__get_greedy_cell(cells_border_with_unknown)
+
+            # the same list, so the path continues from the cache or without it when the cache drops it
+            self.__path_to_unknown = path_to_unknown
+            # entries are kept by target, so the abandoned target would be checked on every change
+            self.__path_cache.drop(self.__exploration_target)
+            self.__exploration_target = None
+            if path_to_unknown and self.__exploration_strategy.KEEPS_TARGET:
+                self.__exploration_target = path_to_unknown[0]
+
+            self.__path_cache.put(player, self.__exploration_target, path_to_unknown)
+            next_cell = self.__path_cache.get_next_cell(player, self.__exploration_target)
+            if next_cell:
+                return next_cell
+
+        control = self.__game.cells.control
+        next_cell = self.__path_cache.get_next_cell(player, control) if control else None
+        if next_cell:
+            return next_cell
+
+        # regions are kept by RegionsTracker, so it is a comparison instead of a flood
+        if control and control.region and control.region == player.region:
+            self.__path_cache.put(player, control, self.__path_finder.get_path(control, SearchMode.A_STAR))
+            if self.__path_finder.timed_out:
+                return self.__get_greedy_cell([control])
+
+            next_cell = self.__path_cache.get_next_cell(player, control)
+            if next_cell:
+                return next_cell
+
+        # the control room is not known or not reachable through the regions updated so far
+        return self.__continue_path_to_unknown() or self.__get_greedy_cell(self.__game.cells.get_frontier())
+
+    def __can_visit_control(self) -> bool:
+        """ the known way back fits in the alarm or exploring can't make it shorter, checked once per map change """
+        control = self.__game.cells.control
+        if not control or self.__game.alarm_rounds is None or control.region != self.__game.player.region:
+            return False
+
+        if self.__is_return_proven is None:
+            distance = self.__get_path_to_start().get_distance(control)
+            if distance >= DStarLite.INFINITY:
+                # out of time, the check continues on the next turn
+                return False
+
+            if distance <= self.__game.alarm_rounds:
+                self.__is_return_proven = True
+            else:
+                if not self.__optimistic_path_to_start:
+                    self.__optimistic_path_to_start = DStarLite(
+                        self.__game.cells, self.__game.cells.start, self.__deadline, through_unknown=True
+                    )
+
+                optimistic_distance = self.__optimistic_path_to_start.get_distance(control)
+                if self.__optimistic_path_to_start.timed_out:
+                    return False
+
+                self.__is_return_proven = optimistic_distance >= distance
+
+        return self.__is_return_proven
+
+    def __get_path_to_start(self) -> DStarLite:
+        if not self.__path_to_start:
+            self.__path_to_start = DStarLite(self.__game.cells, self.__game.cells.start, self.__deadline)
+
+        return self.__path_to_start
+
+    def __continue_path_to_unknown(self) -> Optional[Cell]:
+        """ previous path is still good while its next cell is next to the player """
+        if not self.__path_to_unknown:
+            return None
+
+        next_cell = self.__path_to_unknown[-1]
+        if not next_cell.is_passable() or not next_cell.coordinates.is_near(self.__game.player.coordinates):
+            self.__path_to_unknown = []
+            return None
+
+        return self.__path_to_unknown.pop()
+
+    def __get_greedy_cell(self, targets: Iterable[Cell]) -> Cell:
+        """
+        passable cell around the player closest to any target, unvisited win ties, going back is the last option.
+        The control room is stepped on only when the way back is proven or there is no other cell
+        """
+        player = self.__game.player
+        bitboard = self.__game.cells.get_bitboard()
+        neighbours = self.__game.cells.get_neighbours(player)
+        control = self.__game.cells.control
+        avoided = None
+        if control in neighbours and not self.__game.time_is_running and not self.__can_visit_control():
+            avoided = control
+
+        targets = list(targets)
+        greedy_cell = None
+        greedy_distance = None
+        for cell in neighbours:
+            if not cell.is_passable() or cell is avoided:
+                continue
+
+            distance = min([cell.coordinates.get_manhattan_distance(target.coordinates) for target in targets], default=0)
+            distance = distance * 2 + bitboard.is_visited(cell.coordinates)
+            if cell is self.__previous_cell:
+                distance += len(self.__game.cells) * 2
+
+            if greedy_distance is None or distance < greedy_distance:
+                greedy_cell = cell
+                greedy_distance = distance
+
+        return greedy_cell or avoided
+
+
+class CellBuilder:
+    @staticmethod
+    def build_cell(x: int, y: int) -> Cell:
+        return Cell(Coordinates.get(x, y))
+
+
+class Logger:
+    @staticmethod
+    def log(something):
+        print(str(something), file=sys.stderr, flush=True)
+
+
+class Profiler:
+    """
+    Timers of the turn phases and counters, summed up until dump().
+    Disabled by default, then every call returns at once
+    """
+    enabled: bool = False
+    __dump_every: int = 0
+    __turns: int = 0
+    __durations: Dict[str, float] = {}
+    __calls: Dict[str, int] = {}
+    __counters: Dict[str, int] = {}
+
+    @staticmethod
+    def enable(dump_every: int = 0):
+        """ dump_every: number of turns between summaries, 0 to dump only on demand """
+        Profiler.enabled = True
+        Profiler.__dump_every = dump_every
+        Profiler.reset()
+
+    @staticmethod
+    def reset():
+        Profiler.__turns = 0
+        Profiler.__durations = {}
+        Profiler.__calls = {}
+        Profiler.__counters = {}
+
+    @staticmethod
+    def start() -> float:
+        return time.perf_counter() if Profiler.enabled else 0.0
+
+    @staticmethod
+    def stop(phase: str, started_at: float):
+        if not Profiler.enabled:
+            return
+
+        Profiler.__durations[phase] = Profiler.__durations.get(phase, 0.0) + time.perf_counter() - started_at
+        Profiler.__calls[phase] = Profiler.__calls.get(phase, 0) + 1
+
+    @staticmethod
+    def count(counter: str, value: int = 1):
+        if not Profiler.enabled:
+            return
+
+        Profiler.__counters[counter] = Profiler.__counters.get(counter, 0) + value
+
+    @staticmethod
+    def end_turn():
+        if not Profiler.enabled:
+            return
+
+        Profiler.__turns += 1
+        if Profiler.__dump_every and Profiler.__turns % Profiler.__dump_every == 0:
+            Profiler.dump()
+
+    @staticmethod
+    def dump():
+        summary = ['turns {}'.format(Profiler.__turns)]
+        for phase, duration in Profiler.__durations.items():
+            summary.append('{} {}x {:.1f}ms'.format(phase, Profiler.__calls[phase], duration * 1000))
+
+        for counter, value in Profiler.__counters.items():
+            summary.append('{} {}'.format(counter, value))
+
+        Logger.log(' | '.join(summary))
+
+
+class RegionsTracker:
+    """
+    Keeps Cell.region up to date using only the cells changed during the turn.
+    Revealed cells keep their type, so regions can only appear and merge: each region is a set in DisjointSet
+    and its number is index of the root cell + 1 (0 is for cells which are not passable).
+    With a deadline, cells left when the turn time is over are processed during the next turns
+    """
+    # regions are updated before the searches, so the clock is read more often than Deadline.CHECK_MASK
+    DEADLINE_CHECK_MASK = 63
+
+    def __init__(self, cells: CellCollection, deadline: Optional[Deadline] = None):
+        self.__cells = cells
+        self.__deadline: Optional[Deadline] = deadline
+        size = len(cells.get_grid())
+        self.__regions = DisjointSet(size)
+        self.__passable = bytearray(size)
+        self.__pending_coordinates: Deque[Coordinates] = deque()
+
+    def update_regions(self, changed_coordinates: Iterable[Coordinates]):
+        started_at = Profiler.start()
+        processed = self.__update_regions(changed_coordinates)
+        Profiler.stop('regions', started_at)
+        Profiler.count('region cells', processed)
+
+    def __update_regions(self, changed_coordinates: Iterable[Coordinates]) -> int:
+        """ returns the number of processed cells """
+        cells = self.__cells
+        neighbour_indexes = cells.get_neighbour_indexes()
+        pending_coordinates = self.__pending_coordinates
+        pending_coordinates.extend(changed_coordinates)
+        processed = 0
+        while pending_coordinates:
+            processed += 1
+            if self.__deadline and self.__deadline.is_exceeded_every(processed, self.DEADLINE_CHECK_MASK):
+                return processed
+
+            coordinates = pending_coordinates.popleft()
+            cell = cells.get_by_coordinates(coordinates)
+            index = cells.get_index(cell)
+            if self.__passable[index]:
+                if not cell.is_passable():
+                    # regions can't be split, so everything is calculated again
+                    return processed + self.reset()
+
+                continue
+
+            if not cell.is_passable():
+                cell.region = 0
+                continue
+
+            self.__passable[index] = 1
+            cells.add_to_region(cell, index + 1)
+            for neighbour_index in neighbour_indexes[index]:
+                if self.__passable[neighbour_index]:
+                    self.__merge(index, neighbour_index)
+
+        return processed
+
+    def reset(self) -> int:
+        """ calculates all regions again, returns the number of processed cells """
+        self.__regions = DisjointSet(len(self.__passable))
+        self.__passable = bytearray(len(self.__passable))
+        self.__pending_coordinates = deque()
+        for cell in self.__cells.get_grid():
+            cell.region = 0
+
+        self.__cells.index_regions()
+
+        return self.__update_regions([cell.coordinates for cell in self.__cells.get_grid()])
+
+    def __merge(self, first: int, second: int):
+        first_root = self.__regions.find(first)
+        second_root = self.__regions.find(second)
+        if first_root == second_root:
+            return
+
+        root = self.__regions.union(first_root, second_root)
+        merged_root = second_root if root == first_root else first_root
+        self.__cells.merge_regions(root + 1, merged_root + 1)
+
+
+class TurnReader:
+    """
+    Reads the binary stdin: a line of numbers with one call and all rows of the maze with another.
+    Rows stay in one bytes block, row i starts at i * get_row_stride(width)
+    """
+
+    def __init__(self, stream: Optional[BinaryIO] = None):
+        self.__stream: BinaryIO = stream or sys.stdin.buffer
+        self.__line_end_length: int = 1
+
+    def read_numbers(self) -> List[int]:
+        line = self.__stream.readline()
+        if line.endswith(b'\r\n'):
+            self.__line_end_length = 2
+
+        return [int(number) for number in line.split()]
+
+    def read_rows(self, width: int, height: int) -> bytes:
+        size = self.get_row_stride(width) * height
+        block = self.__stream.read(size)
+        if len(block) < size:
+            raise EOFError('{} bytes of rows expected, {} read'.format(size, len(block)))
+
+        return block
+
+    def get_row_stride(self, width: int) -> int:
+        return width + self.__line_end_length
+
+
+class DirectionDefiner:
+    @staticmethod
+    def get_direction(target_coordinates: Coordinates, player_coordinates: Coordinates) -> Direction:
+        for direction, vector in VECTORS.items():
+            if target_coordinates.x - player_coordinates.x == vector.x and \
+                    target_coordinates.y - player_coordinates.y == vector.y:
+                return direction
+
+
+# Auto-generated code below aims at helping you parse
+# the standard input according to the problem statement.
+
+# r: number of rows.
+# c: number of columns.
+# a: number of rounds between the time the alarm countdown is activated and the time the alarm goes off.
+# the whole turn is read at once from the binary stdin, so input() must not be used
+turn_reader = TurnReader()
+r, c, a = turn_reader.read_numbers()
+
+
+# labyrinth loop
+game_map = Map(c, r)
+game = Game(game_map, a)
+for i in range(r):
+    for j in range(c):
+        cell = CellBuilder.build_cell(j, i)
+        game.cells.add(cell)
+
+# turns between profiler summaries on stderr, 0 keeps the profiler off
+PROFILE_EVERY_TURNS = 0
+if PROFILE_EVERY_TURNS:
+    Profiler.enable(PROFILE_EVERY_TURNS)
+
+# time to answer is limited, the rest of the turn is a safety margin
+deadline = Deadline(0.1)
+direction_dispatcher = DirectionDispatcher(game, deadline)
+regions_tracker = RegionsTracker(game.cells, deadline)
+
+turn = 0
+
+while True:
+    turn += 1
+    # kr: row where Rick is located.
+    # kc: column where Rick is located.
+    kr, kc = turn_reader.read_numbers()
+    deadline.start()
+    current_coordinates = Coordinates.get(kc, kr)
+
+    # C of the characters in '#.TC?' (i.e. one line of the ASCII maze).
+    started_at = Profiler.start()
+    rows_block = turn_reader.read_rows(c, r)
+    Profiler.stop('input', started_at)
+    changed_coordinates = game.cells.update_block(rows_block, turn_reader.get_row_stride(c))
+
+    regions_tracker.update_regions(changed_coordinates)
+    direction_dispatcher.update_paths(changed_coordinates)
+
+    current_cell = game.cells.get_by_coordinates(current_coordinates)
+    if current_cell.is_control():
+        game.time_is_running = True
+
+    game.player = current_cell
+
+    selected_direction = direction_dispatcher.get_next_direction()
+    # stdin is read without input(), which flushed stdout before reading
+    print(selected_direction.value, flush=True)
+    Profiler.end_turn()
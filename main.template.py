@@ -1,11 +1,3 @@
-from typing import Optional, Tuple, Iterator, List
-import numpy as np
-import sys
-from math import sqrt, acos
-from enum import Enum
-from abc import abstractmethod, ABC
-
-
 {placeholder}
 
 
@@ -15,19 +7,28 @@ from abc import abstractmethod, ABC
 # r: number of rows.
 # c: number of columns.
 # a: number of rounds between the time the alarm countdown is activated and the time the alarm goes off.
-r, c, a = [int(i) for i in input().split()]
+# the whole turn is read at once from the binary stdin, so input() must not be used
+turn_reader = TurnReader()
+r, c, a = turn_reader.read_numbers()
 
 
 # labyrinth loop
 game_map = Map(c, r)
-game = Game(game_map)
+game = Game(game_map, a)
 for i in range(r):
     for j in range(c):
         cell = CellBuilder.build_cell(j, i)
         game.cells.add(cell)
 
-direction_dispatcher = DirectionDispatcher(game)
-regions_extractor = RegionsExtractor(game.cells, game_map)
+# turns between profiler summaries on stderr, 0 keeps the profiler off
+PROFILE_EVERY_TURNS = 0
+if PROFILE_EVERY_TURNS:
+    Profiler.enable(PROFILE_EVERY_TURNS)
+
+# time to answer is limited, the rest of the turn is a safety margin
+deadline = Deadline(0.1)
+direction_dispatcher = DirectionDispatcher(game, deadline)
+regions_tracker = RegionsTracker(game.cells, deadline)
 
 turn = 0
 
@@ -35,15 +36,18 @@ while True:
     turn += 1
     # kr: row where Rick is located.
     # kc: column where Rick is located.
-    kr, kc = [int(i) for i in input().split()]
-    current_coordinates = Coordinates(kc, kr)
+    kr, kc = turn_reader.read_numbers()
+    deadline.start()
+    current_coordinates = Coordinates.get(kc, kr)
 
-    for i in range(r):
-        row = input()  # C of the characters in '#.TC?' (i.e. one line of the ASCII maze).
-        for j, cell_type in enumerate(row):
-            game.cells.update_cell(j, i, cell_type)
+    # C of the characters in '#.TC?' (i.e. one line of the ASCII maze).
+    started_at = Profiler.start()
+    rows_block = turn_reader.read_rows(c, r)
+    Profiler.stop('input', started_at)
+    changed_coordinates = game.cells.update_block(rows_block, turn_reader.get_row_stride(c))
 
-    regions_extractor.assign_regions()
+    regions_tracker.update_regions(changed_coordinates)
+    direction_dispatcher.update_paths(changed_coordinates)
 
     current_cell = game.cells.get_by_coordinates(current_coordinates)
     if current_cell.is_control():
@@ -52,4 +56,6 @@ while True:
     game.player = current_cell
 
     selected_direction = direction_dispatcher.get_next_direction()
-    print(selected_direction.value)
+    # stdin is read without input(), which flushed stdout before reading
+    print(selected_direction.value, flush=True)
+    Profiler.end_turn()
@@ -0,0 +1,147 @@
+import random
+from collections import deque
+from enum import Enum
+from typing import List, Tuple
+
+
+class MazeKind(Enum):
+    PERFECT = 'perfect'
+    OPEN = 'open'
+    CAVE = 'cave'
+
+
+class Maze:
+    def __init__(self, rows: List[str], start: Tuple[int, int], control: Tuple[int, int], alarm_rounds: int):
+        self.rows: List[str] = rows
+        self.width: int = len(rows[0])
+        self.height: int = len(rows)
+        self.start: Tuple[int, int] = start
+        self.control: Tuple[int, int] = control
+        self.alarm_rounds: int = alarm_rounds
+
+
+class MazeGenerator:
+    """
+    Deterministic mazes of '#.TC' for benchmarks and simulation.
+    The control room is the passable cell farthest from the start,
+    the alarm gives exactly the rounds of the shortest way back
+    """
+    WALL = '#'
+    EMPTY = '.'
+    START = 'T'
+    CONTROL_ROOM = 'C'
+
+    def __init__(self, seed: int = 0):
+        self.__random = random.Random(seed)
+
+    def generate(self, kind: MazeKind, width: int, height: int) -> Maze:
+        if kind == MazeKind.CAVE:
+            grid = self.__generate_cave(width, height)
+        else:
+            grid = self.__generate_perfect(width, height)
+            if kind == MazeKind.OPEN:
+                self.__carve_rooms(grid)
+
+        passable = [(x, y) for y in range(height) for x in range(width) if grid[y][x] == self.EMPTY]
+        start = self.__random.choice(passable)
+        distances = self.__get_distances(grid, start)
+        control = max(distances, key=lambda coordinates: (distances[coordinates], coordinates))
+
+        grid[start[1]][start[0]] = self.START
+        grid[control[1]][control[0]] = self.CONTROL_ROOM
+
+        return Maze([''.join(row) for row in grid], start, control, distances[control])
+
+    def __generate_perfect(self, width: int, height: int) -> List[List[str]]:
+        """ iterative recursive backtracker, passages are on odd coordinates """
+        grid = [[self.WALL] * width for _ in range(height)]
+        grid[1][1] = self.EMPTY
+        stack = [(1, 1)]
+        while stack:
+            x, y = stack[-1]
+            candidates = []
+            for step_x, step_y in ((2, 0), (-2, 0), (0, 2), (0, -2)):
+                next_x, next_y = x + step_x, y + step_y
+                if 0 < next_x < width - 1 and 0 < next_y < height - 1 and grid[next_y][next_x] == self.WALL:
+                    candidates.append((next_x, next_y))
+
+            if not candidates:
+                stack.pop()
+                continue
+
+            next_x, next_y = self.__random.choice(candidates)
+            grid[(y + next_y) // 2][(x + next_x) // 2] = self.EMPTY
+            grid[next_y][next_x] = self.EMPTY
+            stack.append((next_x, next_y))
+
+        return grid
+
+    def __carve_rooms(self, grid: List[List[str]]):
+        height = len(grid)
+        width = len(grid[0])
+        for _ in range(max(1, width * height // 150)):
+            room_width = self.__random.randint(3, 9)
+            room_height = self.__random.randint(3, 7)
+            left = self.__random.randint(1, max(1, width - room_width - 1))
+            top = self.__random.randint(1, max(1, height - room_height - 1))
+            for y in range(top, min(top + room_height, height - 1)):
+                for x in range(left, min(left + room_width, width - 1)):
+                    grid[y][x] = self.EMPTY
+
+    def __generate_cave(self, width: int, height: int) -> List[List[str]]:
+        """ cellular automaton, only the largest cave is kept """
+        grid = [
+            [self.WALL if self.__random.random() < 0.45 else self.EMPTY for _ in range(width)]
+            for _ in range(height)
+        ]
+        for _ in range(4):
+            smoothed = [[self.WALL] * width for _ in range(height)]
+            for y in range(1, height - 1):
+                for x in range(1, width - 1):
+                    walls = sum(
+                        grid[y + step_y][x + step_x] == self.WALL
+                        for step_y in (-1, 0, 1) for step_x in (-1, 0, 1)
+                    )
+                    smoothed[y][x] = self.WALL if walls >= 5 else self.EMPTY
+
+            grid = smoothed
+
+        largest_cave = set()
+        unseen = {(x, y) for y in range(height) for x in range(width) if grid[y][x] == self.EMPTY}
+        while unseen:
+            cave = set(self.__get_distances(grid, unseen.pop()))
+            unseen -= cave
+            if len(cave) > len(largest_cave):
+                largest_cave = cave
+
+        if len(largest_cave) < 2:
+            return self.__generate_perfect(width, height)
+
+        for y in range(height):
+            for x in range(width):
+                if (x, y) not in largest_cave:
+                    grid[y][x] = self.WALL
+
+        return grid
+
+    def __get_distances(self, grid: List[List[str]], source: Tuple[int, int]) -> dict:
+        distances = {source: 0}
+        frontier = deque([source])
+        while frontier:
+            x, y = frontier.popleft()
+            for step_x, step_y in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+                neighbour = (x + step_x, y + step_y)
+                if neighbour in distances or not self.__is_passable(grid, neighbour):
+                    continue
+
+                distances[neighbour] = distances[(x, y)] + 1
+                frontier.append(neighbour)
+
+        return distances
+
+    def __is_passable(self, grid: List[List[str]], coordinates: Tuple[int, int]) -> bool:
+        x, y = coordinates
+        if not (0 <= y < len(grid) and 0 <= x < len(grid[0])):
+            return False
+
+        return grid[y][x] != self.WALL
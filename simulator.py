@@ -0,0 +1,233 @@
+import argparse
+import io
+import os
+import sys
+import time
+from typing import List, Callable, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'labyrinth'))
+
+from common.coordinates import Coordinates
+from common.deadline import Deadline
+from entity.dictionaries import Direction
+from entity.map import Map
+from game import Game
+from logic.exploration_strategy import ClosestFrontierStrategy
+from logic.information_gain_strategy import InformationGainStrategy
+from logic.move_dispatcher import DirectionDispatcher
+from maze_generator import MazeGenerator, MazeKind, Maze
+from service.cell_builder import CellBuilder
+from service.regions_extractor import RegionsExtractor, RegionsBackend
+from service.profiler import Profiler
+from service.regions_tracker import RegionsTracker
+from service.turn_reader import TurnReader
+
+
+class Simulator:
+    """
+    Plays the puzzle without the referee: owns the hidden maze, reveals the scanner window around the player,
+    writes the turn as the referee does and runs the same calls as main.template.py on it,
+    the player is moved by the rules of Referee.
+
+    measure(component, function, *args) is called for every step of the turn, so a benchmark can time them
+    """
+    SCANNER_RADIUS = 2
+    MAX_TURNS = 1200
+    MOVES = {'UP': (0, -1), 'RIGHT': (1, 0), 'DOWN': (0, 1), 'LEFT': (-1, 0)}
+
+    ESCAPED = 'escaped'
+    WALKED_INTO_WALL = 'walked into a wall'
+    ALARM_WENT_OFF = 'alarm went off'
+    OUT_OF_TURNS = 'out of turns'
+
+    def __init__(
+            self,
+            maze: Maze,
+            regions: str = 'tracker',
+            max_turns: int = MAX_TURNS,
+            measure: Optional[Callable] = None,
+            budget: Optional[float] = None,
+            exploration: str = 'closest'
+    ):
+        self.__maze = maze
+        self.__exploration = exploration
+        self.__regions = regions
+        self.__max_turns = max_turns
+        self.__deadline: Optional[Deadline] = Deadline(budget) if budget else None
+        self.__measure = measure or self.__call
+        self.__game: Optional[Game] = None
+        self.__direction_dispatcher: Optional[DirectionDispatcher] = None
+        self.__regions_tracker: Optional[RegionsTracker] = None
+        self.__regions_extractor: Optional[RegionsExtractor] = None
+        self.turns: int = 0
+        self.result: str = ''
+
+    def run(self) -> str:
+        maze = self.__maze
+        measure = self.__measure
+
+        game_map = Map(maze.width, maze.height)
+        game = Game(game_map, maze.alarm_rounds)
+        for i in range(maze.height):
+            for j in range(maze.width):
+                game.cells.add(CellBuilder.build_cell(j, i))
+
+        self.__game = game
+        if self.__exploration == 'information-gain':
+            exploration_strategy = InformationGainStrategy(game)
+        else:
+            exploration_strategy = ClosestFrontierStrategy()
+        self.__direction_dispatcher = DirectionDispatcher(game, self.__deadline, exploration_strategy)
+        if self.__regions == 'tracker':
+            self.__regions_tracker = RegionsTracker(game.cells, self.__deadline)
+        else:
+            self.__regions_extractor = RegionsExtractor(game.cells, game_map, RegionsBackend(self.__regions.upper()))
+
+        known_rows = [['?'] * maze.width for _ in range(maze.height)]
+        rows = [''.join(row) for row in known_rows]
+        referee = Referee(maze)
+
+        for turn in range(1, self.__max_turns + 1):
+            self.turns = turn
+            self.__scan(known_rows, rows, referee.player_x, referee.player_y)
+
+            turn_input = '{} {}\n'.format(referee.player_y, referee.player_x) + ''.join(row + '\n' for row in rows)
+            direction = measure('turn', self.__play_turn, turn_input.encode('ascii'))
+
+            result = referee.move(direction.value)
+            if result:
+                return self.__finish(result)
+
+        return self.__finish(self.OUT_OF_TURNS)
+
+    def __play_turn(self, turn_input: bytes) -> Direction:
+        measure = self.__measure
+        game = self.__game
+        maze = self.__maze
+        turn_reader = TurnReader(io.BytesIO(turn_input))
+        player_y, player_x = turn_reader.read_numbers()
+        if self.__deadline:
+            self.__deadline.start()
+
+        rows_block = measure('input', turn_reader.read_rows, maze.width, maze.height)
+        changed_coordinates = measure(
+            'rows', game.cells.update_block, rows_block, turn_reader.get_row_stride(maze.width)
+        )
+        if self.__regions_tracker:
+            measure('regions', self.__regions_tracker.update_regions, changed_coordinates)
+        else:
+            measure('regions', self.__regions_extractor.assign_regions)
+
+        self.__direction_dispatcher.update_paths(changed_coordinates)
+
+        current_cell = game.cells.get_by_coordinates(Coordinates.get(player_x, player_y))
+        if current_cell.is_control():
+            game.time_is_running = True
+
+        game.player = current_cell
+
+        direction = measure('dispatcher', self.__direction_dispatcher.get_next_direction)
+        Profiler.end_turn()
+
+        return direction
+
+    def __finish(self, result: str) -> str:
+        self.result = result
+
+        return result
+
+    def __scan(self, known_rows: List[List[str]], rows: List[str], player_x: int, player_y: int):
+        maze = self.__maze
+        top = max(0, player_y - self.SCANNER_RADIUS)
+        bottom = min(maze.height, player_y + self.SCANNER_RADIUS + 1)
+        left = max(0, player_x - self.SCANNER_RADIUS)
+        right = min(maze.width, player_x + self.SCANNER_RADIUS + 1)
+        for y in range(top, bottom):
+            known_rows[y][left:right] = maze.rows[y][left:right]
+            rows[y] = ''.join(known_rows[y])
+
+    @staticmethod
+    def __call(component: str, function: Callable, *args):
+        return function(*args)
+
+
+class Referee:
+    """
+    Rules of the puzzle for a player moving on the hidden maze: walls end the game,
+    the alarm starts on the control room and every next move uses one of its rounds.
+    The start has to be reached before the rounds run out
+    """
+
+    def __init__(self, maze: Maze):
+        self.__maze = maze
+        self.player_x, self.player_y = maze.start
+        self.__alarm_rounds_left: Optional[int] = None
+
+    def move(self, direction: str) -> Optional[str]:
+        """ result of the game when the move ends it """
+        step_x, step_y = Simulator.MOVES[direction]
+        self.player_x += step_x
+        self.player_y += step_y
+        cell_type = self.__maze.rows[self.player_y][self.player_x]
+        if cell_type == MazeGenerator.WALL:
+            return Simulator.WALKED_INTO_WALL
+
+        if self.__alarm_rounds_left is None:
+            if cell_type == MazeGenerator.CONTROL_ROOM:
+                self.__alarm_rounds_left = self.__maze.alarm_rounds
+
+            return None
+
+        self.__alarm_rounds_left -= 1
+        if self.__alarm_rounds_left < 0:
+            return Simulator.ALARM_WENT_OFF
+
+        if cell_type == MazeGenerator.START:
+            return Simulator.ESCAPED
+
+        return None
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Plays generated mazes in process and reports the results')
+    parser.add_argument('--sizes', default='30x15,60x30,100x50')
+    parser.add_argument('--kinds', default=','.join(kind.value for kind in MazeKind))
+    parser.add_argument('--games', type=int, default=100, help='games per size and kind, seeds start from 0')
+    parser.add_argument('--regions', default='tracker', choices=['tracker', 'sequential', 'numpy', 'bitboard'])
+    parser.add_argument('--max-turns', type=int, default=Simulator.MAX_TURNS)
+    parser.add_argument('--budget', type=float, help='seconds per turn, searches give up after it')
+    parser.add_argument('--exploration', default='closest', choices=['closest', 'information-gain'])
+    parser.add_argument('--profile', type=int, help='turns between profiler summaries on stderr, 0 for game end only')
+    parser.add_argument('--verbose', action='store_true', help='print result of every game')
+    arguments = parser.parse_args()
+
+    started_at = time.perf_counter()
+    games = 0
+    results = {}
+    for size in arguments.sizes.split(','):
+        width, height = [int(dimension) for dimension in size.split('x')]
+        for kind in arguments.kinds.split(','):
+            total_turns = 0
+            kind_results = {}
+            for seed in range(arguments.games):
+                maze = MazeGenerator(seed).generate(MazeKind(kind), width, height)
+                simulator = Simulator(
+                    maze, arguments.regions, arguments.max_turns, budget=arguments.budget, exploration=arguments.exploration
+                )
+                if arguments.profile is not None:
+                    Profiler.enable(arguments.profile)
+
+                result = simulator.run()
+                if arguments.profile is not None:
+                    Profiler.dump()
+                games += 1
+                total_turns += simulator.turns
+                kind_results[result] = kind_results.get(result, 0) + 1
+                results[result] = results.get(result, 0) + 1
+                if arguments.verbose:
+                    print('{} {} seed {}: {} after {} turns'.format(kind, size, seed, result, simulator.turns))
+
+            print('{} {}: {}, {} turns in total'.format(kind, size, kind_results, total_turns))
+
+    elapsed = time.perf_counter() - started_at
+    print('{} games in {:.1f} s ({:.0f} games per minute): {}'.format(games, elapsed, games * 60 / elapsed, results))
@@ -0,0 +1,198 @@
+import ast
+import os
+import unittest
+
+from build import BundleOptimiser, ProjectBuilder
+
+
+class BundleOptimiserTest(unittest.TestCase):
+    """ optimised code has to compute the same result as the code it comes from """
+
+    def optimise(self, code: str) -> str:
+        optimised_code = BundleOptimiser().optimise(code)
+        self.assertEqual(self.run_code(code), self.run_code(optimised_code))
+
+        return optimised_code
+
+    @staticmethod
+    def run_code(code: str):
+        namespace = {}
+        exec(compile(code, '<bundle>', 'exec'), namespace)
+
+        return namespace.get('result')
+
+    def test_strips_annotations_and_docstrings(self):
+        optimised_code = self.optimise(
+            'from typing import List\n'
+            'class Box:\n'
+            '    """ box """\n'
+            '    size: int = 2\n'
+            '    def get_sizes(self, count: int) -> List[int]:\n'
+            '        """ sizes """\n'
+            '        return [self.size] * count\n'
+            'result = Box().get_sizes(3)\n'
+        )
+
+        self.assertNotIn('typing', optimised_code)
+        self.assertNotIn('"""', optimised_code)
+        self.assertNotIn('int', optimised_code)
+
+    def test_folds_class_constants_but_not_enum_members(self):
+        optimised_code = self.optimise(
+            'from enum import Enum\n'
+            'class Color(Enum):\n'
+            '    RED = 1\n'
+            'class Search:\n'
+            '    INFINITY = 2 ** 30\n'
+            '    def get_limit(self, color):\n'
+            '        return self.INFINITY if color is Color.RED else 0\n'
+            'result = Search().get_limit(Color.RED)\n'
+        )
+
+        self.assertIn('1073741824 if', optimised_code)
+        self.assertIn('Color.RED', optimised_code)
+
+    def test_folds_tables_of_value_objects_into_tuples(self):
+        optimised_code = self.optimise(
+            'class Point:\n'
+            '    __slots__ = (\'x\', \'y\')\n'
+            '    def __init__(self, x, y):\n'
+            '        self.x = x\n'
+            '        self.y = y\n'
+            'STEPS = {\'RIGHT\': Point(1, 0), \'UP\': Point(0, -1)}\n'
+            'def get_moves():\n'
+            '    return [(name, step.x * 10 + step.y) for name, step in STEPS.items()]\n'
+            'result = get_moves()\n'
+        )
+
+        self.assertIn("'RIGHT': (1, 0)", optimised_code)
+        self.assertNotIn('step.x', optimised_code)
+
+    def test_keeps_tables_used_as_objects(self):
+        optimised_code = self.optimise(
+            'class Point:\n'
+            '    __slots__ = (\'x\', \'y\')\n'
+            '    def __init__(self, x, y):\n'
+            '        self.x = x\n'
+            '        self.y = y\n'
+            'STEPS = {\'RIGHT\': Point(1, 0)}\n'
+            'result = [type(step).__name__ for step in STEPS.values()]\n'
+        )
+
+        self.assertIn('Point(1, 0)', optimised_code)
+
+    def test_inlines_chains_of_simple_methods(self):
+        optimised_code = self.optimise(
+            'class Items:\n'
+            '    def __init__(self, elements):\n'
+            '        self.__elements = elements\n'
+            '    def count(self):\n'
+            '        return len(self.__elements)\n'
+            '    def is_empty(self):\n'
+            '        return self.count() == 0\n'
+            '    def __len__(self):\n'
+            '        return self.count()\n'
+            'items = Items([1, 2])\n'
+            'result = (items.is_empty(), len(items), [1, 1, 2].count(1))\n'
+        )
+
+        self.assertIn('len(items._Items__elements) == 0', optimised_code)
+        self.assertIn('[1, 1, 2].count(1)', optimised_code)
+        self.assertNotIn('def is_empty', optimised_code)
+
+    def test_does_not_inline_methods_of_imported_modules(self):
+        optimised_code = self.optimise(
+            'import time\n'
+            'import math\n'
+            'class Clock:\n'
+            '    def __init__(self):\n'
+            '        self.t = 1\n'
+            '        self.tau = 2\n'
+            '    def monotonic(self):\n'
+            '        return self.t + 1\n'
+            '    @property\n'
+            '    def pi(self):\n'
+            '        return self.tau / 2\n'
+            'clock = Clock()\n'
+            'result = (time.monotonic() > 0, clock.monotonic(), math.pi > 3, clock.pi)\n'
+        )
+
+        self.assertIn('time.monotonic()', optimised_code)
+        self.assertIn('math.pi', optimised_code)
+        self.assertIn('clock.t + 1', optimised_code)
+
+    def test_does_not_inline_methods_sharing_the_name_and_arity(self):
+        optimised_code = self.optimise(
+            'class First:\n'
+            '    def get(self):\n'
+            '        return 1\n'
+            'class Second:\n'
+            '    def get(self):\n'
+            '        return 2\n'
+            'result = [item.get() for item in (First(), Second())]\n'
+        )
+
+        self.assertIn('item.get()', optimised_code)
+
+    def test_does_not_inline_names_of_builtin_methods_with_the_same_arity(self):
+        optimised_code = self.optimise(
+            'class Stack:\n'
+            '    def __init__(self):\n'
+            '        self.top = 3\n'
+            '    def pop(self):\n'
+            '        return self.top\n'
+            'values = [1, 2]\n'
+            'result = (values.pop(), Stack().pop())\n'
+        )
+
+        self.assertIn('values.pop()', optimised_code)
+
+    def test_does_not_inline_shadowed_globals(self):
+        optimised_code = self.optimise(
+            'LIMIT = [5]\n'
+            'class Range:\n'
+            '    def __init__(self):\n'
+            '        self.start = 1\n'
+            '    def get_limit(self):\n'
+            '        return LIMIT[0] + self.start\n'
+            'def read(bounds):\n'
+            '    LIMIT = [0]\n'
+            '    return bounds.get_limit() + LIMIT[0]\n'
+            'result = read(Range())\n'
+        )
+
+        self.assertIn('bounds.get_limit()', optimised_code)
+
+    def test_replaces_plain_properties_with_attributes(self):
+        optimised_code = self.optimise(
+            'class Segment:\n'
+            '    def __init__(self, start):\n'
+            '        self.start = start\n'
+            '    @property\n'
+            '    def start(self):\n'
+            '        return self.__start\n'
+            '    @start.setter\n'
+            '    def start(self, start):\n'
+            '        self.__start = start\n'
+            'segment = Segment(1)\n'
+            'segment.start += 1\n'
+            'result = segment.start\n'
+        )
+
+        self.assertNotIn('@property', optimised_code)
+
+    def test_optimises_the_bundle_into_valid_code(self):
+        root_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        template_file_resource = open(os.path.join(root_path, 'main.template.py'), 'r')
+        template_file_content = template_file_resource.read()
+        template_file_resource.close()
+
+        for tree_shaking in (True, False):
+            project_builder = ProjectBuilder(
+                os.path.join(root_path, 'labyrinth'), tree_shaking=tree_shaking, optimiser=BundleOptimiser()
+            )
+            ast.parse(project_builder.build(template_file_content))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+import unittest
+
+from entity.map import Map
+from game import Game
+from service.cell_builder import CellBuilder
+
+
+class CellCollectionTest(unittest.TestCase):
+    """ only cells which differ from the previous rows are reported, cells start unknown """
+
+    @staticmethod
+    def create_game(width: int, height: int) -> Game:
+        game = Game(Map(width, height))
+        for y in range(height):
+            for x in range(width):
+                game.cells.add(CellBuilder.build_cell(x, y))
+
+        return game
+
+    def test_first_rows_report_only_revealed_cells(self):
+        game = self.create_game(6, 4)
+        rows = ['??????', '?.T#??', '??????', '??????']
+        changed_coordinates = game.cells.update_rows(rows)
+
+        self.assertEqual({(1, 1), (2, 1), (3, 1)}, {
+            (coordinates.x, coordinates.y) for coordinates in changed_coordinates
+        })
+        self.assertEqual({(1, 1), (2, 1)}, {
+            (cell.coordinates.x, cell.coordinates.y) for cell in game.cells.get_frontier()
+        })
+
+    def test_block_reports_the_same_cells_as_rows(self):
+        game = self.create_game(6, 4)
+        changed_coordinates = game.cells.update_block(b'??????\n?.T#??\n??????\n??????\n', 7)
+
+        self.assertEqual(3, len(changed_coordinates))
+        self.assertEqual(0, len(game.cells.update_block(b'??????\n?.T#??\n??????\n??????\n', 7)))
@@ -0,0 +1,79 @@
+import random
+import unittest
+from collections import deque
+from typing import Dict, List, Tuple
+
+from common.coordinates import Coordinates
+from entity.map import Map
+from game import Game
+from logic.d_star_lite import DStarLite
+from service.cell_builder import CellBuilder
+
+
+class DStarLiteTest(unittest.TestCase):
+    """ every step of D* Lite on a partially known grid has to be a step of a shortest path found by BFS """
+    GAMES = 300
+    STEPS = 40
+
+    @staticmethod
+    def get_distances(rows: List[List[str]], goal: Tuple[int, int]) -> Dict[Tuple[int, int], int]:
+        distances = {goal: 0}
+        frontier = deque([goal])
+        while frontier:
+            x, y = frontier.popleft()
+            for neighbour in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+                neighbour_x, neighbour_y = neighbour
+                if neighbour in distances or not 0 <= neighbour_y < len(rows) or not 0 <= neighbour_x < len(rows[0]):
+                    continue
+
+                if rows[neighbour_y][neighbour_x] in '.TC':
+                    distances[neighbour] = distances[(x, y)] + 1
+                    frontier.append(neighbour)
+
+        return distances
+
+    @staticmethod
+    def create_game(width: int, height: int) -> Game:
+        game = Game(Map(width, height))
+        for y in range(height):
+            for x in range(width):
+                game.cells.add(CellBuilder.build_cell(x, y))
+
+        return game
+
+    def test_follows_shortest_paths_while_cells_are_revealed(self):
+        for seed in range(self.GAMES):
+            randomiser = random.Random(seed)
+            width, height = randomiser.randint(3, 25), randomiser.randint(3, 15)
+            maze = [[randomiser.choice('#....') for _ in range(width)] for _ in range(height)]
+            goal = randomiser.randrange(width), randomiser.randrange(height)
+            maze[goal[1]][goal[0]] = 'T'
+            known_rows = [[cell if randomiser.random() < 0.8 else '?' for cell in row] for row in maze]
+            known_rows[goal[1]][goal[0]] = 'T'
+
+            game = self.create_game(width, height)
+            game.cells.update_rows([''.join(row) for row in known_rows])
+            planner = DStarLite(game.cells, game.cells.start)
+            player = randomiser.choice([
+                (x, y) for y in range(height) for x in range(width) if known_rows[y][x] in '.T'
+            ])
+            for step in range(self.STEPS):
+                if player == goal:
+                    break
+
+                distances = self.get_distances(known_rows, goal)
+                next_cell = planner.get_next_cell(game.cells.get_by_coordinates(Coordinates.get(*player)))
+                if player not in distances:
+                    self.assertIsNone(next_cell, (seed, step))
+                    break
+
+                self.assertIsNotNone(next_cell, (seed, step))
+                next_player = next_cell.coordinates.x, next_cell.coordinates.y
+                self.assertEqual(distances.get(next_player), distances[player] - 1, (seed, step))
+                player = next_player
+
+                for _ in range(randomiser.randint(0, 6)):
+                    x, y = randomiser.randrange(width), randomiser.randrange(height)
+                    known_rows[y][x] = maze[y][x]
+
+                planner.update_cells(game.cells.update_rows([''.join(row) for row in known_rows]))
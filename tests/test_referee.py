@@ -0,0 +1,29 @@
+import unittest
+
+from maze_generator import Maze
+from simulator import Simulator, Referee
+
+
+class RefereeTest(unittest.TestCase):
+    """ the alarm rounds are the moves allowed after the control room, the last one may reach the start """
+
+    @staticmethod
+    def play(alarm_rounds: int, directions: str) -> str:
+        referee = Referee(Maze(['#####', '#T.C#', '#####'], (1, 1), (3, 1), alarm_rounds))
+        result = None
+        for direction in directions.split():
+            result = referee.move(direction)
+
+        return result
+
+    def test_escapes_when_the_rounds_are_enough(self):
+        self.assertEqual(Simulator.ESCAPED, self.play(2, 'RIGHT RIGHT LEFT LEFT'))
+
+    def test_alarm_goes_off_before_the_start_is_reached(self):
+        self.assertEqual(Simulator.ALARM_WENT_OFF, self.play(1, 'RIGHT RIGHT LEFT LEFT'))
+
+    def test_start_does_not_end_the_game_before_the_alarm(self):
+        self.assertIsNone(self.play(1, 'RIGHT LEFT'))
+
+    def test_walls_end_the_game(self):
+        self.assertEqual(Simulator.WALKED_INTO_WALL, self.play(2, 'UP'))